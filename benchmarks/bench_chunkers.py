@@ -0,0 +1,59 @@
+"""
+Compare the character and syntax-aware chunkers of ``pc embed``.
+
+Reports chunk count, embedded characters relative to the source (overlap and
+duplicate overhead), the resulting float32 index size and chunking throughput.
+
+Usage:
+    python -m benchmarks.bench_chunkers path/to/project --size 800 --overlap 200 --dim 768
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from project_control.embedding.chunker import Chunker
+from project_control.embedding.index_builder import IGNORE_DIRS, _iter_files
+
+
+def _load(root: Path, exts: Tuple[str, ...]) -> List[Tuple[str, str]]:
+    return [
+        (path.as_posix(), (root / path).read_text(encoding="utf-8", errors="replace"))
+        for path in _iter_files(root, exts, set(IGNORE_DIRS))
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", nargs="?", default=".")
+    parser.add_argument("--size", type=int, default=800)
+    parser.add_argument("--overlap", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=768, help="embedding dimension used for the index size estimate")
+    parser.add_argument("--exts", nargs="+", default=[".py", ".js", ".ts", ".md"])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    files = _load(Path(args.path).resolve(), tuple(args.exts))
+    source_chars = sum(len(text) for _, text in files)
+    print(f"{len(files)} files, {source_chars} chars, chunk size {args.size}, overlap {args.overlap}")
+    print(f"{'mode':<7} {'chunks':>8} {'embedded/source':>16} {'index MB':>9} {'MB/s':>8}")
+    for mode in ("chars", "syntax"):
+        chunker = Chunker(args.size, args.overlap, mode)
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            chunks = [chunk for path, text in files for chunk in chunker.iter_chunks(text, path)]
+            best = min(best, time.perf_counter() - started)
+        embedded = sum(len(chunk.text) for chunk in chunks)
+        index_mb = len(chunks) * args.dim * 4 / 1e6
+        print(
+            f"{mode:<7} {len(chunks):>8} {embedded / max(source_chars, 1):>16.3f} "
+            f"{index_mb:>9.2f} {source_chars / 1e6 / max(best, 1e-9):>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
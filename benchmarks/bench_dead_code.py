@@ -0,0 +1,106 @@
+"""
+Time ``pc dead`` usage counting on a synthetic repository.
+
+Compares the snapshot token index (cold, and warm from the per-blob token
+cache) with the per-file ripgrep scan it replaces. The ripgrep baseline is
+timed on a sample of files and extrapolated; without rg on PATH an
+in-process scan of every blob per file stands in for it.
+
+Usage:
+    python -m benchmarks.bench_dead_code --files 50000 --rg-sample 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import re
+import shutil
+import tempfile
+import time
+from hashlib import sha256
+from pathlib import Path
+from typing import Dict, List
+
+from project_control.analysis.dead_analyzer import analyze_dead_code, build_token_index
+from project_control.core.content_store import ContentStore
+from project_control.utils.rg_helper import run_rg_files_only
+
+
+def _make_repo(root: Path, n_files: int, seed: int = 0) -> Dict:
+    """Write blobs and a snapshot for ``n_files`` modules importing a few random neighbours."""
+    rng = random.Random(seed)
+    content_dir = root / ".project-control" / "content"
+    content_dir.mkdir(parents=True)
+    files: List[Dict] = []
+    for i in range(n_files):
+        imports = "".join(f"from pkg{j // 100}.mod{j} import handler{j}\n" for j in rng.sample(range(n_files), 3))
+        body = "".join(f"    value_{k} = compute(value_{k - 1}, {k})\n" for k in range(1, 30))
+        text = f"{imports}\n\ndef handler{i}(request):\n    value_0 = request\n{body}    return value_29\n"
+        data = text.encode("utf-8")
+        digest = sha256(data).hexdigest()
+        (content_dir / f"{digest}.blob").write_bytes(data)
+        files.append({"path": f"pkg{i // 100}/mod{i}.py", "sha256": digest, "size": len(data)})
+    return {"snapshot_version": 1, "snapshot_id": "bench", "file_count": n_files, "files": files}
+
+
+def _baseline_per_file(root: Path, files: List[str], sample: int) -> float:
+    """Seconds per file of the old approach: one full scan per file."""
+    picked = files[:sample]
+    started = time.perf_counter()
+    if shutil.which("rg"):
+        cwd = os.getcwd()
+        os.chdir(root)
+        try:
+            for path in picked:
+                run_rg_files_only([Path(path).name, Path(path).stem])
+        finally:
+            os.chdir(cwd)
+    else:
+        blobs = [p.read_text(encoding="utf-8") for p in (root / ".project-control" / "content").glob("*.blob")]
+        for path in picked:
+            regex = re.compile(f"{re.escape(Path(path).name)}|{re.escape(Path(path).stem)}")
+            sum(1 for text in blobs if regex.search(text))
+    return (time.perf_counter() - started) / max(len(picked), 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=50000)
+    parser.add_argument("--rg-sample", type=int, default=20, help="files timed for the per-file baseline")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        snapshot = _make_repo(root, args.files)
+        store = ContentStore(snapshot, root / ".project-control" / "snapshot.json")
+        cache = root / ".project-control" / "cache" / "tokens.sqlite"
+        files = [f["path"] for f in snapshot["files"]]
+
+        started = time.perf_counter()
+        build_token_index(snapshot, store, cache_path=cache)
+        cold = time.perf_counter() - started
+
+        started = time.perf_counter()
+        index = build_token_index(snapshot, store, cache_path=cache)
+        warm = time.perf_counter() - started
+
+        started = time.perf_counter()
+        result = analyze_dead_code(files, token_index=index)
+        lookups = time.perf_counter() - started
+
+        per_file = _baseline_per_file(root, files, args.rg_sample)
+        baseline = per_file * len(files)
+        tool = "rg" if shutil.which("rg") else "in-process scan"
+
+        print(f"{len(files)} files, {result['stats']['dead']} dead")
+        print(f"baseline ({tool}, per file): {per_file * 1000:.1f} ms/file -> ~{baseline:.0f} s total (extrapolated)")
+        print(f"token index cold build:      {cold:.2f} s")
+        print(f"token index warm build:      {warm:.2f} s (token cache)")
+        print(f"usage lookups:               {lookups * 1000:.1f} ms")
+        print(f"speedup: {baseline / (cold + lookups):.0f}x cold, {baseline / (warm + lookups):.0f}x warm")
+
+
+if __name__ == "__main__":
+    main()
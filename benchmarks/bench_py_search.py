@@ -0,0 +1,95 @@
+"""
+Time the in-process search fallback against ripgrep on a synthetic repository.
+
+Runs the same snapshot-scoped searches through ``py_search`` (serial and
+with a process pool) and, when rg is on PATH, through rg itself: a selective
+literal, a regex with a required literal, and a pattern with no literal
+(no prefilter possible).
+
+Usage:
+    python -m benchmarks.bench_py_search --files 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+from hashlib import sha256
+from pathlib import Path
+from typing import Dict, List
+
+from project_control.core.search_scope import SearchScope
+from project_control.utils import py_search
+
+QUERIES = {
+    "literal": ["-F", "-e", "handler4242"],
+    "regex": ["-e", r"def handler\d+\(request"],
+    "no literal": ["-e", r"\d{5}"],
+}
+
+
+def _make_repo(root: Path, n_files: int, seed: int = 0) -> Dict:
+    """Write the working tree, blobs and a snapshot of ``n_files`` modules."""
+    rng = random.Random(seed)
+    content_dir = root / ".project-control" / "content"
+    content_dir.mkdir(parents=True)
+    files: List[Dict] = []
+    for i in range(n_files):
+        imports = "".join(f"from pkg{j // 100}.mod{j} import handler{j}\n" for j in rng.sample(range(n_files), 3))
+        body = "".join(f"    value_{k} = compute(value_{k - 1}, {k})\n" for k in range(1, 30))
+        text = f"{imports}\n\ndef handler{i}(request):\n    value_0 = request\n{body}    return value_29\n"
+        data = text.encode("utf-8")
+        digest = sha256(data).hexdigest()
+        (content_dir / f"{digest}.blob").write_bytes(data)
+        path = root / f"pkg{i // 100}" / f"mod{i}.py"
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(data)
+        files.append({"path": f"pkg{i // 100}/mod{i}.py", "sha256": digest, "size": len(data)})
+    return {"snapshot_version": 1, "snapshot_id": "bench", "file_count": n_files, "files": files}
+
+
+def _time(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        snapshot = _make_repo(root, args.files)
+        scope = SearchScope.for_snapshot(snapshot, root / ".project-control")
+        total = sum(f["size"] for f in snapshot["files"])
+        print(f"{args.files} files, {total / 1e6:.1f} MB, {args.jobs} jobs")
+        os.chdir(root)
+        try:
+            for name, query in QUERIES.items():
+                rg_args = [*query, *scope.rg_args()]
+                serial = _time(lambda: list(py_search.iter_files(rg_args, jobs=1)))
+                pooled = _time(lambda: list(py_search.iter_files(rg_args, jobs=args.jobs)))
+                line = f"{name:<11} py serial {serial:6.2f} s   py pool {pooled:6.2f} s"
+                if shutil.which("rg"):
+                    rg = _time(lambda: subprocess.run(["rg", "--files-with-matches", *rg_args],
+                                                      capture_output=True, check=False))
+                    line += f"   rg {rg:6.2f} s   rg/py {rg / min(serial, pooled):.2f}"
+                print(line)
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Compare the FAISS and pure-NumPy flat backends of ``pc embed``.
+
+Usage:
+    python -m benchmarks.bench_vector_backends --vectors 200000 --dim 768 --queries 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from project_control.embedding.config import EmbedConfig
+from project_control.embedding.index_factory import create_index, read_index, write_index
+
+
+def _unit_vectors(n: int, dim: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    vecs = rng.standard_normal((n, dim)).astype(np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+def _bench(backend: str, vectors: np.ndarray, queries: np.ndarray, k: int, workdir: Path):
+    ids = np.arange(1, len(vectors) + 1, dtype=np.int64)
+    index, _ = create_index(EmbedConfig(), vectors.shape[1], len(vectors), backend)
+
+    started = time.perf_counter()
+    index.add_with_ids(vectors, ids)
+    add_s = time.perf_counter() - started
+
+    path = workdir / f"{backend}.index"
+    write_index(index, path, backend)
+    started = time.perf_counter()
+    index = read_index(path, backend)
+    load_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for query in queries:
+        index.search(query[None, :], k)
+    single_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    _, found = index.search(queries, k)
+    batch_s = time.perf_counter() - started
+    return add_s, load_s, single_s, batch_s, found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--vectors", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    vectors = _unit_vectors(args.vectors, args.dim, seed=0)
+    queries = _unit_vectors(args.queries, args.dim, seed=1)
+    backends = ["numpy"]
+    try:
+        import faiss  # noqa: F401
+        backends.insert(0, "faiss")
+    except ImportError:
+        print("faiss not installed; benchmarking the NumPy backend only")
+
+    print(f"{args.vectors} x {args.dim} float32, {args.queries} queries, k={args.k}")
+    print(f"{'backend':<8} {'add s':>8} {'load s':>8} {'ms/query':>9} {'batch ms/q':>11}")
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in backends:
+            add_s, load_s, single_s, batch_s, found = _bench(backend, vectors, queries, args.k, Path(tmp))
+            results[backend] = found
+            print(
+                f"{backend:<8} {add_s:>8.3f} {load_s:>8.3f} "
+                f"{1000 * single_s / args.queries:>9.2f} {1000 * batch_s / args.queries:>11.2f}"
+            )
+    if len(results) == 2:
+        overlap = np.mean([
+            len(set(a) & set(b)) / args.k for a, b in zip(results["faiss"], results["numpy"])
+        ])
+        print(f"top-{args.k} overlap faiss vs numpy: {overlap:.3f}")
+
+
+if __name__ == "__main__":
+    main()
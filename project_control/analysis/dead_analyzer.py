@@ -1,8 +1,7 @@
 """Dead code analyzer - finds files with zero or minimal usage.
 
 Matches the final_analyzer_design.md specification:
-- Pure ripgrep-based analysis
-- Simple basename matching
+- Simple basename matching (token index over the snapshot, or ripgrep)
 - Deterministic output
 """
 
@@ -10,8 +9,10 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
-from typing import TypedDict
+from typing import Any, Optional, TypedDict
 
+from project_control.core.search_scope import SearchScope, scope_args
+from project_control.core.token_index import TokenIndex
 from project_control.utils.rg_helper import run_rg_files_only
 
 LOGGER = logging.getLogger(__name__)
@@ -27,6 +28,50 @@ class DeadCodeResult(TypedDict):
     stats: dict
 
 
+# Directories whose contents are never analyzed
+_IGNORE_DIRS = frozenset({
+    "node_modules",
+    ".git",
+    ".project-control",
+    "venv",
+    ".venv",
+    "env",
+    ".env",
+    "__pycache__",
+    ".pytest_cache",
+    ".cache",
+    "dist",
+    "build",
+    ".next",
+    "target",
+    "bin",
+    "obj",
+    "out",
+})
+
+
+def _should_ignore_dir(name: str) -> bool:
+    """
+    Check if a directory (by name) should be skipped entirely.
+
+    Lets directory walks prune ignored trees instead of filtering their files.
+
+    Args:
+        name: Directory name (a single path part).
+
+    Returns:
+        True if nothing below the directory should be analyzed.
+    """
+    # Direct match
+    if name in _IGNORE_DIRS:
+        return True
+    # Pattern match for .venv-* directories
+    if name.startswith(".venv-") or name.startswith("venv-"):
+        return True
+    # Virtual environment packages (also covers Lib/site-packages)
+    return name == "site-packages"
+
+
 def _should_ignore_file(file_path: Path) -> bool:
     """
     Check if a file should be automatically ignored based on common patterns.
@@ -37,42 +82,9 @@ def _should_ignore_file(file_path: Path) -> bool:
     Returns:
         True if file should be ignored, False otherwise.
     """
-    # Get path parts for easier checking
-    parts = file_path.parts
-
     # Check directory-level ignores
-    ignore_dirs = {
-        "node_modules",
-        ".git",
-        ".project-control",
-        "venv",
-        ".venv",
-        "env",
-        ".env",
-        "__pycache__",
-        ".pytest_cache",
-        ".cache",
-        "dist",
-        "build",
-        ".next",
-        "target",
-        "bin",
-        "obj",
-        "out",
-    }
-
-    for part in parts:
-        # Direct match
-        if part in ignore_dirs:
-            return True
-        # Pattern match for .venv-* directories
-        if part.startswith(".venv-") or part.startswith("venv-"):
-            return True
-        # Pattern match for Lib/site-packages (virtual environment packages)
-        if part == "Lib" and "site-packages" in parts:
-            return True
-        if part == "site-packages":
-            return True
+    if any(_should_ignore_dir(part) for part in file_path.parts):
+        return True
 
     # Check for test files
     file_name = file_path.name
@@ -109,21 +121,49 @@ def _should_ignore_file(file_path: Path) -> bool:
     return False
 
 
+def build_token_index(
+    snapshot: dict[str, Any],
+    content_store: Any,
+    cache_path: Optional[Path] = None,
+) -> TokenIndex:
+    """
+    Index which snapshot files mention each candidate's stem.
+
+    Only the names ``analyze_dead_code`` will look up are kept. Token sets
+    are cached per blob sha256 in ``cache_path`` when given.
+    """
+    vocabulary: set[str] = set()
+    for entry in snapshot.get("files", []):
+        path = Path(entry.get("path") or "")
+        if path.name and not _should_ignore_file(path):
+            vocabulary.add(path.stem)
+    return TokenIndex.build(snapshot, content_store, vocabulary=vocabulary, cache_path=cache_path)
+
+
 def analyze_dead_code(
     files: list[str],
     low_usage_threshold: int = 2,
+    token_index: Optional[TokenIndex] = None,
+    scope: Optional[SearchScope] = None,
 ) -> DeadCodeResult:
     """
-    Analyze files for dead/unused code using ripgrep.
+    Analyze files for dead/unused code by basename usage.
 
     Matches final_analyzer_design.md specification:
     - Input: list of file paths
-    - Logic: basename matching via ripgrep
+    - Logic: basename matching (token index or ripgrep)
     - Output: {"high": [paths], "medium": [paths], "stats": {...}}
 
+    Usage is the number of files mentioning the basename or stem. With a
+    ``token_index`` (see ``build_token_index``) that is a set lookup over the
+    snapshot's own files; without one, each file costs a ripgrep scan of
+    ``scope`` (the working directory when no scope is given).
+
     Args:
         files: List of file paths to analyze.
         low_usage_threshold: Max usage count to consider as "low usage" (default: 2).
+        token_index: Index of the snapshot content; enables O(1) usage counts.
+        scope: Files the ripgrep fallback searches.
 
     Returns:
         Structured result with high/medium priority files and stats.
@@ -142,12 +182,16 @@ def analyze_dead_code(
         name = Path(file_path).name  # basename with extension
         name_without_ext = Path(file_path).stem  # basename without extension
 
-        # Search for file name usage using ripgrep -l (files only mode)
-        # Search for both with and without extension
-        matches = run_rg_files_only(
-            [name, name_without_ext],
-            extra_args=None,  # Search all file types
-        )
+        if token_index is not None:
+            # Any file mentioning "utils.py" also contains the token "utils"
+            matches = token_index.files_with(name_without_ext)
+        else:
+            # Search for file name usage using ripgrep -l (files only mode)
+            # Search for both with and without extension
+            matches = run_rg_files_only(
+                [name, name_without_ext],
+                extra_args=scope_args(scope) or None,  # Search all file types
+            )
 
         # Count usage (number of files that reference this file)
         # Note: run_rg_files_only returns list of unique file paths
@@ -6,7 +6,8 @@ import re
 from pathlib import Path
 from typing import Any, Dict, List, TYPE_CHECKING
 
-from project_control.utils.fs_helpers import run_rg
+from project_control.core.search_scope import SearchScope, scope_args
+from project_control.utils.rg_helper import run_rg_multi
 
 if TYPE_CHECKING:
     from project_control.core.content_store import ContentStore
@@ -37,7 +38,7 @@ def detect_orphans(snapshot: Dict[str, Any], patterns: Dict[str, Any], content_s
         List of relative file paths that look orphaned.
     """
     entrypoints = {Path(entry).name for entry in patterns.get("entrypoints", [])}
-    orphans: List[str] = []
+    candidates: Dict[str, List[str]] = {}
 
     for file in snapshot.get("files", []):
         rel_path = file.get("path")
@@ -55,13 +56,14 @@ def detect_orphans(snapshot: Dict[str, Any], patterns: Dict[str, Any], content_s
         if not name_without_ext:
             continue
 
-        patterns_to_check = _reference_patterns(name_without_ext)
-        if any(run_rg(p).strip() for p in patterns_to_check):
-            continue
-
-        orphans.append(rel_path)
+        candidates[rel_path] = _reference_patterns(name_without_ext)
 
-    return orphans
+    if not candidates:
+        return []
 
+    # One ripgrep pass over the snapshot's files; each match is attributed to its file
+    scope = SearchScope.for_snapshot(snapshot, content_store.snapshot_path.parent) if content_store is not None else None
+    references = run_rg_multi(candidates, extra_args=scope_args(scope))
+    return [rel_path for rel_path in candidates if not references.get(rel_path)]
 
 analyze = detect_orphans
\ No newline at end of file
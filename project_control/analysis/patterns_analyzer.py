@@ -2,16 +2,36 @@
 
 from __future__ import annotations
 
+import json
 import logging
+import re
+import sqlite3
+import zlib
+from hashlib import sha256
 from pathlib import Path
-from typing import TypedDict
+from typing import Iterable, TypedDict
 
 import yaml
 
-from project_control.utils.rg_helper import run_rg_json
+from project_control.core.search_scope import SearchScope, scope_args
+from project_control.utils.rg_helper import python_compilable, python_joinable, run_rg_multi
 
 LOGGER = logging.getLogger(__name__)
 
+# Bump when matching changes so cached per-file results are recomputed.
+PATTERNS_CACHE_VERSION = 1
+
+_CODE_TYPES = ["--type", "py", "--type", "js", "--type", "ts"]
+
+# Extensions of ripgrep's py, js and ts file types
+_CODE_EXTENSIONS = frozenset({
+    ".py", ".pyi",
+    ".js", ".jsx", ".mjs", ".cjs", ".vue",
+    ".ts", ".tsx", ".mts", ".cts",
+})
+
+_QUERY_CHUNK = 500
+
 
 class PatternsResult(TypedDict):
     """Structured result from patterns analysis."""
@@ -19,17 +39,205 @@ class PatternsResult(TypedDict):
     stats: dict
 
 
+class PatternResultCache:
+    """
+    Per-file pattern matches keyed by (content sha256, patterns hash).
+
+    A second table remembers the sha256 of each path at a given mtime and
+    size, so unchanged files are neither re-read nor re-hashed. Stored in one
+    SQLite file under ``.project-control/cache/``.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS file_matches ("
+            " sha256 TEXT NOT NULL,"
+            " patterns_hash TEXT NOT NULL,"
+            " matches BLOB NOT NULL,"
+            " PRIMARY KEY (sha256, patterns_hash))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS file_stats ("
+            " path TEXT PRIMARY KEY,"
+            " mtime_ns INTEGER NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " sha256 TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get_stats(self) -> dict[str, tuple[int, int, str]]:
+        rows = self._conn.execute("SELECT path, mtime_ns, size, sha256 FROM file_stats")
+        return {path: (mtime_ns, size, sha) for path, mtime_ns, size, sha in rows}
+
+    def put_stats(self, stats: dict[str, tuple[int, int, str]]) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO file_stats (path, mtime_ns, size, sha256) VALUES (?, ?, ?, ?)",
+            [(path, *stat) for path, stat in stats.items()],
+        )
+        self._conn.commit()
+
+    def get_many(self, shas: Iterable[str], patterns_hash: str) -> dict[str, list]:
+        found: dict[str, list] = {}
+        unique = list(dict.fromkeys(shas))
+        for start in range(0, len(unique), _QUERY_CHUNK):
+            batch = unique[start:start + _QUERY_CHUNK]
+            placeholders = ",".join("?" for _ in batch)
+            rows = self._conn.execute(
+                f"SELECT sha256, matches FROM file_matches WHERE patterns_hash = ? AND sha256 IN ({placeholders})",
+                [patterns_hash, *batch],
+            )
+            for sha, blob in rows:
+                found[sha] = json.loads(zlib.decompress(blob))
+        return found
+
+    def put_many(self, items: dict[str, list], patterns_hash: str) -> None:
+        if not items:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO file_matches (sha256, patterns_hash, matches) VALUES (?, ?, ?)",
+            [
+                (sha, patterns_hash, zlib.compress(json.dumps(matches).encode("utf-8")))
+                for sha, matches in items.items()
+            ],
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _patterns_hash(groups: dict[str, list[str]]) -> str:
+    payload = json.dumps([PATTERNS_CACHE_VERSION, groups], sort_keys=True)
+    return sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _AnyOf:
+    """Regexes searched one after another, for patterns that cannot be joined with "|"."""
+
+    def __init__(self, regexes: list[re.Pattern]):
+        self.regexes = regexes
+
+    def search(self, line: str) -> bool:
+        return any(regex.search(line) for regex in self.regexes)
+
+
+def _file_matcher(groups: dict[str, list[str]]):
+    """
+    Build a function mapping file text to ``[group, line, text]`` matches.
+
+    Like ripgrep, patterns are matched line by line; a combined regex
+    rejects most lines before the per-group regexes run.
+    """
+    def union(terms: Iterable[str]) -> re.Pattern:
+        terms = list(terms)
+        if not python_joinable(terms):
+            return _AnyOf([re.compile(t) for t in terms])
+        return re.compile("|".join(f"(?:{t})" for t in terms))
+
+    combined = union(p for terms in groups.values() for p in terms)
+    group_res = [(name, union(terms)) for name, terms in groups.items()]
+
+    def match(text: str) -> list:
+        found = []
+        for number, line in enumerate(text.split("\n"), 1):
+            if not combined.search(line):
+                continue
+            for name, regex in group_res:
+                if regex.search(line):
+                    found.append([name, number, line.strip()])
+        return found
+
+    return match
+
+
+def _scan_scope(
+    root: Path,
+    paths: Iterable[str],
+    groups: dict[str, list[str]],
+    cache_path: Path,
+) -> dict[str, list[dict]]:
+    """
+    Match ``groups`` against ``paths`` (relative to ``root``), reusing cached per-file results.
+
+    Only files whose content (sha256) is new for this set of patterns are
+    searched; a file's sha256 is only recomputed when its mtime or size changed.
+    """
+    results: dict[str, list[dict]] = {name: [] for name in groups}
+    patterns_hash = _patterns_hash(groups)
+    match = None
+    cache = PatternResultCache(cache_path)
+    try:
+        stats = cache.get_stats()
+        fresh_stats: dict[str, tuple[int, int, str]] = {}
+        texts: dict[str, str] = {}
+        file_shas: list[tuple[str, str]] = []
+        for rel in paths:
+            path = root / rel
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            known = stats.get(rel)
+            if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+                sha = known[2]
+            else:
+                try:
+                    data = path.read_bytes()
+                except OSError:
+                    continue
+                sha = sha256(data).hexdigest()
+                fresh_stats[rel] = (stat.st_mtime_ns, stat.st_size, sha)
+                texts[sha] = data.decode("utf-8", errors="ignore")
+            file_shas.append((rel, sha))
+
+        cached = cache.get_many((sha for _, sha in file_shas), patterns_hash)
+        fresh: dict[str, list] = {}
+        for rel, sha in file_shas:
+            matches = cached.get(sha)
+            if matches is None:
+                matches = fresh.get(sha)
+            if matches is None:
+                text = texts.get(sha)
+                if text is None:
+                    try:
+                        text = (root / rel).read_text(encoding="utf-8", errors="ignore")
+                    except OSError:
+                        continue
+                match = match or _file_matcher(groups)
+                matches = fresh[sha] = match(text)
+            for name, line, text in matches:
+                results[name].append({"line": line, "text": text, "file": rel})
+
+        cache.put_many(fresh, patterns_hash)
+        cache.put_stats(fresh_stats)
+        LOGGER.debug(f"Patterns: {len(fresh)} file(s) scanned, {len(file_shas) - len(fresh)} from cache")
+    finally:
+        cache.close()
+    return results
+
+
 def analyze_patterns(
     project_root: str | Path = ".",
     patterns_file: str | Path | None = None,
+    scope: SearchScope | None = None,
 ) -> PatternsResult:
     """
     Analyze project for suspicious or forbidden code patterns.
 
+    All pattern groups are searched in one pass. Within a snapshot scope the
+    scan is incremental: per-file results are cached by (content sha256,
+    patterns hash) in ``.project-control/cache/patterns.sqlite``, so a re-run
+    only searches files that changed. Without a snapshot, one batched ripgrep
+    pass covers the working directory.
+
     Args:
         project_root: Root directory to analyze.
         patterns_file: Path to patterns YAML file.
                        Defaults to .project-control/patterns.yaml.
+        scope: Files to search (default: the project's snapshot, if any).
 
     Returns:
         Structured result with pattern matches grouped by pattern name.
@@ -57,45 +265,44 @@ def analyze_patterns(
 
     patterns_config = config.get("patterns", {})
 
-    results: dict[str, dict] = {}
-    total_matches = 0
+    if scope is None:
+        scope = SearchScope.load(root)
 
+    groups: dict[str, list[str]] = {}
     for pattern_name, pattern_terms in patterns_config.items():
         if not isinstance(pattern_terms, list):
             LOGGER.warning(f"Pattern '{pattern_name}' is not a list, skipping")
             continue
+        terms = [str(term) for term in pattern_terms if term]
+        if terms:
+            groups[pattern_name] = terms
 
-        if not pattern_terms:
-            continue
-
-        # Search for all pattern terms
-        matches = run_rg_json(
-            pattern_terms,
-            extra_args=["--type", "py", "--type", "js", "--type", "ts"],
-        )
+    if scope is not None:
+        # Snapshot files, scanned in-process with per-file caching; patterns
+        # Python's re cannot compile are left to ripgrep
+        local = {name: [t for t in terms if python_compilable(t)] for name, terms in groups.items()}
+        local = {name: terms for name, terms in local.items() if terms}
+        rg_only = {name: [t for t in terms if not python_compilable(t)] for name, terms in groups.items()}
+        rg_only = {name: terms for name, terms in rg_only.items() if terms}
+        paths = sorted(p for p in scope.paths if Path(p).suffix in _CODE_EXTENSIONS)
+        found = _scan_scope(root, paths, local, root / ".project-control" / "cache" / "patterns.sqlite") if local else {}
+        if rg_only:
+            for name, matches in run_rg_multi(rg_only, extra_args=[*_CODE_TYPES, *scope_args(scope)]).items():
+                found[name] = sorted(found.get(name, []) + matches, key=lambda m: (m["file"], m["line"]))
+    else:
+        # Search for all pattern groups in a single ripgrep pass
+        found = run_rg_multi(groups, extra_args=_CODE_TYPES) if groups else {}
 
+    results: dict[str, dict] = {}
+    total_matches = 0
+    for pattern_name in groups:
+        matches = [
+            {"line": m["line"], "text": m["text"], "file": m["file"]}
+            for m in found.get(pattern_name, [])
+        ]
         if matches:
-            # Group matches by file
-            by_file: dict[str, list[dict]] = {}
-            for match in matches:
-                file_path = match["file"]
-                if file_path not in by_file:
-                    by_file[file_path] = []
-                by_file[file_path].append({
-                    "line": match["line"],
-                    "text": match["text"],
-                    "file": file_path,
-                })
-
-            results[pattern_name] = {
-                "matches": [],
-            }
-
-            # Flatten matches
-            for file_matches in by_file.values():
-                results[pattern_name]["matches"].extend(file_matches)
-
-            total_matches += len(results[pattern_name]["matches"])
+            results[pattern_name] = {"matches": matches}
+            total_matches += len(matches)
 
     return {
         "patterns": results,
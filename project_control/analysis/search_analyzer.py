@@ -4,9 +4,11 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
-from typing import Sequence, TypedDict
+from typing import Iterator, Sequence, TypedDict
 
-from project_control.utils.rg_helper import run_rg_json, run_rg_files_only
+from project_control.core.search_scope import SearchScope, scope_args
+from project_control.core.trigram_index import TrigramIndex
+from project_control.utils.rg_helper import iter_rg_files, iter_rg_json, run_rg_files_only
 
 LOGGER = logging.getLogger(__name__)
 
@@ -17,22 +19,65 @@ class SearchResult(TypedDict):
     stats: dict
 
 
+def iter_search(
+    patterns: Sequence[str],
+    project_root: str | Path = ".",
+    invert: bool = False,
+    files_only: bool = False,
+    extra_args: list[str] | None = None,
+    max_results: int | None = None,
+    use_index: bool = False,
+) -> Iterator[dict]:
+    """
+    Stream search matches as ripgrep finds them (same arguments as ``smart_search``).
+
+    Yields ``{"file"}`` dicts in files-only and invert modes, otherwise
+    ``{"file", "line", "text"}``. Files come in rg's discovery order rather
+    than sorted. Stops ripgrep once ``max_results`` matches were yielded.
+
+    With ``use_index``, the snapshot's trigram index answers the query when
+    it can (no invert, no extra rg arguments, Python-compatible patterns with
+    literal parts); files then come in path order. Otherwise ripgrep runs.
+    """
+    if use_index and not invert and not extra_args and TrigramIndex.can_search(patterns):
+        index = TrigramIndex.load(Path(project_root))
+        if index is not None:
+            try:
+                yield from index.search(patterns, files_only=files_only, max_results=max_results)
+            finally:
+                index.close()
+            return
+
+    args = scope_args(SearchScope.load(Path(project_root))) + list(extra_args or [])
+    if invert or files_only:
+        # -L doesn't work with JSON output, so invert mode is always files-only
+        for path in iter_rg_files(patterns, args + ["-L"] if invert else args, max_results=max_results):
+            yield {"file": path}
+    else:
+        yield from iter_rg_json(patterns, args, max_results=max_results)
+
+
 def smart_search(
     patterns: Sequence[str],
     project_root: str | Path = ".",
     invert: bool = False,
     files_only: bool = False,
     extra_args: list[str] | None = None,
+    max_results: int | None = None,
+    use_index: bool = False,
 ) -> SearchResult:
     """
     Perform power-user search with advanced filtering.
 
     Args:
         patterns: List of regex patterns to search for.
-        project_root: Root directory to search in.
+        project_root: Project root; searches cover its snapshot's files when one exists.
         invert: If True, find files that DO NOT match the patterns.
         files_only: If True, return only file paths (no line details).
         extra_args: Additional ripgrep arguments.
+        max_results: Stop searching after this many matches (or files).
+        use_index: Search the snapshot's trigram index instead of running
+            ripgrep, when the query allows it (see ``iter_search``).
 
     Returns:
         Structured result with matches and search stats.
@@ -42,34 +87,18 @@ def smart_search(
 
     # For invert mode, always use files-only approach
     # because -L doesn't work with JSON output
-    if invert:
-        matching_files = run_rg_files_only(patterns, extra_args + ["-L"])
-        return {
-            "matches": [{"file": f} for f in matching_files],
-            "stats": {
-                "total_matches": len(matching_files),
-                "files_only": True,
-                "inverted": True,
-            },
-        }
-
-    if files_only:
-        matching_files = run_rg_files_only(patterns, extra_args)
-        return {
-            "matches": [{"file": f} for f in matching_files],
-            "stats": {
-                "total_matches": len(matching_files),
-                "files_only": True,
-                "inverted": False,
-            },
-        }
+    if (invert or files_only) and max_results is None and (invert or not use_index):
+        args = scope_args(SearchScope.load(Path(project_root))) + extra_args
+        matching_files = run_rg_files_only(patterns, args + ["-L"] if invert else args)
+        matches = [{"file": f} for f in matching_files]
     else:
-        matches = run_rg_json(patterns, extra_args)
-        return {
-            "matches": matches,
-            "stats": {
-                "total_matches": len(matches),
-                "files_only": False,
-                "inverted": False,
-            },
-        }
+        matches = list(iter_search(patterns, project_root, invert, files_only, extra_args, max_results, use_index))
+
+    return {
+        "matches": matches,
+        "stats": {
+            "total_matches": len(matches),
+            "files_only": invert or files_only,
+            "inverted": invert,
+        },
+    }
@@ -3,7 +3,7 @@ Semantic detector for PROJECT CONTROL.
 Identifies:
   1. Semantic orphans: files with low similarity to rest of codebase
   2. Semantic duplicates: files with high similarity to other files
-Uses qwen3-embedding:8b via EmbeddingService.
+Uses qwen3-embedding:8b via EmbeddingService (or the offline hashing provider).
 """
 from __future__ import annotations
 
@@ -65,28 +65,31 @@ def analyze(snapshot: Dict[str, Any], patterns: Dict[str, Any], content_store: "
     file_embeddings: Dict[str, List[float]] = {}
     file_sha256: Dict[str, str] = {}
     
-    for file in files:
-        path = file.get("path", "")
-        sha256 = file.get("sha256", "")
-        
-        if not _is_code_file(path) or not sha256:
-            continue
-        
-        try:
-            # Read file content from ContentStore (no filesystem access)
-            content = content_store.get_text(path)
-            if len(content.strip()) < 50:  # Skip near-empty files
+    try:
+        for file in files:
+            path = file.get("path", "")
+            sha256 = file.get("sha256", "")
+
+            if not _is_code_file(path) or not sha256:
                 continue
-            
-            # Compute embedding (cached via SHA256)
-            embedding = embedding_service.compute_embedding(content, sha256)
-            file_embeddings[path] = embedding
-            file_sha256[path] = sha256
-            
-        except Exception as e:
-            print(f"⚠️  Warning: Failed to process {path} ({e})")
-            continue
-    
+
+            try:
+                # Read file content from ContentStore (no filesystem access)
+                content = content_store.get_text(path)
+                if len(content.strip()) < 50:  # Skip near-empty files
+                    continue
+
+                # Compute embedding (cached via SHA256)
+                embedding = embedding_service.compute_embedding(content, sha256, path)
+                file_embeddings[path] = embedding
+                file_sha256[path] = sha256
+
+            except Exception as e:
+                print(f"⚠️  Warning: Failed to process {path} ({e})")
+                continue
+    finally:
+        embedding_service.close()
+
     if len(file_embeddings) < 2:
         return []  # Need at least 2 files for semantic analysis
     
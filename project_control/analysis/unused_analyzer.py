@@ -8,16 +8,29 @@ Matches the final_analyzer_design.md specification:
 
 from __future__ import annotations
 
+import json
 import logging
+import os
 import re
+from hashlib import sha256
 from pathlib import Path
 from typing import TypedDict
 
-from project_control.utils.rg_helper import run_rg_json, run_rg_files_only
-from project_control.analysis.dead_analyzer import _should_ignore_file
+from project_control.core.search_scope import SearchScope, scope_args
+from project_control.core.symbol_index import SymbolIndex, SymbolRef
+from project_control.utils.rg_helper import run_rg_json, run_rg_files_only, run_rg_multi
+from project_control.analysis.dead_analyzer import _should_ignore_dir, _should_ignore_file
 
 LOGGER = logging.getLogger(__name__)
 
+# Bump when signal patterns or scoring change so cached results are recomputed.
+UNUSED_CACHE_VERSION = 1
+
+_CODE_TYPES = ["--type", "py", "--type", "js", "--type", "ts"]
+
+# Common entrypoint files, relative to the project root
+_ENTRYPOINTS = ["main.js", "index.js", "main.py", "index.py", "app.js", "app.py"]
+
 
 class UnusedSystemsResult(TypedDict):
     """Structured result from unused systems analysis.
@@ -43,63 +56,131 @@ def _detect_system_name(file_path: Path) -> str:
     return file_path.stem
 
 
-def _check_import_signal(system_name: str, project_root: Path) -> tuple[bool, str]:
+def _system_file_matcher(extensions: list[str], name_patterns: list[str]) -> re.Pattern:
+    """One regex for file names matching any ``*{pattern}*{ext}`` glob."""
+    patterns = "|".join(re.escape(p) for p in name_patterns)
+    exts = "|".join(re.escape(e) for e in extensions)
+    return re.compile(f".*(?:{patterns}).*(?:{exts})")
+
+
+def _discover_system_files(
+    root: Path,
+    extensions: list[str],
+    name_patterns: list[str],
+    scope: SearchScope | None = None,
+) -> list[Path]:
     """
-    Signal 1: Check if system is imported anywhere.
+    Find candidate system files (e.g. ``UserManager.py``) under ``root``.
 
-    Args:
-        system_name: Name of the system/class.
-        project_root: Root directory to search in.
+    Uses the snapshot's file list when ``scope`` is given, otherwise a single
+    directory walk that prunes ignored directories (node_modules, venv, ...)
+    instead of descending into them.
 
     Returns:
-        (has_import, reason): Tuple with boolean and reason string.
+        Sorted paths (``root / relative path``) of files whose name matches.
     """
-    # Try multiple import patterns
-    patterns = [
+    if not extensions or not name_patterns:
+        return []
+    matcher = _system_file_matcher(extensions, name_patterns)
+
+    if scope is not None:
+        return sorted(
+            root / rel
+            for rel in scope.paths
+            if matcher.fullmatch(rel.rsplit("/", 1)[-1])
+        )
+
+    found: list[Path] = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not _should_ignore_dir(d))
+        found.extend(Path(dirpath) / name for name in filenames if matcher.fullmatch(name))
+    return sorted(found)
+
+
+def _import_patterns(system_name: str) -> list[str]:
+    return [
         f"import.*{system_name}",
         f"require.*{system_name}",
         f"from.*{system_name}",
     ]
 
-    matches = run_rg_json(
-        patterns,
-        extra_args=["--type", "py", "--type", "js", "--type", "ts"],
-    )
+
+def _instantiation_patterns(system_name: str) -> list[str]:
+    # Look for "new ClassName" or "ClassName()" patterns
+    return [
+        f"new {system_name}",
+        f"{system_name}\\(",  # Class instantiation: ClassName(
+        f"{system_name} =",  # Variable assignment (potential instantiation)
+    ]
+
+
+def _check_import_signal(
+    system_name: str,
+    project_root: Path,
+    scope: SearchScope | None = None,
+    matches: list[dict] | None = None,
+) -> tuple[bool, str]:
+    """
+    Signal 1: Check if system is imported anywhere.
+
+    Args:
+        system_name: Name of the system/class.
+        project_root: Root directory to search in.
+        scope: Snapshot search scope (default: search the working directory).
+        matches: Precomputed import matches (see ``_collect_signal_matches``);
+                 searched with ripgrep when omitted.
+
+    Returns:
+        (has_import, reason): Tuple with boolean and reason string.
+    """
+    if matches is None:
+        # Try multiple import patterns
+        matches = run_rg_json(
+            _import_patterns(system_name),
+            extra_args=[*_CODE_TYPES, *scope_args(scope)],
+        )
 
     if matches:
         return True, f"Import found in {len(matches)} location(s)"
     return False, "No import found"
 
 
-def _check_instantiation_signal(system_name: str, project_root: Path) -> tuple[bool, str]:
+def _check_instantiation_signal(
+    system_name: str,
+    project_root: Path,
+    scope: SearchScope | None = None,
+    matches: list[dict] | None = None,
+) -> tuple[bool, str]:
     """
     Signal 2: Check if system is instantiated anywhere.
 
     Args:
         system_name: Name of the system/class.
         project_root: Root directory to search in.
+        scope: Snapshot search scope (default: search the working directory).
+        matches: Precomputed instantiation matches; searched with ripgrep when omitted.
 
     Returns:
         (has_instantiation, reason): Tuple with boolean and reason string.
     """
-    # Look for "new ClassName" or "ClassName()" patterns
-    patterns = [
-        f"new {system_name}",
-        f"{system_name}\\(",  # Class instantiation: ClassName(
-        f"{system_name} =",  # Variable assignment (potential instantiation)
-    ]
-
-    matches = run_rg_json(
-        patterns,
-        extra_args=["--type", "py", "--type", "js", "--type", "ts"],
-    )
+    if matches is None:
+        matches = run_rg_json(
+            _instantiation_patterns(system_name),
+            extra_args=[*_CODE_TYPES, *scope_args(scope)],
+        )
 
     if matches:
         return True, f"Instantiation found in {len(matches)} location(s)"
     return False, "No instantiation found"
 
 
-def _check_usage_signal(system_name: str, project_root: Path, exclude_file: Path) -> tuple[bool, str]:
+def _check_usage_signal(
+    system_name: str,
+    project_root: Path,
+    exclude_file: Path,
+    scope: SearchScope | None = None,
+    matches: list[dict] | None = None,
+) -> tuple[bool, str]:
     """
     Signal 3: Check if system name appears in code (general usage).
 
@@ -107,15 +188,18 @@ def _check_usage_signal(system_name: str, project_root: Path, exclude_file: Path
         system_name: Name of the system/class.
         project_root: Root directory to search in.
         exclude_file: File to exclude from search (self-reference).
+        scope: Snapshot search scope (default: search the working directory).
+        matches: Precomputed matches of the system name; searched with ripgrep when omitted.
 
     Returns:
         (has_usage, reason): Tuple with boolean and reason string.
     """
-    # Search for system name in general
-    matches = run_rg_json(
-        [system_name],
-        extra_args=["--type", "py", "--type", "js", "--type", "ts"],
-    )
+    if matches is None:
+        # Search for system name in general
+        matches = run_rg_json(
+            [system_name],
+            extra_args=[*_CODE_TYPES, *scope_args(scope)],
+        )
 
     # Filter out self-references
     external_matches = [
@@ -128,41 +212,132 @@ def _check_usage_signal(system_name: str, project_root: Path, exclude_file: Path
     return False, f"Usage count: {len(external_matches)} (<=1 threshold)"
 
 
-def _check_entrypoint_signal(system_name: str, project_root: Path) -> tuple[bool, str]:
+def _existing_entrypoints(project_root: Path, scope: SearchScope | None = None) -> list[Path]:
+    """Entrypoint files present in ``project_root`` (and in ``scope``, when given)."""
+    return [
+        project_root / entrypoint
+        for entrypoint in _ENTRYPOINTS
+        if (project_root / entrypoint).exists() and (scope is None or entrypoint in scope)
+    ]
+
+
+def _check_entrypoint_signal(
+    system_name: str,
+    project_root: Path,
+    scope: SearchScope | None = None,
+    matches: list[dict] | None = None,
+) -> tuple[bool, str]:
     """
     Signal 4: Check if system is referenced in entrypoint files.
 
     Args:
         system_name: Name of the system/class.
         project_root: Root directory to search in.
+        scope: Snapshot search scope (default: search the working directory).
+        matches: Precomputed entrypoint matches; searched with ripgrep when omitted.
 
     Returns:
         (has_entrypoint, reason): Tuple with boolean and reason string.
     """
-    # Common entrypoint files
-    entrypoints = ["main.js", "index.js", "main.py", "index.py", "app.js", "app.py"]
-
-    # Search for system name in entrypoint files only
-    matches = []
-    for entrypoint in entrypoints:
-        entrypoint_path = project_root / entrypoint
-        if entrypoint_path.exists():
+    if matches is None:
+        # Search the entrypoint files only, in a single rg call
+        entrypoint_paths = _existing_entrypoints(project_root, scope)
+        matches = []
+        if entrypoint_paths:
             file_matches = run_rg_json(
                 [system_name],
-                extra_args=["--type", "py", "--type", "js"],
+                extra_args=["--type", "py", "--type", "js", *(str(p) for p in entrypoint_paths)],
             )
-            # Filter to only matches from the entrypoint file
-            entrypoint_matches = [
-                m for m in file_matches
-                if Path(m["file"]).resolve() == entrypoint_path.resolve()
-            ]
-            matches.extend(entrypoint_matches)
+            # Filter to only matches from the entrypoint files
+            resolved = {p.resolve() for p in entrypoint_paths}
+            matches = [m for m in file_matches if Path(m["file"]).resolve() in resolved]
 
     if matches:
         return True, f"Referenced in entrypoint: {matches[0]['file']}"
     return False, "Not referenced in any entrypoint"
 
 
+def _ref_matches(refs: list[SymbolRef]) -> list[dict]:
+    return [{"file": ref.path, "line": ref.line, "text": f"{ref.kind} {ref.name}"} for ref in refs]
+
+
+def _collect_signal_matches(
+    system_names: list[str],
+    project_root: Path,
+    scope: SearchScope | None = None,
+    symbol_index: SymbolIndex | None = None,
+) -> dict[str, dict[str, list[dict]]]:
+    """
+    Gather the matches of all four signals for every system at once.
+
+    Import, instantiation and usage patterns of all systems go to a single
+    batched ripgrep pass, each tagged with its signal and system name. With a
+    ``symbol_index``, imports and instantiations (calls and ``new``) are
+    looked up in it instead, and only usage is searched. The entrypoint files
+    are small and few, so they are read directly instead of being searched
+    for every system.
+
+    Returns:
+        Signal ("import", "instantiation", "usage", "entrypoint") -> system name -> matches.
+    """
+    queries: dict[str, list[str]] = {}
+    for name in system_names:
+        if symbol_index is None:
+            queries[f"import:{name}"] = _import_patterns(name)
+            queries[f"instantiation:{name}"] = _instantiation_patterns(name)
+        queries[f"usage:{name}"] = [name]
+    found = run_rg_multi(queries, extra_args=[*_CODE_TYPES, *scope_args(scope)]) if queries else {}
+
+    signals: dict[str, dict[str, list[dict]]] = {
+        signal: {name: found.get(f"{signal}:{name}", []) for name in system_names}
+        for signal in ("import", "instantiation", "usage")
+    }
+    if symbol_index is not None:
+        for name in system_names:
+            signals["import"][name] = _ref_matches(symbol_index.occurrences(name, ("import",)))
+            signals["instantiation"][name] = _ref_matches(symbol_index.occurrences(name, ("new", "call")))
+
+    entrypoint_lines: list[tuple[str, int, str]] = []
+    for path in _existing_entrypoints(project_root, scope):
+        try:
+            text = path.read_text(encoding="utf-8", errors="ignore")
+        except OSError as e:
+            LOGGER.debug(f"Cannot read entrypoint {path}: {e}")
+            continue
+        rel = path.relative_to(project_root).as_posix()
+        entrypoint_lines.extend((rel, number, line) for number, line in enumerate(text.splitlines(), 1))
+    signals["entrypoint"] = {
+        name: [{"file": rel, "line": number, "text": line} for rel, number, line in entrypoint_lines if name in line]
+        for name in system_names
+    }
+    return signals
+
+
+def _cache_key(snapshot_id: str, extensions: list[str], name_patterns: list[str], indexed: bool) -> str:
+    payload = json.dumps([UNUSED_CACHE_VERSION, snapshot_id, sorted(extensions), sorted(name_patterns), indexed])
+    return sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _load_cached_result(cache_path: Path, key: str) -> UnusedSystemsResult | None:
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(cached, dict) or cached.get("key") != key:
+        return None
+    return cached.get("result")
+
+
+def _save_cached_result(cache_path: Path, key: str, result: UnusedSystemsResult) -> None:
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"key": key, "result": result}), encoding="utf-8")
+        tmp.replace(cache_path)
+    except OSError as e:
+        LOGGER.debug(f"Cannot write unused cache {cache_path}: {e}")
+
+
 def _calculate_score(
     has_import: bool,
     has_instantiation: bool,
@@ -230,13 +405,16 @@ def analyze_unused_systems(
     project_root: str | Path = ".",
     extensions: list[str] | None = None,
     name_patterns: list[str] | None = None,
+    scope: SearchScope | None = None,
+    symbol_index: SymbolIndex | None = None,
 ) -> UnusedSystemsResult:
     """
     Analyze project for unused systems using 4-signal detection system.
 
     Matches final_analyzer_design.md specification:
-    - STEP 1: Detect system files (System, Manager, Controller, Service, Engine)
-    - STEP 2: Run 4 signals (import, instantiation, usage, entrypoint)
+    - STEP 1: Detect system files (System, Manager, Controller, Service, Engine),
+              from the snapshot file list when there is one
+    - STEP 2: Run 4 signals (import, instantiation, usage, entrypoint), batched for all systems
     - STEP 3: Calculate score (0-4)
     - STEP 4: Classify (4=HIGH, 2-3=MEDIUM, 1=LOW)
     - Output: {"high": [...], "medium": [...], "low": [...], "stats": {...}}
@@ -245,6 +423,12 @@ def analyze_unused_systems(
         project_root: Root directory to analyze.
         extensions: File extensions to include.
         name_patterns: Patterns to identify system files (default: System, Manager, Controller, Service, Engine).
+        scope: Files the signals search (default: the project's snapshot, if any).
+        symbol_index: Symbol index of the snapshot; answers the import and
+                      instantiation signals exactly instead of by regex.
+
+    Results are cached under ``.project-control/cache/`` by snapshot id, so
+    re-running on an unchanged snapshot does not search again.
 
     Returns:
         Structured result with high/medium/low priority systems and stats.
@@ -253,37 +437,53 @@ def analyze_unused_systems(
     if extensions is None:
         extensions = [".py", ".js", ".ts", ".jsx", ".tsx"]
 
+    if scope is None:
+        scope = SearchScope.load(root)
+
     if name_patterns is None:
         name_patterns = ["System", "Manager", "Controller", "Service", "Engine"]
 
+    cache_path = root / ".project-control" / "cache" / "unused.json"
+    cache_key = None
+    if scope is not None and scope.snapshot_id:
+        cache_key = _cache_key(scope.snapshot_id, extensions, name_patterns, symbol_index is not None)
+        cached = _load_cached_result(cache_path, cache_key)
+        if cached is not None:
+            return cached
+
     high: list[dict] = []
     medium: list[dict] = []
     low: list[dict] = []
     total_systems = 0
 
-    # Find files matching system naming patterns
-    system_files = []
-    for ext in extensions:
-        for pattern in name_patterns:
-            system_files.extend(root.rglob(f"*{pattern}*{ext}"))
-
-    # Remove duplicates (same file might match multiple patterns)
-    system_files = list(set(system_files))
+    # Find files matching system naming patterns (snapshot list or one pruned walk)
+    system_files = _discover_system_files(root, extensions, name_patterns, scope)
     total_systems = len(system_files)
 
-    for file_path in system_files:
-        # Skip ignored files (test, config, venv, etc.)
-        if _should_ignore_file(file_path):
-            continue
-
-        # STEP 1: Detect system name
-        system_name = _detect_system_name(file_path)
+    # Skip ignored files (test, config, venv, etc.)
+    # STEP 1: Detect system names
+    systems = [
+        (file_path, _detect_system_name(file_path))
+        for file_path in system_files
+        if not _should_ignore_file(file_path.relative_to(root))
+    ]
 
-        # STEP 2: Run 4 signals
-        has_import, import_reason = _check_import_signal(system_name, root)
-        has_instantiation, instantiation_reason = _check_instantiation_signal(system_name, root)
-        has_usage, usage_reason = _check_usage_signal(system_name, root, file_path)
-        has_entrypoint, entrypoint_reason = _check_entrypoint_signal(system_name, root)
+    # STEP 2: Gather the 4 signals of all systems in one batched search
+    signals = _collect_signal_matches(sorted({name for _, name in systems}), root, scope, symbol_index)
+
+    for file_path, system_name in systems:
+        has_import, import_reason = _check_import_signal(
+            system_name, root, scope, matches=signals["import"][system_name]
+        )
+        has_instantiation, instantiation_reason = _check_instantiation_signal(
+            system_name, root, scope, matches=signals["instantiation"][system_name]
+        )
+        has_usage, usage_reason = _check_usage_signal(
+            system_name, root, file_path, scope, matches=signals["usage"][system_name]
+        )
+        has_entrypoint, entrypoint_reason = _check_entrypoint_signal(
+            system_name, root, scope, matches=signals["entrypoint"][system_name]
+        )
 
         # STEP 3: Calculate score
         score = _calculate_score(has_import, has_instantiation, has_usage, has_entrypoint)
@@ -320,7 +520,7 @@ def analyze_unused_systems(
         elif classification == "low":
             low.append(system_entry)
 
-    return {
+    result: UnusedSystemsResult = {
         "high": sorted(high, key=lambda x: x["file"]),
         "medium": sorted(medium, key=lambda x: x["file"]),
         "low": sorted(low, key=lambda x: x["file"]),
@@ -331,3 +531,6 @@ def analyze_unused_systems(
             "low_priority": len(low),
         },
     }
+    if cache_key is not None:
+        _save_cached_result(cache_path, cache_key, result)
+    return result
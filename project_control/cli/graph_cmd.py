@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import json
 import logging
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -12,12 +11,14 @@ from project_control.config.graph_config import GraphConfig, load_graph_config,
 logger = logging.getLogger(__name__)
 from project_control.graph.builder import GraphBuilder, compute_snapshot_hash
 from project_control.graph.metrics import compute_metrics
-from project_control.graph.artifacts import write_artifacts, ensure_output_dir
+from project_control.graph.artifacts import load_graph, write_artifacts, ensure_output_dir
 from project_control.graph.trace import trace_paths
 from project_control.core.content_store import ContentStore
 from project_control.core.exit_codes import EXIT_OK, EXIT_VALIDATION_ERROR
+from project_control.core.search_scope import SearchScope, scope_args
 from project_control.core.snapshot_service import load_snapshot
-from project_control.utils.fs_helpers import run_rg
+from project_control.core.symbol_index import SymbolIndex
+from project_control.utils.rg_helper import run_rg_multi
 
 
 def _load_snapshot_or_fail(project_root: Path):
@@ -28,7 +29,7 @@ def _load_snapshot_or_fail(project_root: Path):
         return None
 
 
-def graph_build(project_root: Path, config_path: Optional[Path]) -> int:
+def graph_build(project_root: Path, config_path: Optional[Path], jobs: Optional[int] = None) -> int:
     snapshot = _load_snapshot_or_fail(project_root)
     if snapshot is None:
         return EXIT_VALIDATION_ERROR
@@ -37,8 +38,9 @@ def graph_build(project_root: Path, config_path: Optional[Path]) -> int:
     snapshot_path = project_root / ".project-control" / "snapshot.json"
     content_store = ContentStore(snapshot, snapshot_path)
 
-    builder = GraphBuilder(project_root, snapshot, content_store, config)
-    graph = builder.build()
+    builder = GraphBuilder(project_root, snapshot, content_store, config, jobs=jobs)
+    # Full rebuild, but paths already in the previous graph keep their node ids
+    graph = builder.build(load_graph(project_root))
     metrics = compute_metrics(graph, config)
 
     snapshot_path_out, metrics_path_out, report_path = write_artifacts(project_root, graph, metrics)
@@ -48,14 +50,14 @@ def graph_build(project_root: Path, config_path: Optional[Path]) -> int:
     return EXIT_OK
 
 
-def graph_report(project_root: Path, config_path: Optional[Path]) -> int:
+def graph_report(project_root: Path, config_path: Optional[Path], jobs: Optional[int] = None) -> int:
     """Regenerate graph artifacts from existing graph if cache is valid, otherwise rebuild."""
     snapshot = _load_snapshot_or_fail(project_root)
     if snapshot is None:
         return EXIT_VALIDATION_ERROR
 
     config = load_graph_config(project_root, config_path)
-    graph = _load_or_build_graph(project_root, snapshot, config)
+    graph = _load_or_build_graph(project_root, snapshot, config, jobs=jobs)
     if graph is None:
         return EXIT_VALIDATION_ERROR
 
@@ -76,24 +78,34 @@ def graph_trace(
     max_paths: Optional[int],
     show_line: bool,
     config_override: Optional[GraphConfig] = None,
+    jobs: Optional[int] = None,
 ) -> int:
     snapshot = _load_snapshot_or_fail(project_root)
     if snapshot is None:
         return EXIT_VALIDATION_ERROR
 
     config = config_override if config_override is not None else load_graph_config(project_root, config_path)
-    graph = _load_or_build_graph(project_root, snapshot, config)
+    graph = _load_or_build_graph(project_root, snapshot, config, jobs=jobs)
     if graph is None:
         return EXIT_VALIDATION_ERROR
 
     id_to_path = {n["id"]: n["path"] for n in graph.get("nodes", [])}
-    target_id, symbol_defs = _resolve_target_node(project_root, target, id_to_path)
+    # One ripgrep pass over the snapshot's files serves both symbol resolution and the usage listing
+    control_dir = project_root / ".project-control"
+    scope = SearchScope.for_snapshot(snapshot, control_dir)
+    occurrences = _find_symbol_occurrences(target, scope)
+    # Definitions come from the symbol index (exact), falling back to the first text matches
+    symbol_index = SymbolIndex.for_snapshot(snapshot, control_dir)
+    content_store = ContentStore(snapshot, control_dir / "snapshot.json")
+    target_id, symbol_defs = _resolve_target_node(
+        project_root, target, id_to_path, occurrences, symbol_index, content_store
+    )
     if target_id is None:
         print(f"Target '{target}' not found in graph nodes.")
         return EXIT_VALIDATION_ERROR
 
     traces = trace_paths(graph, target_id, direction=direction, max_depth=max_depth, max_paths=max_paths)
-    symbol_usages = _find_symbol_usages(target, limit=50)
+    symbol_usages = _find_symbol_usages(target, limit=50, occurrences=occurrences)
     output_lines = _render_trace(graph, traces, target, target_id, symbol_defs, symbol_usages, show_line)
 
     for line in output_lines:
@@ -105,30 +117,35 @@ def graph_trace(
     return EXIT_OK
 
 
-def _load_or_build_graph(project_root: Path, snapshot: Dict, config: GraphConfig) -> Optional[Dict]:
-    graph_path = project_root / ".project-control" / "out" / "graph.snapshot.json"
+def _load_or_build_graph(
+    project_root: Path, snapshot: Dict, config: GraphConfig, jobs: Optional[int] = None
+) -> Optional[Dict]:
     current_hash = compute_snapshot_hash(snapshot)
     config_hash = hash_config(config)
 
-    if graph_path.exists():
-        try:
-            data = json.loads(graph_path.read_text(encoding="utf-8"))
-            meta = data.get("meta", {})
-            if meta.get("snapshotHash") == current_hash and meta.get("configHash") == config_hash:
-                return data
-        except (json.JSONDecodeError, OSError, KeyError) as e:
-            logger.warning(f"Failed to load cached graph: {e}")
-            # Fall through to rebuild graph
+    previous = load_graph(project_root)
+    if previous is not None:
+        meta = previous.get("meta", {})
+        if meta.get("snapshotHash") == current_hash and meta.get("configHash") == config_hash:
+            return previous
 
     content_store = ContentStore(snapshot, project_root / ".project-control" / "snapshot.json")
-    builder = GraphBuilder(project_root, snapshot, content_store, config)
-    graph = builder.build()
+    builder = GraphBuilder(project_root, snapshot, content_store, config, jobs=jobs)
+    # Stale graph: update it (falls back to a full build on a config change)
+    graph = builder.update(previous) if previous is not None else builder.build()
     metrics = compute_metrics(graph, config)
     write_artifacts(project_root, graph, metrics)
     return graph
 
 
-def _resolve_target_node(project_root: Path, target: str, id_to_path: Dict[int, str]) -> tuple[Optional[int], List[Dict]]:
+def _resolve_target_node(
+    project_root: Path,
+    target: str,
+    id_to_path: Dict[int, str],
+    occurrences: Optional[List[Dict]] = None,
+    symbol_index: Optional[SymbolIndex] = None,
+    content_store: Optional[ContentStore] = None,
+) -> tuple[Optional[int], List[Dict]]:
     symbol_defs: List[Dict] = []
     normalized_target = Path(target)
 
@@ -149,8 +166,10 @@ def _resolve_target_node(project_root: Path, target: str, id_to_path: Dict[int,
             if path == cand:
                 return node_id, symbol_defs
 
-    # Symbol resolution via ripgrep
-    symbol_defs = _find_symbol_definitions(target, limit=3)
+    # Symbol resolution via the symbol index, else ripgrep
+    symbol_defs = _find_symbol_definitions(
+        target, limit=3, occurrences=occurrences, symbol_index=symbol_index, content_store=content_store
+    )
     for match in symbol_defs:
         path = match.get("path")
         if path:
@@ -160,52 +179,59 @@ def _resolve_target_node(project_root: Path, target: str, id_to_path: Dict[int,
     return None, symbol_defs
 
 
-def _find_symbol_definitions(symbol: str, limit: int = 3) -> List[Dict]:
-    raw = run_rg(symbol)
-    results: List[Dict] = []
-    for line in raw.splitlines():
-        if len(results) >= limit:
-            break
-        parts = line.split(":", 2)
-        if len(parts) < 3:
-            continue
-        path, lineno, snippet = parts[0], parts[1], parts[2]
-        try:
-            line_no_int = int(lineno)
-        except ValueError:
-            line_no_int = 0
-        results.append({"path": path.replace("\\", "/"), "line": line_no_int, "lineText": snippet})
-    return results
+def _find_symbol_occurrences(symbol: str, scope: Optional[SearchScope] = None) -> List[Dict]:
+    """All ripgrep matches of `symbol` (within `scope`) as path/line/lineText dicts, in rg output order."""
+    matches = run_rg_multi({symbol: symbol}, extra_args=scope_args(scope)).get(symbol, [])
+    return [
+        {"path": m["file"].replace("\\", "/"), "line": int(m["line"] or 0), "lineText": m["text"]}
+        for m in matches
+    ]
 
 
-def _find_symbol_usages(symbol: str, limit: int = 50) -> List[Dict]:
+def _find_symbol_definitions(
+    symbol: str,
+    limit: int = 3,
+    occurrences: Optional[List[Dict]] = None,
+    symbol_index: Optional[SymbolIndex] = None,
+    content_store: Optional[ContentStore] = None,
+) -> List[Dict]:
+    """
+    Up to `limit` definitions of `symbol` as path/line/lineText dicts.
+
+    Class and function definitions from `symbol_index` when it has any;
+    otherwise the first textual occurrences.
+    """
+    definitions = symbol_index.definitions(symbol)[:limit] if symbol_index is not None else []
+    if definitions:
+        return [
+            {"path": ref.path, "line": ref.line, "lineText": _line_text(content_store, ref.path, ref.line)}
+            for ref in definitions
+        ]
+    if occurrences is None:
+        occurrences = _find_symbol_occurrences(symbol)
+    return occurrences[:limit]
+
+
+def _line_text(content_store: Optional[ContentStore], path: str, line: int) -> str:
+    if content_store is None:
+        return ""
+    try:
+        lines = content_store.get_text(path).splitlines()
+    except (FileNotFoundError, ValueError, OSError):
+        return ""
+    return lines[line - 1] if 1 <= line <= len(lines) else ""
+
+
+def _find_symbol_usages(symbol: str, limit: int = 50, occurrences: Optional[List[Dict]] = None) -> List[Dict]:
     """
     Return up to `limit` textual occurrences of `symbol` with path/line/snippet.
 
     This is a pure text search (ripgrep) and complements the graph-based trace by
     showing every file where the symbol string appears (imports, calls, docs).
     """
-    raw = run_rg(symbol)
-    results: List[Dict] = []
-    for line in raw.splitlines():
-        if len(results) >= limit:
-            break
-        parts = line.split(":", 2)
-        if len(parts) < 3:
-            continue
-        path, lineno, snippet = parts[0], parts[1], parts[2]
-        try:
-            line_no_int = int(lineno)
-        except ValueError:
-            line_no_int = 0
-        results.append(
-            {
-                "path": path.replace("\\", "/"),
-                "line": line_no_int,
-                "lineText": snippet.strip(),
-            }
-        )
-    return results
+    if occurrences is None:
+        occurrences = _find_symbol_occurrences(symbol)
+    return occurrences[:limit]
 
 
 def _edges_by_pair(edges: List[Dict]) -> Dict[tuple, List[Dict]]:
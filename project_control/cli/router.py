@@ -12,17 +12,20 @@ from project_control.config.patterns_loader import load_patterns
 from project_control.core.exit_codes import EXIT_OK, EXIT_VALIDATION_ERROR
 from project_control.core.ghost_service import run_ghost, write_ghost_report, write_ghost_tree_report
 from project_control.core.markdown_renderer import render_writer_report
+from project_control.core.content_store import ContentStore
+from project_control.core.search_scope import SearchScope, scope_args
 from project_control.core.snapshot_service import create_snapshot, load_snapshot, save_snapshot
+from project_control.core.symbol_index import SymbolIndex
 from project_control.core.writers import run_writers_analysis
 from project_control.core.error_handler import ErrorHandler, ErrorContext
 from project_control.utils.fs_helpers import run_rg
 from project_control.cli.graph_cmd import graph_build, graph_report, graph_trace
-from project_control.utils.renderers import render_unused, render_patterns, render_search
+from project_control.utils.renderers import render_unused, render_patterns, iter_render_search
 from project_control.render.dead_renderer import render_dead
-from project_control.analysis.dead_analyzer import analyze_dead_code
+from project_control.analysis.dead_analyzer import analyze_dead_code, build_token_index
 from project_control.analysis.unused_analyzer import analyze_unused_systems
 from project_control.analysis.patterns_analyzer import analyze_patterns
-from project_control.analysis.search_analyzer import smart_search
+from project_control.analysis.search_analyzer import iter_search, smart_search
 import json
 from project_control.cli.menu import run_menu
 
@@ -55,6 +58,25 @@ def _load_existing_snapshot() -> Optional[dict]:
         return None
 
 
+def _embed_content_store(root: Path) -> Optional[ContentStore]:
+    """ContentStore over the scan snapshot of ``root``, or None when there is no snapshot yet."""
+    snapshot_path = root / ".project-control" / "snapshot.json"
+    if not snapshot_path.exists():
+        print("No snapshot found; indexing files from disk (run 'pc scan' to index the snapshot).")
+        return None
+    return ContentStore(load_snapshot(root), snapshot_path)
+
+
+def _warn_discarded_staging(discarded: int, other_command: str) -> None:
+    """Tell the user that --resume dropped checkpointed batches of another build plan."""
+    if discarded:
+        print(
+            f"⚠️ Discarded {discarded} checkpointed batch(es) of a different build plan "
+            f"(files or settings changed, or the interrupted run was '{other_command}'; "
+            f"continue that one with '{other_command} --resume')."
+        )
+
+
 def _ensure_gitignore() -> None:
     """Add .project-control/ to .gitignore if not already present."""
     gitignore = PROJECT_DIR / ".gitignore"
@@ -224,6 +246,20 @@ def cmd_quick(args: argparse.Namespace) -> int:
         return ErrorHandler.handle(e, "Quick analysis")
 
 
+def _symbol_sections(symbol_index: SymbolIndex, symbol: str) -> str:
+    """Markdown sections listing the indexed definitions and references of a symbol."""
+    lines = []
+    for title, refs in (("Definitions", symbol_index.definitions(symbol)),
+                        ("References", symbol_index.references(symbol))):
+        lines.append(f"## {title}\n")
+        lines.extend(f"- {ref.path}:{ref.line} ({ref.kind})" for ref in refs)
+        if not refs:
+            lines.append("- none")
+        lines.append("")
+    lines.append("## Text matches\n")
+    return "\n".join(lines) + "\n"
+
+
 def cmd_find(args: argparse.Namespace) -> int:
     """Find symbol usage with error handling."""
     if not args.symbol:
@@ -234,11 +270,15 @@ def cmd_find(args: argparse.Namespace) -> int:
         with ErrorContext("Searching for symbol"):
             ensure_control_dirs()
 
-            result = run_rg(args.symbol)
+            result = run_rg(args.symbol, extra_args=scope_args(SearchScope.load(PROJECT_DIR)))
             output_path = EXPORTS_DIR / f"find_{args.symbol}.md"
 
+            # Exact definitions/references from the symbol index, when a snapshot exists
+            symbol_index = SymbolIndex.load(PROJECT_DIR)
+            sections = _symbol_sections(symbol_index, args.symbol) if symbol_index is not None else ""
+
             output_path.write_text(
-                f"# Usage of: {args.symbol}\n\n{result or 'No matches found.'}",
+                f"# Usage of: {args.symbol}\n\n{sections}{result or 'No matches found.'}",
                 encoding="utf-8",
             )
 
@@ -322,8 +362,12 @@ def cmd_dead(args: argparse.Namespace) -> int:
         # Extract file paths from snapshot
         files = [f.get("path") for f in snapshot.get("files", [])]
 
+        # Usage counts come from a token index of the snapshot content (cached per blob)
+        content_store = ContentStore(snapshot, CONTROL_DIR / "snapshot.json")
+        token_index = build_token_index(snapshot, content_store, cache_path=CONTROL_DIR / "cache" / "tokens.sqlite")
+
         # Run analysis
-        result = analyze_dead_code(files, low_usage_threshold=threshold)
+        result = analyze_dead_code(files, low_usage_threshold=threshold, token_index=token_index)
 
         if json_output:
             print(json.dumps(result, indent=2))
@@ -344,7 +388,7 @@ def cmd_unused(args: argparse.Namespace) -> int:
     try:
         json_output = getattr(args, "json", False)
         no_color = getattr(args, "no_color", False)
-        result = analyze_unused_systems(PROJECT_DIR)
+        result = analyze_unused_systems(PROJECT_DIR, symbol_index=SymbolIndex.load(PROJECT_DIR))
 
         if json_output:
             print(json.dumps(result, indent=2))
@@ -386,18 +430,23 @@ def cmd_search(args: argparse.Namespace) -> int:
         files_only = getattr(args, "files_only", False)
         json_output = getattr(args, "json", False)
         no_color = getattr(args, "no_color", False)
+        max_results = getattr(args, "max_results", None)
+        use_index = getattr(args, "index", False)
 
         if not patterns:
             print("Error: At least one pattern is required")
             return EXIT_VALIDATION_ERROR
 
-        result = smart_search(patterns, PROJECT_DIR, invert=invert, files_only=files_only)
-
         if json_output:
+            result = smart_search(patterns, PROJECT_DIR, invert=invert, files_only=files_only,
+                                  max_results=max_results, use_index=use_index)
             print(json.dumps(result, indent=2))
         else:
-            output = render_search(result, colored=not no_color)
-            _safe_print(output)
+            # Print matches as ripgrep finds them instead of after the whole scan
+            matches = iter_search(patterns, PROJECT_DIR, invert=invert, files_only=files_only,
+                                  max_results=max_results, use_index=use_index)
+            for line in iter_render_search(matches, files_only=invert or files_only, colored=not no_color):
+                _safe_print(line)
 
         return EXIT_OK
     except Exception as e:
@@ -435,9 +484,9 @@ def dispatch(args: argparse.Namespace) -> int:
         project_root = Path(getattr(args, "project_root", ".")).resolve()
         config_path = Path(args.config).resolve() if getattr(args, "config", None) else None
         if getattr(args, "graph_cmd", None) == "build":
-            return graph_build(project_root, config_path)
+            return graph_build(project_root, config_path, jobs=getattr(args, "jobs", None))
         if getattr(args, "graph_cmd", None) == "report":
-            return graph_report(project_root, config_path)
+            return graph_report(project_root, config_path, jobs=getattr(args, "jobs", None))
         if getattr(args, "graph_cmd", None) == "trace":
             direction = getattr(args, "direction", "both")
             max_depth = None if getattr(args, "no_limits", False) or getattr(args, "all", False) else getattr(args, "max_depth", None)
@@ -450,11 +499,12 @@ def dispatch(args: argparse.Namespace) -> int:
                 max_depth,
                 max_paths,
                 getattr(args, "line", False),
+                jobs=getattr(args, "jobs", None),
             )
     if args.command == "embed":
         try:
             from project_control.embedding.index_builder import build_index
-            from project_control.embedding.config import EmbedConfig
+            from project_control.embedding.config import load_embed_config
             from project_control.embedding.search_engine import SearchEngine
         except ImportError as e:
             print("❌ Embedding dependencies not installed.")
@@ -463,12 +513,26 @@ def dispatch(args: argparse.Namespace) -> int:
             return EXIT_VALIDATION_ERROR
 
         root = Path(getattr(args, "path", ".")).resolve()
-        cfg = EmbedConfig()
+        cfg = load_embed_config(root)
 
         if getattr(args, "embed_cmd", None) == "build":
             try:
-                files, chunks, dim = build_index(root, cfg, overwrite=False)
-                print(f"Embedding build complete. Files: {files}, Chunks: {chunks}, Dim: {dim}")
+                result = build_index(
+                    root,
+                    cfg,
+                    overwrite=False,
+                    resume=getattr(args, "resume", False),
+                    content_store=_embed_content_store(root),
+                    lexical_only=getattr(args, "lexical_only", False),
+                )
+                if result.resumed_batches:
+                    print(f"Resumed from checkpoint: {result.resumed_batches} batch(es) already embedded.")
+                _warn_discarded_staging(result.discarded_batches, "pc embed rebuild")
+                print(
+                    f"Embedding build complete. Files: {result.file_count}, Chunks: {result.chunk_count}, "
+                    f"Dim: {result.dim} (changed files: {result.changed_files}, embedded: {result.embedded_chunks}, "
+                    f"removed: {result.removed_chunks})"
+                )
                 print(f"Index: {cfg.index_path}")
                 return EXIT_OK
             except Exception as e:
@@ -478,18 +542,40 @@ def dispatch(args: argparse.Namespace) -> int:
                 return EXIT_VALIDATION_ERROR
         if getattr(args, "embed_cmd", None) == "rebuild":
             try:
-                files, chunks, dim = build_index(root, cfg, overwrite=True)
-                print(f"Embedding rebuild complete. Files: {files}, Chunks: {chunks}, Dim: {dim}")
+                result = build_index(
+                    root,
+                    cfg,
+                    overwrite=True,
+                    resume=getattr(args, "resume", False),
+                    content_store=_embed_content_store(root),
+                    lexical_only=getattr(args, "lexical_only", False),
+                )
+                if result.resumed_batches:
+                    print(f"Resumed from checkpoint: {result.resumed_batches} batch(es) already embedded.")
+                _warn_discarded_staging(result.discarded_batches, "pc embed build")
+                print(
+                    f"Embedding rebuild complete. Files: {result.file_count}, Chunks: {result.chunk_count}, "
+                    f"Dim: {result.dim} (changed files: {result.changed_files}, embedded: {result.embedded_chunks}, "
+                    f"removed: {result.removed_chunks})"
+                )
                 return EXIT_OK
             except Exception as e:
                 print(f"❌ Embedding rebuild failed: {e}")
                 return EXIT_VALIDATION_ERROR
         if getattr(args, "embed_cmd", None) == "search":
             try:
-                engine = SearchEngine(cfg)
-                hits = engine.search(getattr(args, "query", ""), top_k=getattr(args, "top_k", 5))
+                engine = SearchEngine(root, cfg, mode=getattr(args, "mode", None))
+                try:
+                    hits = engine.search(
+                        getattr(args, "query", ""),
+                        top_k=getattr(args, "top_k", 5),
+                        nprobe=getattr(args, "nprobe", None),
+                        ef_search=getattr(args, "ef_search", None),
+                    )
+                finally:
+                    engine.close()
                 for rank, hit in enumerate(hits, 1):
-                    print(f"  {rank}. {hit['path']} (score={hit['score']:.4f})")
+                    print(f"  {rank}. {hit.file_path} (score={hit.similarity_score:.4f})")
                 return EXIT_OK
             except Exception as e:
                 print(f"❌ Embedding search failed: {e}")
@@ -6,12 +6,14 @@ from __future__ import annotations
 
 import json
 import os
+from dataclasses import replace
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
-from ollama import embeddings as ollama_embeddings
 from hashlib import sha256 as hashlib_sha256
 
+from project_control.embedding.chunker import Chunker
+
 
 class EmbeddingService:
     """Service for computing and caching embeddings using SHA256-based cache."""
@@ -20,11 +22,33 @@ class EmbeddingService:
         self.project_root = project_root
         self.cache_dir = cache_dir or project_root / ".project-control" / "embeddings"
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.cache_file = self.cache_dir / "embeddings_cache.json"
-        self.cache: Dict[str, List[float]] = self._load_cache()
          # Configurable via patterns.yaml in future
         self.model_name = os.getenv("PC_EMBED_MODEL", "qwen3-embedding:8b-q4_K_M")
-        
+        self.provider = self._build_provider()
+        # Same chunks as `pc embed`, so both hit the same entries of the shared chunk cache
+        self.chunker = Chunker(
+            self.embed_config.chunk_size_chars, self.embed_config.overlap_chars, self.embed_config.chunk_mode
+        )
+        self.cache_file = self.cache_dir / "embeddings_cache.json"
+        self.cache: Dict[str, List[float]] = self._load_cache()
+
+    def _build_provider(self):
+        """Create the configured (and cached) embedding provider (requires the embedding extra)."""
+        try:
+            from project_control.embedding.config import load_embed_config
+            from project_control.embedding.embedding_cache import open_embedder
+        except ImportError as e:
+            raise ImportError(
+                f"Embedding dependencies not available. Install with: pip install -e '.[embedding]'\n"
+                f"Also ensure Ollama server is running: https://ollama.ai/"
+            ) from e
+        config = load_embed_config(self.project_root)
+        if config.provider == "ollama":
+            config = replace(config, model=self.model_name)
+        self.embed_config = config
+        # Chunk vectors are shared with `pc embed`, so an edit only re-embeds changed chunks
+        return open_embedder(self.project_root, config)
+
     def _load_cache(self) -> Dict[str, List[float]]:
         """Load embedding cache from JSON file."""
         if self.cache_file.exists():
@@ -38,37 +62,15 @@ class EmbeddingService:
         """Persist cache to disk."""
         self.cache_file.write_text(json.dumps(self.cache, indent=2), encoding="utf-8")
 
+    def _cache_key(self, sha256: str) -> str:
+        """File-level cache key; qualified by provider and chunking, which both shape the vector."""
+        chunking = f"{self.chunker.mode}-{self.chunker.chunk_size}-{self.chunker.overlap}"
+        return f"{self.provider.model_id}:{chunking}:{sha256}"
+
     def _compute_sha256(self, content: str) -> str:
         """Compute SHA256 hash of content (for cache key)."""
         return hashlib_sha256(content.encode("utf-8")).hexdigest()
 
-    def _chunk_content(self, content: str, chunk_size: int = 4000) -> List[str]:
-        """
-        Split content into chunks for better semantic representation.
-        For files >8KB, we compute embeddings per chunk and average them.
-        """
-        if len(content) <= chunk_size * 2:
-            return [content]  # Small files: single chunk
-        
-        lines = content.split("\n")
-        chunks = []
-        current_chunk = []
-        current_size = 0
-        
-        for line in lines:
-            line_size = len(line) + 1  # +1 for newline
-            if current_size + line_size > chunk_size and current_chunk:
-                chunks.append("\n".join(current_chunk))
-                current_chunk = []
-                current_size = 0
-            current_chunk.append(line)
-            current_size += line_size
-        
-        if current_chunk:
-            chunks.append("\n".join(current_chunk))
-        
-        return chunks[:5]  # Limit to 5 chunks max (prevents OOM on huge files)
-
     def _average_embeddings(self, embeddings: List[List[float]]) -> List[float]:
         """Average multiple embeddings into a single vector."""
         if not embeddings:
@@ -80,45 +82,44 @@ class EmbeddingService:
                 averaged[i] += emb[i]
         return [v / len(embeddings) for v in averaged]
 
-    def compute_embedding(self, content: str, sha256: str) -> List[float]:
+    def compute_embedding(self, content: str, sha256: str, file_path: str = "") -> List[float]:
         """
-        Compute embedding for content using Ollama.
+        Compute embedding for content using the configured provider.
         Uses SHA256 as cache key to avoid redundant computation.
+        The file vector is the average of its `pc embed` chunk vectors;
+        ``file_path`` (its extension) selects syntax-aware chunk boundaries.
         """
         # Check cache first
-        if sha256 in self.cache:
-            return self.cache[sha256]
-        
-        # Chunk large files for better semantic representation
-        chunks = self._chunk_content(content)
-        chunk_embeddings = []
-        
-        for chunk in chunks:
-            try:
-                result = ollama_embeddings(model=self.model_name, prompt=chunk)
-                chunk_embeddings.append(result["embedding"])
-            except ImportError as e:
-                raise ImportError(
-                    f"Ollama library not available. Install with: pip install -e '.[embedding]'\n"
-                    f"Also ensure Ollama server is running: https://ollama.ai/"
-                ) from e
-            except Exception as e:
-                print(f"⚠️  Warning: Failed to embed chunk ({e}), skipping")
-                continue
+        key = self._cache_key(sha256)
+        if key in self.cache:
+            return self.cache[key]
         
+        chunks = [chunk.text for chunk in self.chunker.iter_chunks(content, file_path)]
+        if not chunks:
+            raise ValueError("Failed to compute any embeddings for content (nothing to embed)")
+        try:
+            # All chunks go out in one batched, concurrent call
+            chunk_embeddings = self.provider.embed_batch(chunks).tolist()
+        except RuntimeError as e:
+            raise ValueError(f"Failed to compute any embeddings for content ({e})") from e
+
         if not chunk_embeddings:
             raise ValueError("Failed to compute any embeddings for content")
         
         # Average chunk embeddings for final representation
         final_embedding = self._average_embeddings(chunk_embeddings)
-        self.cache[sha256] = final_embedding
+        self.cache[key] = final_embedding
         self._save_cache()
         
         return final_embedding
 
+    def close(self) -> None:
+        """Release the provider (HTTP session, worker threads, chunk cache)."""
+        self.provider.close()
+
     def invalidate_cache(self, sha256: str) -> None:
         """Remove embedding from cache (e.g., when file content changes)."""
-        self.cache.pop(sha256, None)
+        self.cache.pop(self._cache_key(sha256), None)
         self._save_cache()
 
     def clear_cache(self) -> None:
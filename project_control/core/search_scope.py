@@ -0,0 +1,147 @@
+"""Search scope: restrict ripgrep-based analyzers to the files of the scan snapshot."""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCOPE_FILE_NAME = "search_scope.ignore"
+
+_GITIGNORE_SPECIAL = re.compile(r"([\\*?\[\]!#])")
+_GITIGNORE_ESCAPE = re.compile(r"\\(.)")
+
+
+def _escape(path: str) -> str:
+    """Escape a literal path for gitignore syntax."""
+    escaped = _GITIGNORE_SPECIAL.sub(r"\\\1", path)
+    if escaped.endswith(" "):
+        escaped = escaped[:-1] + "\\ "
+    return escaped
+
+
+def _unescape(pattern: str) -> str:
+    """Inverse of ``_escape``."""
+    return _GITIGNORE_ESCAPE.sub(r"\1", pattern)
+
+
+def _ignore_lines(paths: Iterable[str]) -> List[str]:
+    """
+    Whitelist ``paths`` in gitignore syntax: ignore everything, then re-include
+    each file and the directories leading to it (ignored directories are never
+    descended into, so node_modules and .project-control are pruned).
+    """
+    dirs: Dict[str, None] = {}
+    files: List[str] = []
+    for path in sorted(paths):
+        parts = path.split("/")
+        for depth in range(1, len(parts)):
+            dirs.setdefault("/".join(parts[:depth]), None)
+        files.append(path)
+    lines = ["*"]
+    lines.extend(f"!/{_escape(d)}/" for d in dirs)
+    lines.extend(f"!/{_escape(f)}" for f in files)
+    return lines
+
+
+class SearchScope:
+    """
+    The set of files a snapshot covers, usable as a ripgrep argument list.
+
+    ``rg_args()`` points rg at an ignore file that whitelists exactly the
+    snapshot's files, so searches skip ``.project-control/content`` blob
+    copies and everything the scan excluded, while still finding scanned
+    files that ``.gitignore`` would hide. The ignore file is written once per
+    snapshot id under ``.project-control/cache/``. Like the analyzers, rg
+    must run from the project root (ignore-file paths are anchored at the
+    working directory); ``rg_args()`` logs a warning when it does not.
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[str],
+        ignore_file: Path,
+        snapshot_id: Optional[str] = None,
+        root: Optional[Path] = None,
+    ):
+        self.paths = frozenset(paths)
+        self.ignore_file = ignore_file
+        self.snapshot_id = snapshot_id
+        self.root = root
+        self._warned_cwd = False
+
+    @classmethod
+    def for_snapshot(cls, snapshot: Dict[str, Any], control_dir: Path) -> "SearchScope":
+        """Scope of ``snapshot``; ``control_dir`` is the project's ``.project-control`` directory."""
+        paths = [
+            str(entry["path"]).replace("\\", "/")
+            for entry in snapshot.get("files", [])
+            if entry.get("path")
+        ]
+        ignore_file = control_dir / "cache" / SCOPE_FILE_NAME
+        snapshot_id = snapshot.get("snapshot_id") or None
+        header = f"# snapshot {snapshot_id or ''} {len(paths)}"
+        try:
+            with ignore_file.open(encoding="utf-8") as handle:
+                current = handle.readline().rstrip("\n") == header
+        except OSError:
+            current = False
+        if not current:
+            ignore_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = ignore_file.with_suffix(".tmp")
+            tmp.write_text("\n".join([header, *_ignore_lines(paths)]) + "\n", encoding="utf-8")
+            tmp.replace(ignore_file)
+        return cls(paths, ignore_file, snapshot_id, root=control_dir.parent)
+
+    @classmethod
+    def load(cls, project_root: Path) -> Optional["SearchScope"]:
+        """Scope of the project's saved snapshot, or None when there is no readable snapshot."""
+        control_dir = Path(project_root) / ".project-control"
+        try:
+            snapshot = json.loads((control_dir / "snapshot.json").read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.debug(f"No snapshot for search scope: {e}")
+            return None
+        return cls.for_snapshot(snapshot, control_dir)
+
+    def rg_args(self) -> List[str]:
+        """ripgrep arguments limiting a search to the scope (rg must run from ``root``)."""
+        if self.root is not None and not self._warned_cwd and Path.cwd().resolve() != Path(self.root).resolve():
+            logger.warning(
+                f"Search scope of {self.root} used from {Path.cwd()}: its paths are relative to the "
+                "project root, so a search from here matches nothing. Run from the project root."
+            )
+            self._warned_cwd = True
+        return ["--no-ignore", "--hidden", "--ignore-file", str(self.ignore_file)]
+
+    def __contains__(self, path: str) -> bool:
+        return str(path).replace("\\", "/") in self.paths
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+
+def read_scope_file(ignore_file: Path) -> Optional[List[str]]:
+    """
+    Paths whitelisted by an ignore file written by ``SearchScope.for_snapshot``.
+
+    Returns None when the file is unreadable or not in that whitelist form
+    (used by the in-process search, which does not implement gitignore).
+    """
+    try:
+        lines = Path(ignore_file).read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return None
+    lines = [line for line in lines if line and not line.startswith("#")]
+    if not lines or lines[0] != "*" or not all(line.startswith("!/") for line in lines[1:]):
+        return None
+    return [_unescape(line[2:]) for line in lines[1:] if not line.endswith("/")]
+
+
+def scope_args(scope: Optional[SearchScope]) -> List[str]:
+    """``scope.rg_args()``, or no arguments (search the working directory) without a scope."""
+    return scope.rg_args() if scope is not None else []
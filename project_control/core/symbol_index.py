@@ -0,0 +1,409 @@
+"""Symbol index over snapshot content: where names are defined, imported, called and instantiated."""
+
+from __future__ import annotations
+
+import ast
+import json
+import logging
+import re
+import sqlite3
+import zlib
+from bisect import bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from project_control.core.content_store import ContentStore
+
+logger = logging.getLogger(__name__)
+
+SYMBOL_CACHE_NAME = "symbols.sqlite"
+
+# Bump when extraction changes so cached symbol lists are recomputed.
+SYMBOL_INDEX_VERSION = 1
+
+PYTHON_EXTENSIONS = frozenset({".py", ".pyi"})
+JS_TS_EXTENSIONS = frozenset({".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx"})
+
+DEFINITION_KINDS = ("class", "function")
+REFERENCE_KINDS = ("import", "call", "new")
+
+_QUERY_CHUNK = 500
+
+# (name, kind, line)
+RawSymbol = Tuple[str, str, int]
+
+
+@dataclass(frozen=True)
+class SymbolRef:
+    name: str
+    kind: str  # "class" | "function" | "import" | "call" | "new"
+    path: str
+    line: int
+
+
+def _module_parts(specifier: str) -> List[str]:
+    """Names an import specifier refers to: "./services/UserManager.js" -> services, UserManager."""
+    parts = [p for p in re.split(r"[/\\]", specifier) if p and p not in (".", "..")]
+    if parts:
+        parts[-1] = re.sub(r"\.(?:[cm]?js|jsx|tsx?|json)$", "", parts[-1])
+    return [p.lstrip("@") for p in parts if p.lstrip("@")]
+
+
+def python_symbols(text: str) -> List[RawSymbol]:
+    """
+    Class/function definitions, imported names and call sites of Python source.
+
+    Module paths count as imports of each component (``from a.b import C``
+    imports ``a``, ``b`` and ``C``); ``obj.method()`` is a call of ``method``.
+    Instantiation is a call in Python. Returns [] for unparsable source.
+    """
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return []
+
+    found: Set[RawSymbol] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ClassDef):
+            found.add((node.name, "class", node.lineno))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            found.add((node.name, "function", node.lineno))
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                found.update((part, "import", node.lineno) for part in alias.name.split("."))
+        elif isinstance(node, ast.ImportFrom):
+            found.update((part, "import", node.lineno) for part in (node.module or "").split(".") if part)
+            found.update((alias.name, "import", node.lineno) for alias in node.names if alias.name != "*")
+        elif isinstance(node, ast.Call):
+            func = node.func
+            if isinstance(func, ast.Name):
+                found.add((func.id, "call", node.lineno))
+            elif isinstance(func, ast.Attribute):
+                found.add((func.attr, "call", node.lineno))
+    return sorted(found, key=lambda s: (s[2], s[1], s[0]))
+
+
+_JS_TOKEN_RE = re.compile(
+    r"""
+    (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+    |(?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`)
+    |(?P<number>\d[\w.]*)
+    |(?P<name>[A-Za-z_$][\w$]*)
+    |(?P<punct>=>|[^\s\w$])
+    """,
+    re.DOTALL | re.VERBOSE,
+)
+
+# Identifiers followed by "(" that are not calls
+_JS_NOT_CALLS = frozenset({
+    "if", "for", "while", "switch", "catch", "function", "return", "typeof", "new", "await",
+    "yield", "with", "super", "import", "require", "void", "delete", "in", "of", "instanceof",
+    "constructor", "do", "else", "case", "throw", "async",
+})
+
+
+def _js_tokens(text: str) -> List[Tuple[str, str, int]]:
+    """(type, value, line) tokens of JS/TS source, comments dropped."""
+    newlines = [m.start() for m in re.finditer("\n", text)]
+    tokens: List[Tuple[str, str, int]] = []
+    for match in _JS_TOKEN_RE.finditer(text):
+        kind = match.lastgroup
+        if kind == "comment":
+            continue
+        tokens.append((kind, match.group(), bisect_right(newlines, match.start()) + 1))
+    return tokens
+
+
+def _after_parens(tokens: Sequence[Tuple[str, str, int]], start: int) -> int:
+    """Index just past the ")" closing the "(" at ``start`` (len(tokens) if unbalanced)."""
+    depth = 0
+    for k in range(start, len(tokens)):
+        value = tokens[k][1]
+        if value == "(":
+            depth += 1
+        elif value == ")":
+            depth -= 1
+            if depth == 0:
+                return k + 1
+    return len(tokens)
+
+
+def _is_function_value(tokens: Sequence[Tuple[str, str, int]], k: int) -> bool:
+    """Whether the expression at ``k`` is ``function ...``, ``async ...`` or an arrow function."""
+    if k >= len(tokens):
+        return False
+    value = tokens[k][1]
+    if value in ("function", "async"):
+        return True
+    if tokens[k][0] == "name":
+        return k + 1 < len(tokens) and tokens[k + 1][1] == "=>"
+    if value == "(":
+        end = _after_parens(tokens, k)
+        return end < len(tokens) and tokens[end][1] == "=>"
+    return False
+
+
+def js_symbols(text: str) -> List[RawSymbol]:
+    """
+    Class/function definitions, imports and call/``new`` sites of JS/TS source.
+
+    A single regex tokenizer (strings and comments are skipped, so names in
+    them never count) followed by a linear scan; no parser is needed.
+    Imports record the imported names and the components of the module
+    specifier (``import { A as B } from './lib/store'`` imports ``A``,
+    ``lib`` and ``store``). Method definitions in classes count as functions.
+    """
+    tokens = _js_tokens(text)
+    n = len(tokens)
+    found: Set[RawSymbol] = set()
+    new_targets: Set[int] = set()
+
+    def value(k: int) -> str:
+        return tokens[k][1] if 0 <= k < n else ""
+
+    def is_name(k: int) -> bool:
+        return 0 <= k < n and tokens[k][0] == "name"
+
+    def add_specifier(k: int) -> None:
+        found.update((part, "import", tokens[k][2]) for part in _module_parts(tokens[k][1][1:-1]))
+
+    for i, (kind, name, line) in enumerate(tokens):
+        if kind == "string" and value(i - 1) == "from":
+            add_specifier(i)
+            continue
+        if kind != "name" or (value(i - 1) == "." and name in ("import", "class", "function")):
+            continue
+        nxt = value(i + 1)
+
+        if name == "class" and is_name(i + 1):
+            found.add((tokens[i + 1][1], "class", tokens[i + 1][2]))
+        elif name == "function":
+            k = i + 2 if nxt == "*" else i + 1
+            if is_name(k):
+                found.add((tokens[k][1], "function", tokens[k][2]))
+        elif name in ("const", "let", "var") and is_name(i + 1) and value(i + 2) == "=":
+            if _is_function_value(tokens, i + 3):
+                found.add((tokens[i + 1][1], "function", tokens[i + 1][2]))
+        elif name == "new":
+            k = i + 1
+            while is_name(k) and value(k + 1) == ".":
+                k += 2
+            if is_name(k):
+                found.add((tokens[k][1], "new", tokens[k][2]))
+                new_targets.add(k)
+        elif name == "import":
+            if nxt == "(":
+                if i + 2 < n and tokens[i + 2][0] == "string":
+                    add_specifier(i + 2)
+                continue
+            if i + 1 < n and tokens[i + 1][0] == "string":
+                add_specifier(i + 1)  # import './side-effect'
+                continue
+            # import X, { A as B } from '...': names up to "from" (the specifier is handled above)
+            k = i + 1
+            while k < n and value(k) not in ("from", ";") and tokens[k][0] != "string":
+                if is_name(k) and value(k) not in ("type", "typeof", "as") and value(k - 1) != "as":
+                    found.add((tokens[k][1], "import", tokens[k][2]))
+                k += 1
+        elif name == "require" and nxt == "(" and i + 2 < n and tokens[i + 2][0] == "string":
+            add_specifier(i + 2)
+            # const X = require(...) / const { A, B: C } = require(...)
+            if value(i - 1) == "=":
+                if is_name(i - 2):
+                    found.add((tokens[i - 2][1], "import", tokens[i - 2][2]))
+                elif value(i - 2) == "}":
+                    k = i - 3
+                    while k >= 0 and value(k) != "{":
+                        if is_name(k) and value(k - 1) != ":":
+                            found.add((tokens[k][1], "import", tokens[k][2]))
+                        k -= 1
+        elif nxt == "(" and name not in _JS_NOT_CALLS and i not in new_targets and value(i - 1) != "function":
+            end = _after_parens(tokens, i + 1)
+            if value(end) == "{" and value(i - 1) != ".":
+                found.add((name, "function", line))  # method definition: name(args) { ... }
+            else:
+                found.add((name, "call", line))
+    return sorted(found, key=lambda s: (s[2], s[1], s[0]))
+
+
+def _language(path: str) -> Optional[str]:
+    suffix = Path(path).suffix.lower()
+    if suffix in PYTHON_EXTENSIONS:
+        return "python"
+    if suffix in JS_TS_EXTENSIONS:
+        return "js_ts"
+    return None
+
+
+def file_symbols(path: str, text: str) -> Optional[List[RawSymbol]]:
+    """Symbols of ``text`` parsed according to the extension of ``path`` (None if unsupported)."""
+    language = _language(path)
+    if language == "python":
+        return python_symbols(text)
+    if language == "js_ts":
+        return js_symbols(text)
+    return None
+
+
+class SymbolCache:
+    """
+    Persistent per-blob symbol lists keyed by (sha256, language, SYMBOL_INDEX_VERSION).
+
+    Lists are stored as zlib-compressed JSON in one SQLite file, so an
+    unchanged file is never parsed twice.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS file_symbols ("
+            " sha256 TEXT NOT NULL,"
+            " language TEXT NOT NULL,"
+            " version INTEGER NOT NULL,"
+            " symbols BLOB NOT NULL,"
+            " PRIMARY KEY (sha256, language, version))"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], List[RawSymbol]]:
+        found: Dict[Tuple[str, str], List[RawSymbol]] = {}
+        unique = list(dict.fromkeys(keys))
+        for language in sorted({lang for _, lang in unique}):
+            shas = [sha for sha, lang in unique if lang == language]
+            for start in range(0, len(shas), _QUERY_CHUNK):
+                batch = shas[start:start + _QUERY_CHUNK]
+                placeholders = ",".join("?" for _ in batch)
+                rows = self._conn.execute(
+                    "SELECT sha256, symbols FROM file_symbols"
+                    f" WHERE language = ? AND version = ? AND sha256 IN ({placeholders})",
+                    [language, SYMBOL_INDEX_VERSION, *batch],
+                )
+                for sha, blob in rows:
+                    found[(sha, language)] = [tuple(s) for s in json.loads(zlib.decompress(blob))]
+        return found
+
+    def put_many(self, items: Dict[Tuple[str, str], List[RawSymbol]]) -> None:
+        rows = [
+            (sha, language, SYMBOL_INDEX_VERSION, zlib.compress(json.dumps(symbols).encode("utf-8")))
+            for (sha, language), symbols in items.items()
+        ]
+        if not rows:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO file_symbols (sha256, language, version, symbols) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class SymbolIndex:
+    """
+    Name -> definitions and references (imports, calls, instantiations) across a snapshot.
+
+    Python is parsed with ``ast``, JS/TS with a regex tokenizer; other files
+    are skipped. Built once per snapshot from ``ContentStore`` blobs, with
+    per-blob results cached by sha256, so rebuilding after a scan only
+    parses changed files. Lookups are dictionary accesses.
+    """
+
+    def __init__(self, refs: Iterable[SymbolRef]):
+        self._by_name: Dict[str, List[SymbolRef]] = {}
+        for ref in refs:
+            self._by_name.setdefault(ref.name, []).append(ref)
+        for refs_of_name in self._by_name.values():
+            refs_of_name.sort(key=lambda r: (r.path, r.line, r.kind))
+
+    @classmethod
+    def build(
+        cls,
+        snapshot: Dict[str, Any],
+        content_store: Any,
+        cache_path: Optional[Path] = None,
+    ) -> "SymbolIndex":
+        """
+        Index every Python and JS/TS file of ``snapshot`` through ``content_store``.
+
+        Args:
+            snapshot: Scan snapshot with a ``files`` list (path + sha256).
+            content_store: ContentStore used to read blobs by sha256.
+            cache_path: SQLite symbol cache; symbols of known blobs are reused.
+        """
+        entries: List[Tuple[str, str, str]] = []
+        for entry in snapshot.get("files", []):
+            path, sha = entry.get("path"), entry.get("sha256")
+            language = _language(path) if path else None
+            if sha and language:
+                entries.append((Path(path).as_posix(), sha, language))
+
+        cache = SymbolCache(cache_path) if cache_path is not None else None
+        try:
+            known = cache.get_many((sha, language) for _, sha, language in entries) if cache is not None else {}
+            fresh: Dict[Tuple[str, str], List[RawSymbol]] = {}
+            refs: List[SymbolRef] = []
+            for path, sha, language in entries:
+                key = (sha, language)
+                symbols = known.get(key)
+                if symbols is None:
+                    symbols = fresh.get(key)
+                if symbols is None:
+                    try:
+                        symbols = file_symbols(path, content_store.get_blob(sha)) or []
+                    except (FileNotFoundError, OSError):
+                        continue
+                    fresh[key] = symbols
+                refs.extend(SymbolRef(name, kind, path, line) for name, kind, line in symbols)
+            if cache is not None:
+                cache.put_many(fresh)
+        finally:
+            if cache is not None:
+                cache.close()
+        return cls(refs)
+
+    @classmethod
+    def for_snapshot(cls, snapshot: Dict[str, Any], control_dir: Path) -> "SymbolIndex":
+        """Index of ``snapshot``, cached under ``control_dir`` (the project's ``.project-control``)."""
+        content_store = ContentStore(snapshot, control_dir / "snapshot.json")
+        return cls.build(snapshot, content_store, cache_path=control_dir / "cache" / SYMBOL_CACHE_NAME)
+
+    @classmethod
+    def load(cls, project_root: Path) -> Optional["SymbolIndex"]:
+        """Index of the project's saved snapshot, or None when there is no readable snapshot."""
+        control_dir = Path(project_root) / ".project-control"
+        try:
+            snapshot = json.loads((control_dir / "snapshot.json").read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.debug(f"No snapshot for symbol index: {e}")
+            return None
+        return cls.for_snapshot(snapshot, control_dir)
+
+    def occurrences(self, name: str, kinds: Optional[Iterable[str]] = None) -> List[SymbolRef]:
+        """Occurrences of ``name`` (of the given kinds), ordered by path and line."""
+        refs = self._by_name.get(name, [])
+        if kinds is None:
+            return list(refs)
+        wanted = set(kinds)
+        return [ref for ref in refs if ref.kind in wanted]
+
+    def definitions(self, name: str) -> List[SymbolRef]:
+        """Classes and functions named ``name``."""
+        return self.occurrences(name, DEFINITION_KINDS)
+
+    def references(self, name: str) -> List[SymbolRef]:
+        """Imports, calls and instantiations of ``name``."""
+        return self.occurrences(name, REFERENCE_KINDS)
+
+    def files_with(self, name: str, kinds: Optional[Iterable[str]] = None) -> Set[str]:
+        """Paths of files with an occurrence of ``name`` (of the given kinds)."""
+        return {ref.path for ref in self.occurrences(name, kinds)}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    def __len__(self) -> int:
+        return len(self._by_name)
@@ -0,0 +1,160 @@
+"""Inverted token index over snapshot content: token -> files containing it."""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Bump when tokenization changes so cached token sets are recomputed.
+TOKEN_INDEX_VERSION = 1
+
+# Runs of identifier characters joined by "." or "-" ("os.path", "my-component.js").
+_RUN_RE = re.compile(r"[\w$]+(?:[.\-][\w$]+)*")
+_WORD_RE = re.compile(r"[\w$]+")
+# Longest segment sequence indexed inside one run; caps the quadratic expansion.
+_MAX_RUN_WORDS = 8
+
+_QUERY_CHUNK = 500
+
+
+def file_tokens(text: str) -> Set[str]:
+    """
+    Tokens of ``text``: every word and every "."/"-" joined sequence of words.
+
+    ``import x from './my-component.js'`` yields ``my``, ``component``,
+    ``my-component``, ``my-component.js``, ``component.js`` and ``js`` (among
+    others), so file names and stems are found whole, while ``user`` does
+    not match inside ``username``.
+    """
+    tokens: Set[str] = set()
+    for run in _RUN_RE.findall(text):
+        if "." not in run and "-" not in run:
+            tokens.add(run)
+            continue
+        words = [(m.start(), m.end()) for m in _WORD_RE.finditer(run)][:_MAX_RUN_WORDS]
+        for i, (start, _) in enumerate(words):
+            for _, end in words[i:]:
+                tokens.add(run[start:end])
+    return tokens
+
+
+class TokenCache:
+    """
+    Persistent per-blob token sets keyed by (sha256, TOKEN_INDEX_VERSION).
+
+    Token sets are stored zlib-compressed in one SQLite file, so an unchanged
+    file is never tokenized twice.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS file_tokens ("
+            " sha256 TEXT NOT NULL,"
+            " version INTEGER NOT NULL,"
+            " tokens BLOB NOT NULL,"
+            " PRIMARY KEY (sha256, version))"
+        )
+        self._conn.commit()
+
+    def get_many(self, shas: Iterable[str]) -> Dict[str, Set[str]]:
+        found: Dict[str, Set[str]] = {}
+        unique = list(dict.fromkeys(shas))
+        for start in range(0, len(unique), _QUERY_CHUNK):
+            batch = unique[start:start + _QUERY_CHUNK]
+            placeholders = ",".join("?" for _ in batch)
+            rows = self._conn.execute(
+                f"SELECT sha256, tokens FROM file_tokens WHERE version = ? AND sha256 IN ({placeholders})",
+                [TOKEN_INDEX_VERSION, *batch],
+            )
+            for sha, blob in rows:
+                text = zlib.decompress(blob).decode("utf-8")
+                found[sha] = set(text.split("\n")) if text else set()
+        return found
+
+    def put_many(self, items: Dict[str, Set[str]]) -> None:
+        rows = [
+            (sha, TOKEN_INDEX_VERSION, zlib.compress("\n".join(sorted(tokens)).encode("utf-8")))
+            for sha, tokens in items.items()
+        ]
+        if not rows:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO file_tokens (sha256, version, tokens) VALUES (?, ?, ?)",
+            rows,
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class TokenIndex:
+    """
+    Token -> set of snapshot file paths whose content contains the token.
+
+    Built once per snapshot from ``ContentStore`` blobs; afterwards "which
+    files mention X" is a dictionary lookup. Pass ``vocabulary`` to keep
+    only the tokens that will be queried (e.g. file stems), which keeps the
+    index small on large repositories.
+    """
+
+    def __init__(self, postings: Dict[str, Set[str]]):
+        self._postings = postings
+
+    @classmethod
+    def build(
+        cls,
+        snapshot: Dict[str, Any],
+        content_store: Any,
+        vocabulary: Optional[Iterable[str]] = None,
+        cache_path: Optional[Path] = None,
+    ) -> "TokenIndex":
+        """
+        Index every file of ``snapshot`` through ``content_store``.
+
+        Args:
+            snapshot: Scan snapshot with a ``files`` list (path + sha256).
+            content_store: ContentStore used to read blobs by sha256.
+            vocabulary: Only index these tokens (default: all tokens).
+            cache_path: SQLite token cache; token sets of known blobs are reused.
+        """
+        wanted = set(vocabulary) if vocabulary is not None else None
+        entries: List[tuple[str, str]] = [
+            (f["path"], f["sha256"]) for f in snapshot.get("files", []) if f.get("path") and f.get("sha256")
+        ]
+        cache = TokenCache(cache_path) if cache_path is not None else None
+        try:
+            known = cache.get_many(sha for _, sha in entries) if cache is not None else {}
+            fresh: Dict[str, Set[str]] = {}
+            postings: Dict[str, Set[str]] = {}
+            for path, sha in entries:
+                tokens = known.get(sha)
+                if tokens is None:
+                    tokens = fresh.get(sha)
+                if tokens is None:
+                    try:
+                        tokens = file_tokens(content_store.get_blob(sha))
+                    except (FileNotFoundError, OSError):
+                        continue
+                    fresh[sha] = tokens
+                for token in (tokens & wanted) if wanted is not None else tokens:
+                    postings.setdefault(token, set()).add(path)
+            if cache is not None:
+                cache.put_many(fresh)
+        finally:
+            if cache is not None:
+                cache.close()
+        return cls(postings)
+
+    def files_with(self, token: str) -> Set[str]:
+        """Paths of files containing ``token`` (empty set if none)."""
+        return self._postings.get(token, set())
+
+    def count(self, token: str) -> int:
+        return len(self._postings.get(token, ()))
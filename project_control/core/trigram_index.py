@@ -0,0 +1,306 @@
+"""Trigram index over snapshot blobs: narrows regex searches to candidate files."""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import sqlite3
+import zlib
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+try:  # Python 3.11+
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # pragma: no cover - Python 3.10
+    import sre_constants  # type: ignore[no-redef]
+    import sre_parse  # type: ignore[no-redef]
+
+from project_control.core.content_store import ContentStore
+from project_control.utils.rg_helper import python_compilable
+
+logger = logging.getLogger(__name__)
+
+# Bump when trigram extraction or the table layout changes.
+TRIGRAM_INDEX_VERSION = 1
+
+INDEX_FILE_NAME = "trigrams.sqlite"
+
+_QUERY_CHUNK = 500
+
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+if hasattr(sre_constants, "POSSESSIVE_REPEAT"):
+    _REPEATS.add(sre_constants.POSSESSIVE_REPEAT)
+
+# Trigram queries: ("all",) matches every file, ("tri", t) files containing t,
+# ("and", parts) / ("or", parts) combine sub-queries.
+Query = Tuple[Any, ...]
+_ALL: Query = ("all",)
+
+
+def blob_trigrams(text: str) -> Set[str]:
+    """Lowercased trigrams of ``text`` (lowercasing lets one index serve case-insensitive queries)."""
+    lowered = text.lower()
+    return {lowered[i:i + 3] for i in range(len(lowered) - 2)}
+
+
+def _and(parts: Iterable[Query]) -> Query:
+    parts = [p for p in parts if p != _ALL]
+    if not parts:
+        return _ALL
+    return parts[0] if len(parts) == 1 else ("and", tuple(parts))
+
+
+def _or(parts: Iterable[Query]) -> Query:
+    parts = list(parts)
+    if not parts or _ALL in parts:
+        return _ALL
+    return parts[0] if len(parts) == 1 else ("or", tuple(parts))
+
+
+def _literal_query(run: str) -> Query:
+    run = run.lower()
+    return _and(("tri", run[i:i + 3]) for i in range(len(run) - 2))
+
+
+def _sequence_query(items: Iterable[Tuple[Any, Any]]) -> Query:
+    """Trigrams every match of a parsed regex sequence must contain."""
+    parts: List[Query] = []
+    run: List[str] = []
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            run.append(chr(av))
+            continue
+        parts.append(_literal_query("".join(run)))
+        run = []
+        if op is sre_constants.SUBPATTERN:
+            parts.append(_sequence_query(av[-1]))
+        elif op is sre_constants.BRANCH:
+            parts.append(_or(_sequence_query(branch) for branch in av[1]))
+        elif op in _REPEATS and av[0] >= 1:
+            parts.append(_sequence_query(av[2]))
+        # anything else (classes, anchors, ".") requires nothing
+    parts.append(_literal_query("".join(run)))
+    return _and(parts)
+
+
+def regex_query(pattern: str) -> Query:
+    """
+    Trigram query a line matching ``pattern`` satisfies, or ``("all",)`` if none can be derived.
+
+    Literal runs of three or more characters become trigram conjunctions,
+    alternations become disjunctions, and optional parts are dropped, as in
+    Google Code Search. The query is a necessary condition only: candidates
+    are always verified with the regex itself.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except (re.error, RecursionError, OverflowError):
+        return _ALL
+    return _sequence_query(parsed)
+
+
+class TrigramIndex:
+    """
+    Persistent trigram -> blob postings for the files of one snapshot.
+
+    Stored in ``.project-control/cache/trigrams.sqlite``. Trigram sets are
+    cached per blob sha256, so after a new scan only changed blobs are read;
+    the posting lists are then regenerated from the cached sets. A search
+    derives a trigram query from each regex, intersects/unions the posting
+    lists of the query's trigrams, and verifies only the candidate blobs.
+    """
+
+    def __init__(self, snapshot: Dict[str, Any], content_store: Any, index_path: Path):
+        self.snapshot = snapshot
+        self.content_store = content_store
+        self.index_path = index_path
+        self._entries: List[Tuple[str, str]] = sorted(
+            (Path(f["path"]).as_posix(), f["sha256"])
+            for f in snapshot.get("files", [])
+            if f.get("path") and f.get("sha256")
+        )
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(index_path))
+        self._create_tables()
+
+    @classmethod
+    def build(cls, snapshot: Dict[str, Any], content_store: Any, index_path: Path) -> "TrigramIndex":
+        """Open the index at ``index_path``, updating it first if it was built for another snapshot."""
+        index = cls(snapshot, content_store, index_path)
+        if not index.is_current():
+            index.update()
+        return index
+
+    @classmethod
+    def load(cls, project_root: Path) -> Optional["TrigramIndex"]:
+        """Up-to-date index of the project's saved snapshot, or None when there is no readable snapshot."""
+        control_dir = Path(project_root) / ".project-control"
+        try:
+            snapshot = json.loads((control_dir / "snapshot.json").read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.debug(f"No snapshot for trigram index: {e}")
+            return None
+        content_store = ContentStore(snapshot, control_dir / "snapshot.json")
+        return cls.build(snapshot, content_store, control_dir / "cache" / INDEX_FILE_NAME)
+
+    def _create_tables(self) -> None:
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS blob_trigrams ("
+            " sha256 TEXT NOT NULL, version INTEGER NOT NULL, trigrams BLOB NOT NULL,"
+            " PRIMARY KEY (sha256, version));"
+            "CREATE TABLE IF NOT EXISTS blobs (id INTEGER PRIMARY KEY, sha256 TEXT NOT NULL UNIQUE);"
+            "CREATE TABLE IF NOT EXISTS postings (trigram TEXT PRIMARY KEY, ids BLOB NOT NULL);"
+        )
+        self._conn.commit()
+
+    def _state(self) -> str:
+        return f"{TRIGRAM_INDEX_VERSION}:{self.snapshot.get('snapshot_id', '')}:{len(self._entries)}"
+
+    def is_current(self) -> bool:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'state'").fetchone()
+        return row is not None and row[0] == self._state()
+
+    def update(self) -> None:
+        """Regenerate the postings for the current snapshot, reading only blobs not seen before."""
+        shas = sorted({sha for _, sha in self._entries})
+        known: Dict[str, Set[str]] = {}
+        for start in range(0, len(shas), _QUERY_CHUNK):
+            batch = shas[start:start + _QUERY_CHUNK]
+            placeholders = ",".join("?" for _ in batch)
+            rows = self._conn.execute(
+                f"SELECT sha256, trigrams FROM blob_trigrams WHERE version = ? AND sha256 IN ({placeholders})",
+                [TRIGRAM_INDEX_VERSION, *batch],
+            )
+            for sha, blob in rows:
+                text = zlib.decompress(blob).decode("utf-8")
+                known[sha] = {text[i:i + 3] for i in range(0, len(text), 3)}
+
+        fresh: Dict[str, Set[str]] = {}
+        for sha in shas:
+            if sha in known:
+                continue
+            try:
+                fresh[sha] = blob_trigrams(self.content_store.get_blob(sha))
+            except (FileNotFoundError, OSError):
+                fresh[sha] = set()
+
+        postings: Dict[str, array] = {}
+        for blob_id, sha in enumerate(shas):
+            for trigram in known.get(sha) or fresh.get(sha, ()):
+                ids = postings.get(trigram)
+                if ids is None:
+                    ids = postings[trigram] = array("I")
+                ids.append(blob_id)
+
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO blob_trigrams (sha256, version, trigrams) VALUES (?, ?, ?)",
+                [
+                    (sha, TRIGRAM_INDEX_VERSION, zlib.compress("".join(sorted(tris)).encode("utf-8")))
+                    for sha, tris in fresh.items()
+                ],
+            )
+            self._conn.execute("DELETE FROM blobs")
+            self._conn.execute("DELETE FROM postings")
+            self._conn.executemany("INSERT INTO blobs (id, sha256) VALUES (?, ?)", enumerate(shas))
+            self._conn.executemany(
+                "INSERT INTO postings (trigram, ids) VALUES (?, ?)",
+                ((trigram, zlib.compress(ids.tobytes())) for trigram, ids in postings.items()),
+            )
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('state', ?)", (self._state(),))
+        logger.debug(f"Trigram index: {len(shas)} blobs ({len(fresh)} read), {len(postings)} trigrams")
+
+    def _postings(self, trigrams: Sequence[str]) -> Dict[str, Set[int]]:
+        found: Dict[str, Set[int]] = {t: set() for t in trigrams}
+        for start in range(0, len(trigrams), _QUERY_CHUNK):
+            batch = list(trigrams[start:start + _QUERY_CHUNK])
+            placeholders = ",".join("?" for _ in batch)
+            rows = self._conn.execute(f"SELECT trigram, ids FROM postings WHERE trigram IN ({placeholders})", batch)
+            for trigram, blob in rows:
+                ids = array("I")
+                ids.frombytes(zlib.decompress(blob))
+                found[trigram] = set(ids)
+        return found
+
+    def _evaluate(self, query: Query, postings: Dict[str, Set[int]]) -> Set[int]:
+        op = query[0]
+        if op == "tri":
+            return postings[query[1]]
+        results = [self._evaluate(part, postings) for part in query[1]]
+        if op == "and":
+            return set.intersection(*sorted(results, key=len))
+        return set.union(*results)
+
+    @staticmethod
+    def _trigrams(query: Query) -> Set[str]:
+        if query[0] == "tri":
+            return {query[1]}
+        if query[0] == "all":
+            return set()
+        return set().union(*(TrigramIndex._trigrams(part) for part in query[1]))
+
+    @staticmethod
+    def can_search(patterns: Sequence[str]) -> bool:
+        """Whether every pattern compiles in Python and yields a trigram query (else use ripgrep)."""
+        for pattern in patterns:
+            if not python_compilable(pattern):
+                return False
+            if regex_query(pattern) == _ALL:
+                return False
+        return True
+
+    def candidates(self, patterns: Sequence[str]) -> List[str]:
+        """Snapshot paths whose content may match any of ``patterns`` (sorted)."""
+        query = _or(regex_query(p) for p in patterns)
+        if query == _ALL:
+            return [path for path, _ in self._entries]
+        trigrams = sorted(self._trigrams(query))
+        ids = self._evaluate(query, self._postings(trigrams))
+        shas = set()
+        for start in range(0, len(ids), _QUERY_CHUNK):
+            batch = sorted(ids)[start:start + _QUERY_CHUNK]
+            placeholders = ",".join("?" for _ in batch)
+            shas.update(sha for (sha,) in self._conn.execute(
+                f"SELECT sha256 FROM blobs WHERE id IN ({placeholders})", batch
+            ))
+        return [path for path, sha in self._entries if sha in shas]
+
+    def search(
+        self,
+        patterns: Sequence[str],
+        files_only: bool = False,
+        max_results: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Matches of ``patterns`` in the snapshot blobs, in the shape of ``iter_search``.
+
+        Yields ``{"file", "line", "text"}`` per matching line, or ``{"file"}``
+        per matching file with ``files_only``; files in path order.
+        """
+        # Compiled separately: inline flags such as "(?i)" must lead their own pattern
+        regexes = [re.compile(p) for p in patterns]
+        shas = dict(self._entries)
+        count = 0
+        for path in self.candidates(patterns):
+            if max_results is not None and count >= max_results:
+                return
+            try:
+                text = self.content_store.get_blob(shas[path])
+            except (FileNotFoundError, OSError):
+                continue
+            for number, line in enumerate(text.split("\n"), 1):
+                if not any(regex.search(line) for regex in regexes):
+                    continue
+                count += 1
+                if files_only:
+                    yield {"file": path}
+                    break
+                yield {"file": path, "line": number, "text": line.strip()}
+                if max_results is not None and count >= max_results:
+                    return
+
+    def close(self) -> None:
+        self._conn.close()
@@ -1,15 +1,20 @@
 from project_control.config.patterns_loader import load_patterns
-from project_control.utils.fs_helpers import run_rg
+from project_control.core.search_scope import SearchScope, scope_args
+from project_control.utils.rg_helper import run_rg_multi
 
 
 def run_writers_analysis(project_root):
     patterns = load_patterns(project_root)
     writer_patterns = patterns.get("writers", [])
 
+    # All writer patterns share a single ripgrep pass over the snapshot's files
+    scope = SearchScope.load(project_root)
+    matches = run_rg_multi({pattern: pattern for pattern in writer_patterns}, extra_args=scope_args(scope))
+
     results = {}
 
     for pattern in writer_patterns:
-        output = run_rg(pattern)
-        results[pattern] = output.strip() if output else ""
+        lines = [f"{m['file']}:{m['line']}:{m['text']}" for m in matches.get(pattern, [])]
+        results[pattern] = "\n".join(lines)
 
     return results
@@ -1,4 +1,23 @@
 """Local embedding-based semantic search (Ollama + FAISS)."""
 
-from project_control.embedding.index_builder import build_index
-from project_control.embedding.search_engine import SearchEngine, SearchResult
+import importlib
+from typing import Any
+
+# build_index and SearchEngine need numpy/faiss (the embedding extra); they are
+# imported on first use so the pure-Python parts (chunker, lexical index,
+# config) import without it.
+_LAZY = {
+    "build_index": "project_control.embedding.index_builder",
+    "SearchEngine": "project_control.embedding.search_engine",
+    "SearchResult": "project_control.embedding.search_engine",
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY[name]), name)
+    globals()[name] = value
+    return value
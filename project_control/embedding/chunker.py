@@ -1,8 +1,21 @@
 from __future__ import annotations
 
+import ast
+import re
 from dataclasses import dataclass
+from hashlib import sha256
 from pathlib import Path
-from typing import Iterable, List
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+CHUNK_MODES = ("chars", "syntax")
+
+_PY_EXTS = {".py", ".pyi"}
+_BRACE_EXTS = {".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx"}
+_MD_EXTS = {".md", ".markdown"}
+_MD_HEADING_RE = re.compile(r"(#{1,6})\s")
+
+# Candidate cut points: line-start offset -> nesting depth (shallower cuts are preferred).
+Boundaries = Dict[int, int]
 
 
 @dataclass(frozen=True)
@@ -13,32 +26,226 @@ class Chunk:
     end_offset: int
 
 
+def _line_starts(text: str) -> List[int]:
+    starts = [0]
+    pos = text.find("\n")
+    while pos != -1:
+        if pos + 1 < len(text):
+            starts.append(pos + 1)
+        pos = text.find("\n", pos + 1)
+    return starts
+
+
+def _iter_statements(nodes: List[ast.AST]) -> Iterator[ast.stmt]:
+    """Yield statements and nested statements without visiting expressions."""
+    stack = list(reversed(nodes))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.stmt):
+            yield node
+        for field in ("body", "orelse", "finalbody", "handlers", "cases"):
+            stack.extend(reversed(getattr(node, field, None) or []))
+
+
+def _python_boundaries(text: str, starts: List[int]) -> Optional[Boundaries]:
+    """Cut points at the first line (decorators and leading comments included) of every statement."""
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return None
+    lines = text.split("\n")
+    boundaries: Boundaries = {}
+    for node in _iter_statements(tree.body):
+        first = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])]) - 1
+        # Pull leading comments and blank lines along with the statement
+        while first > 0 and lines[first - 1].strip()[:1] in ("", "#"):
+            first -= 1
+        if first < len(starts):
+            depth = node.col_offset
+            boundaries[starts[first]] = min(depth, boundaries.get(starts[first], depth))
+    return boundaries
+
+
+def _brace_boundaries(text: str, starts: List[int]) -> Boundaries:
+    """
+    Cut points at line starts outside strings and comments, keyed by bracket depth.
+
+    A lightweight scanner rather than a parser: it tracks ``{([`` nesting,
+    quotes, template literals and comments, which is enough to find
+    function, class and statement boundaries in JS/TS.
+    """
+    boundaries: Boundaries = {}
+    line_set = set(starts)
+    depth = 0
+    i = 0
+    n = len(text)
+    quote = ""
+    block_comment = False
+    while i < n:
+        if i in line_set and not quote and not block_comment:
+            boundaries[i] = depth
+        ch = text[i]
+        if block_comment:
+            if ch == "*" and text.startswith("*/", i):
+                block_comment = False
+                i += 1
+        elif quote:
+            if ch == "\\":
+                i += 1
+            elif ch == quote or (ch == "\n" and quote != "`"):
+                quote = ""
+        elif ch in "\"'`":
+            quote = ch
+        elif ch == "/" and text.startswith("//", i):
+            end = text.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        elif ch == "/" and text.startswith("/*", i):
+            block_comment = True
+            i += 1
+        elif ch in "{([":
+            depth += 1
+        elif ch in "})]":
+            depth = max(0, depth - 1)
+        i += 1
+
+    # Keep leading comments and decorators with the code they annotate
+    previous = ""
+    for start, line in zip(starts, text.split("\n")):
+        if previous.startswith(("//", "/*", "*", "@")):
+            boundaries.pop(start, None)
+        previous = line.strip()
+    return boundaries
+
+
+def _markdown_boundaries(text: str, starts: List[int]) -> Boundaries:
+    """Cut at headings (by level) and, less preferably, at paragraph starts."""
+    boundaries: Boundaries = {}
+    previous_blank = True
+    for start, line in zip(starts, text.split("\n")):
+        heading = _MD_HEADING_RE.match(line)
+        if heading:
+            boundaries[start] = len(heading.group(1)) - 1
+        elif previous_blank and line.strip():
+            boundaries[start] = 6
+        previous_blank = not line.strip()
+    return boundaries
+
+
 class Chunker:
-    def __init__(self, chunk_size_chars: int = 800, overlap_chars: int = 200):
+    """
+    Split file text into chunks of at most ``chunk_size_chars``.
+
+    ``mode="chars"`` slides a fixed window with ``overlap_chars`` of overlap.
+    ``mode="syntax"`` cuts at statement boundaries instead: Python via
+    ``ast``, JS/TS via a brace scanner, Markdown at headings and paragraphs.
+    It prefers the shallowest boundaries (top-level functions and classes),
+    only descends into a body that does not fit, packs small neighbours
+    together and falls back to plain windows for a single oversized line.
+    Syntax chunks do not overlap, and identical chunks within a file are
+    emitted once. Other file types always use character windows.
+    """
+
+    def __init__(self, chunk_size_chars: int = 800, overlap_chars: int = 200, mode: str = "chars"):
+        if mode not in CHUNK_MODES:
+            raise ValueError(f"Unknown chunk mode: {mode!r} (expected one of {', '.join(CHUNK_MODES)})")
         self.chunk_size = chunk_size_chars
         self.overlap = overlap_chars
+        self.mode = mode
 
     def chunk_file(self, path: Path) -> List[Chunk]:
         text = path.read_text(encoding="utf-8", errors="replace")
+        return self.chunk_text(text, path.as_posix())
+
+    def chunk_text(self, text: str, file_path: str) -> List[Chunk]:
+        return list(self.iter_chunks(text, file_path))
+
+    def iter_chunks(self, text: str, file_path: str) -> Iterator[Chunk]:
+        """Yield chunks of ``text`` in file order."""
         if not text:
-            return []
-        chunks: List[Chunk] = []
-        step = max(1, self.chunk_size - self.overlap)
-        start = 0
-        length = len(text)
-        while start < length:
-            end = min(length, start + self.chunk_size)
+            return
+        boundaries = self._boundaries(text, file_path) if self.mode == "syntax" else None
+        if boundaries is None:
+            spans = self._windows(0, len(text), max(1, self.chunk_size - self.overlap))
+            for start, end in spans:
+                yield Chunk(text=text[start:end], file_path=file_path, start_offset=start, end_offset=end)
+            return
+
+        seen = set()
+        for start, end in self._pack(self._fit(0, len(text), sorted(boundaries.items()))):
             piece = text[start:end]
-            if piece:
-                chunks.append(
-                    Chunk(
-                        text=piece,
-                        file_path=path.as_posix(),
-                        start_offset=start,
-                        end_offset=end,
-                    )
-                )
-            if end == length:
+            if not piece.strip():
+                continue
+            digest = sha256(piece.strip().encode("utf-8")).digest()
+            if digest in seen:
+                continue
+            seen.add(digest)
+            yield Chunk(text=piece, file_path=file_path, start_offset=start, end_offset=end)
+
+    def _boundaries(self, text: str, file_path: str) -> Optional[Boundaries]:
+        suffix = Path(file_path).suffix.lower()
+        scanner: Optional[Callable[[str, List[int]], Optional[Boundaries]]] = None
+        if suffix in _PY_EXTS:
+            scanner = _python_boundaries
+        elif suffix in _BRACE_EXTS:
+            scanner = _brace_boundaries
+        elif suffix in _MD_EXTS:
+            scanner = _markdown_boundaries
+        if scanner is None:
+            return None
+        starts = _line_starts(text)
+        boundaries = scanner(text, starts)
+        if boundaries is None:
+            # Unparseable Python: fall back to indentation as the depth
+            boundaries = {
+                start: len(line) - len(line.lstrip())
+                for start, line in zip(starts, text.split("\n"))
+                if line.strip()
+            }
+        return boundaries
+
+    def _windows(self, start: int, end: int, step: int) -> List[Tuple[int, int]]:
+        spans = []
+        while start < end:
+            stop = min(end, start + self.chunk_size)
+            spans.append((start, stop))
+            if stop == end:
                 break
             start += step
-        return chunks
+        return spans
+
+    def _fit(
+        self, start: int, end: int, boundaries: List[Tuple[int, int]], start_depth: Optional[int] = None
+    ) -> List[Tuple[int, int]]:
+        """Split [start, end) at its shallowest inner boundaries until every piece fits."""
+        if end - start <= self.chunk_size:
+            return [(start, end)]
+        inner = [(pos, depth) for pos, depth in boundaries if start < pos < end]
+        if not inner:
+            return self._windows(start, end, self.chunk_size)
+        shallowest = min(depth for _, depth in inner)
+        cuts = [pos for pos, depth in inner if depth == shallowest]
+        if start_depth is not None and start_depth < shallowest and len(cuts) > 1:
+            # [start, first cut) is a header such as "class Widget:"; keep it with its first member
+            cuts = cuts[1:]
+        deeper = [(pos, depth) for pos, depth in inner if depth != shallowest]
+        pieces: List[Tuple[int, int]] = []
+        bounds = [start] + cuts + [end]
+        for index, (left, right) in enumerate(zip(bounds, bounds[1:])):
+            depth = start_depth if index == 0 else shallowest
+            pieces.extend(self._fit(left, right, deeper, depth))
+        return pieces
+
+    def _pack(self, pieces: List[Tuple[int, int]]) -> Iterator[Tuple[int, int]]:
+        """Merge consecutive pieces while the merged span still fits."""
+        current: Optional[Tuple[int, int]] = None
+        for start, end in pieces:
+            if current is None:
+                current = (start, end)
+            elif end - current[0] <= self.chunk_size:
+                current = (current[0], end)
+            else:
+                yield current
+                current = (start, end)
+        if current is not None:
+            yield current
@@ -1,16 +1,55 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from pathlib import Path
+from typing import Any, Dict, Union
+
+from project_control.config.patterns_loader import load_patterns
 
 
 @dataclass(frozen=True)
 class EmbedConfig:
+    # "ollama" (HTTP server) or "hashing" (offline feature hashing, no network)
+    provider: str = "ollama"
+    hashing_dim: int = 1024
     base_url: str = "http://localhost:11434"
     model: str = "nomic-embed-text"
     chunk_size_chars: int = 800
     overlap_chars: int = 200
+    # "chars" (fixed windows with overlap) or "syntax" (cut at function/class
+    # boundaries: ast for Python, a brace scanner for JS/TS; no overlap).
+    chunk_mode: str = "chars"
     exts: tuple[str, ...] = (".js", ".ts", ".md")
+    # HTTP client tuning: texts per request, concurrent requests, retry policy.
+    batch_size: int = 16
+    max_in_flight: int = 4
+    max_retries: int = 3
+    retry_backoff_s: float = 0.5
+    request_timeout_s: float = 60.0
+    # FAISS index: "flat" (exact), "ivf_flat", "ivf_pq" or "hnsw". Quantized
+    # types are trained on up to train_sample vectors; ivf_nlist=0 picks ~4*sqrt(N).
+    index_type: str = "flat"
+    # "auto" uses FAISS when installed and a pure-NumPy exact index otherwise.
+    index_backend: str = "auto"
+    ivf_nlist: int = 0
+    pq_m: int = 16
+    pq_nbits: int = 8
+    hnsw_m: int = 32
+    train_sample: int = 50000
+    # Query-time defaults (overridable per SearchEngine.search call).
+    nprobe: int = 16
+    ef_search: int = 64
+    # pc embed search: "vector", "lexical" (BM25, no server) or "hybrid"
+    # (BM25 candidates reranked by vectors, or fused by reciprocal rank fusion).
+    search_mode: str = "vector"
+    hybrid_candidates: int = 100
+    rrf_k: int = 60
+    # Query vectors cached per model in cache.sqlite (LRU; 0 disables the
+    # on-disk tier) and an append-only log of searches in queries.jsonl.
+    query_cache_entries: int = 10000
+    query_log: bool = True
+    # Chunks embedded per checkpoint; each checkpoint is committed to the staging dir.
+    checkpoint_chunks: int = 512
 
     @property
     def embedding_dir(self) -> Path:
@@ -22,8 +61,38 @@ class EmbedConfig:
 
     @property
     def metadata_path(self) -> Path:
-        return self.embedding_dir / "metadata.json"
+        return self.embedding_dir / "chunks.sqlite"
 
     @property
     def meta_path(self) -> Path:
         return self.embedding_dir / "meta.json"
+
+    @property
+    def staging_dir(self) -> Path:
+        return self.embedding_dir / "staging"
+
+    @property
+    def cache_path(self) -> Path:
+        return self.embedding_dir / "cache.sqlite"
+
+    @property
+    def query_log_path(self) -> Path:
+        return self.embedding_dir / "queries.jsonl"
+
+
+def load_embed_config(project_root: Union[str, Path]) -> EmbedConfig:
+    """
+    Build an EmbedConfig from the ``embedding`` section of patterns.yaml.
+
+    Unknown keys (e.g. the semantic detector thresholds) are ignored so the
+    section can be shared between the ghost detector and ``pc embed``.
+    """
+    section = load_patterns(project_root).get("embedding") or {}
+    if not isinstance(section, dict):
+        return EmbedConfig()
+
+    known = {f.name for f in fields(EmbedConfig)}
+    values: Dict[str, Any] = {key: value for key, value in section.items() if key in known}
+    if "exts" in values:
+        values["exts"] = tuple(values["exts"])
+    return EmbedConfig(**values)
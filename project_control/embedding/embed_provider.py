@@ -1,47 +1,227 @@
 from __future__ import annotations
 
+import math
+import re
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Protocol, Tuple
+
 import requests
 import numpy as np
-from typing import List
+from requests.adapters import HTTPAdapter
 
 from project_control.embedding.config import EmbedConfig
 
+# Status codes worth retrying: rate limiting and transient server errors.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
-class OllamaEmbedProvider:
-    def __init__(self, config: EmbedConfig):
+
+def _build_session(pool_size: int) -> requests.Session:
+    """Create a session whose connection pool can serve ``pool_size`` concurrent requests."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class EmbedProvider(Protocol):
+    """Interface for embedding backends selectable via ``EmbedConfig.provider``."""
+
+    # Identifies the vector space; used as the embedding cache key.
+    model_id: str
+    # Whether vectors are worth persisting in the chunk cache.
+    cacheable: bool
+
+    def embed(self, text: str) -> np.ndarray:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def embed_batch(self, texts: list[str]) -> np.ndarray:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def close(self) -> None:  # pragma: no cover - interface
+        raise NotImplementedError
+
+
+class OllamaEmbedProvider(EmbedProvider):
+    """
+    Embedding client for an Ollama server.
+
+    Texts are grouped into batches of ``config.batch_size`` and sent to the
+    batch endpoint (``/api/embed``) with at most ``config.max_in_flight``
+    requests running concurrently over one pooled session. Servers without the
+    batch endpoint fall back to one ``/api/embeddings`` request per text.
+    """
+
+    def __init__(self, config: EmbedConfig, session: Optional[requests.Session] = None):
         self.config = config
+        self.model_id = config.model
+        self.cacheable = True
+        self.session = session or _build_session(config.max_in_flight)
+        self._batch_supported: Optional[bool] = None
+        # Connection errors are only retried once the server has answered at
+        # least once; a server that is simply not running fails fast.
+        self._reachable = False
 
-    def _call(self, text: str) -> List[float]:
-        url = f"{self.config.base_url.rstrip('/')}/api/embeddings"
-        try:
-            resp = requests.post(
-                url,
-                json={"model": self.config.model, "input": text},
-                timeout=60,
-            )
-        except requests.ConnectionError as exc:
-            raise RuntimeError(
-                f"Cannot connect to Ollama server at {self.config.base_url}\n"
-                f"Ensure Ollama is running: ollama serve\n"
-                f"Download model: ollama pull {self.config.model}\n"
-                f"Get Ollama: https://ollama.ai/"
-            ) from exc
-        except requests.RequestException as exc:
-            raise RuntimeError(f"Ollama request failed: {exc}") from exc
-        if resp.status_code != 200:
-            raise RuntimeError(f"Ollama error {resp.status_code}: {resp.text}")
-        data = resp.json()
-        emb = data.get("embedding")
+    def _url(self, endpoint: str) -> str:
+        return f"{self.config.base_url.rstrip('/')}{endpoint}"
+
+    def _post(self, endpoint: str, payload: dict) -> requests.Response:
+        """POST with exponential backoff on connection errors and retryable statuses."""
+        attempts = max(1, self.config.max_retries + 1)
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            try:
+                resp = self.session.post(
+                    self._url(endpoint),
+                    json=payload,
+                    timeout=self.config.request_timeout_s,
+                )
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if last_attempt or not self._reachable:
+                    if isinstance(exc, requests.ConnectionError):
+                        raise RuntimeError(
+                            f"Cannot connect to Ollama server at {self.config.base_url}\n"
+                            f"Ensure Ollama is running: ollama serve\n"
+                            f"Download model: ollama pull {self.config.model}\n"
+                            f"Get Ollama: https://ollama.ai/"
+                        ) from exc
+                    raise RuntimeError(f"Ollama request failed: {exc}") from exc
+            except requests.RequestException as exc:
+                raise RuntimeError(f"Ollama request failed: {exc}") from exc
+            else:
+                self._reachable = True
+                if resp.status_code not in RETRY_STATUSES or last_attempt:
+                    return resp
+            time.sleep(self.config.retry_backoff_s * (2 ** attempt))
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    @staticmethod
+    def _validate(emb: object) -> List[float]:
         if not isinstance(emb, list) or not all(isinstance(v, (int, float)) for v in emb):
             raise RuntimeError("Invalid embedding payload from Ollama")
         return [float(v) for v in emb]
 
+    def _call(self, text: str) -> List[float]:
+        resp = self._post("/api/embeddings", {"model": self.config.model, "prompt": text})
+        if resp.status_code != 200:
+            raise RuntimeError(f"Ollama error {resp.status_code}: {resp.text}")
+        return self._validate(resp.json().get("embedding"))
+
+    def _call_batch(self, texts: List[str]) -> List[List[float]]:
+        if self._batch_supported is not False:
+            resp = self._post("/api/embed", {"model": self.config.model, "input": texts})
+            if resp.status_code == 404 and self._batch_supported is None:
+                # Older Ollama releases only expose the single-text endpoint.
+                self._batch_supported = False
+            elif resp.status_code != 200:
+                raise RuntimeError(f"Ollama error {resp.status_code}: {resp.text}")
+            else:
+                self._batch_supported = True
+                embeddings = resp.json().get("embeddings")
+                if not isinstance(embeddings, list) or len(embeddings) != len(texts):
+                    raise RuntimeError("Invalid embedding payload from Ollama")
+                return [self._validate(emb) for emb in embeddings]
+        return [self._call(text) for text in texts]
+
     def embed(self, text: str) -> np.ndarray:
-        vec = self._call(text)
+        vec = self._call_batch([text])[0]
         return np.array(vec, dtype=np.float32)
 
     def embed_batch(self, texts: list[str]) -> np.ndarray:
-        vectors = [self.embed(t) for t in texts]
-        if not vectors:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        size = max(1, self.config.batch_size)
+        groups = [texts[i:i + size] for i in range(0, len(texts), size)]
+        workers = max(1, min(self.config.max_in_flight, len(groups)))
+        if workers == 1:
+            results = [self._call_batch(group) for group in groups]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(self._call_batch, groups))
+        vectors = [vec for group in results for vec in group]
+        return np.array(vectors, dtype=np.float32)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class HashingEmbedProvider(EmbedProvider):
+    """
+    Offline, deterministic embeddings via feature hashing.
+
+    Identifiers are split into lowercase sub-tokens (``parseHttpResponse`` ->
+    ``parse``, ``http``, ``response``); each token and sub-token is hashed with
+    CRC32 into one of ``config.hashing_dim`` signed buckets, weighted by
+    ``1 + log(tf)`` and L2-normalised. No network, no fitted vocabulary, and the
+    same text always maps to the same vector on every machine.
+    """
+
+    _TOKEN_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|[0-9]+")
+    _SUBTOKEN_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+    _MEMO_LIMIT = 200_000
+
+    def __init__(self, config: EmbedConfig):
+        self.config = config
+        self.dim = max(8, int(config.hashing_dim))
+        self.model_id = f"hashing-v1:{self.dim}"
+        # Recomputing is cheaper than a cache round-trip.
+        self.cacheable = False
+        self._memo: Dict[str, Tuple[Tuple[int, float], ...]] = {}
+
+    def _expand(self, token: str) -> Tuple[Tuple[int, float], ...]:
+        """Hashed buckets for a raw token and its identifier sub-tokens (memoised)."""
+        cached = self._memo.get(token)
+        if cached is None:
+            lowered = token.lower()
+            features = [lowered]
+            parts = self._SUBTOKEN_RE.findall(token)
+            if len(parts) > 1:
+                features.extend(part.lower() for part in parts)
+            buckets = []
+            for feature in features:
+                digest = zlib.crc32(feature.encode("utf-8"))
+                buckets.append((digest % self.dim, 1.0 if (digest >> 31) & 1 else -1.0))
+            cached = tuple(buckets)
+            if len(self._memo) < self._MEMO_LIMIT:
+                self._memo[token] = cached
+        return cached
+
+    def embed(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        tf: Dict[Tuple[int, float], int] = {}
+        for token, count in Counter(self._TOKEN_RE.findall(text)).items():
+            for bucket in self._expand(token):
+                tf[bucket] = tf.get(bucket, 0) + count
+        if not tf:
+            return vec
+        idx = np.fromiter((bucket for bucket, _ in tf), dtype=np.int64, count=len(tf))
+        weights = np.fromiter(
+            (sign * (1.0 + math.log(count)) for (_, sign), count in tf.items()),
+            dtype=np.float32,
+            count=len(tf),
+        )
+        np.add.at(vec, idx, weights)
+        norm = float(np.linalg.norm(vec))
+        if norm > 0:
+            vec /= norm
+        return vec
+
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
+        if not texts:
             return np.zeros((0, 0), dtype=np.float32)
-        return np.stack(vectors, axis=0)
+        return np.stack([self.embed(text) for text in texts], axis=0)
+
+    def close(self) -> None:
+        pass
+
+
+def build_provider(config: EmbedConfig) -> EmbedProvider:
+    """Instantiate the provider named by ``config.provider``."""
+    if config.provider == "ollama":
+        return OllamaEmbedProvider(config)
+    if config.provider == "hashing":
+        return HashingEmbedProvider(config)
+    raise ValueError(f"Unknown embedding provider: {config.provider!r} (expected 'ollama' or 'hashing')")
@@ -0,0 +1,140 @@
+"""Chunk-level embedding cache shared by the ghost semantic detector and ``pc embed``."""
+
+from __future__ import annotations
+
+import sqlite3
+from hashlib import sha256
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from project_control.embedding.config import EmbedConfig
+from project_control.embedding.embed_provider import EmbedProvider, build_provider
+
+# Keep well below SQLITE_MAX_VARIABLE_NUMBER on old SQLite builds (999).
+_QUERY_CHUNK = 500
+
+
+def chunk_key(text: str) -> str:
+    """Cache key for a chunk of text (sha256 of its UTF-8 bytes)."""
+    return sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent store of embedding vectors keyed by (model, chunk text hash).
+
+    Vectors are kept as raw float32 blobs in a single SQLite file, so lookups
+    for thousands of chunks cost a handful of indexed queries.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors ("
+            " model TEXT NOT NULL,"
+            " chunk_sha TEXT NOT NULL,"
+            " dim INTEGER NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " PRIMARY KEY (model, chunk_sha))"
+        )
+        self._conn.commit()
+
+    def get_many(self, model: str, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Return cached vectors for the given keys; missing keys are omitted."""
+        found: Dict[str, np.ndarray] = {}
+        unique = list(dict.fromkeys(keys))
+        for start in range(0, len(unique), _QUERY_CHUNK):
+            batch = unique[start:start + _QUERY_CHUNK]
+            placeholders = ",".join("?" for _ in batch)
+            rows = self._conn.execute(
+                f"SELECT chunk_sha, dim, vector FROM vectors WHERE model = ? AND chunk_sha IN ({placeholders})",
+                [model, *batch],
+            )
+            for key, dim, blob in rows:
+                vec = np.frombuffer(blob, dtype=np.float32)
+                if vec.shape[0] == dim:
+                    found[key] = vec
+        return found
+
+    def put_many(self, model: str, items: Iterable[Tuple[str, np.ndarray]]) -> None:
+        rows = [
+            (model, key, int(vec.shape[0]), np.asarray(vec, dtype=np.float32).tobytes())
+            for key, vec in items
+        ]
+        if not rows:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO vectors (model, chunk_sha, dim, vector) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        self._conn.commit()
+
+    def clear(self, model: str | None = None) -> None:
+        if model is None:
+            self._conn.execute("DELETE FROM vectors")
+        else:
+            self._conn.execute("DELETE FROM vectors WHERE model = ?", (model,))
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class CachedEmbedder:
+    """
+    Wrap an embedding provider so only chunks missing from the cache are sent to it.
+
+    Exposes the same ``embed`` / ``embed_batch`` interface as the provider.
+    """
+
+    def __init__(self, provider: EmbedProvider, cache: EmbeddingCache, model: str):
+        self.provider = provider
+        self.cache = cache
+        self.model = model
+        self.model_id = model
+        self.hits = 0
+        self.misses = 0
+
+    def embed(self, text: str) -> np.ndarray:
+        return self.embed_batch([text])[0]
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        keys = [chunk_key(text) for text in texts]
+        vectors = self.cache.get_many(self.model, keys)
+
+        pending: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in pending:
+                pending[key] = text
+        self.hits += len(texts) - len(pending)
+        self.misses += len(pending)
+
+        if pending:
+            fresh = self.provider.embed_batch(list(pending.values()))
+            computed = list(zip(pending.keys(), fresh))
+            self.cache.put_many(self.model, computed)
+            vectors.update(computed)
+
+        return np.stack([vectors[key] for key in keys], axis=0).astype(np.float32, copy=False)
+
+    def close(self) -> None:
+        self.cache.close()
+        self.provider.close()
+
+
+def open_embedder(project_root: Path, cfg: EmbedConfig):
+    """
+    Build the configured provider, wrapped in the shared chunk cache when worthwhile.
+
+    Callers must ``close()`` the returned embedder.
+    """
+    provider = build_provider(cfg)
+    if not provider.cacheable:
+        return provider
+    return CachedEmbedder(provider, EmbeddingCache(project_root / cfg.cache_path), provider.model_id)
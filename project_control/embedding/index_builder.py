@@ -2,19 +2,47 @@ from __future__ import annotations
 
 import json
 import os
+from datetime import datetime, timezone
+from hashlib import sha256
 from pathlib import Path
-from typing import List, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
-import faiss
 import numpy as np
 
 from project_control.embedding.config import EmbedConfig
 from project_control.embedding.chunker import Chunker, Chunk
-from project_control.embedding.embed_provider import OllamaEmbedProvider
+from project_control.embedding.embedding_cache import open_embedder
+from project_control.embedding.index_factory import (
+    create_index,
+    delete_index,
+    index_exists,
+    read_index,
+    remove_ids,
+    resolve_backend,
+    write_index,
+)
+from project_control.embedding.metadata_store import ChunkMetadataStore
+from project_control.embedding.staging import BuildStaging
 from project_control.config.patterns_loader import load_patterns
+from project_control.core.content_store import ContentStore
 
 IGNORE_DIRS = {".git", ".project-control", "node_modules", "__pycache__"}
 
+# Bumped whenever the on-disk index/metadata layout changes incompatibly.
+INDEX_FORMAT_VERSION = 4
+
+
+class BuildResult(NamedTuple):
+    file_count: int
+    chunk_count: int
+    dim: int
+    embedded_chunks: int
+    removed_chunks: int
+    changed_files: int
+    resumed_batches: int = 0
+    # Staged batches of a different plan dropped by resume=True
+    discarded_batches: int = 0
+
 
 def _normalize(vecs: np.ndarray) -> np.ndarray:
     if vecs.size == 0:
@@ -35,61 +63,258 @@ def _iter_files(root: Path, exts: Tuple[str, ...], ignore_dirs: set[str]) -> Lis
     return sorted(files, key=lambda p: p.as_posix())
 
 
-def build_index(project_root: Path, cfg: EmbedConfig, overwrite: bool = False) -> Tuple[int, int, int]:
-    embedding_dir = project_root / cfg.embedding_dir
-    embedding_dir.mkdir(parents=True, exist_ok=True)
+def _snapshot_sources(content_store: ContentStore, exts: Tuple[str, ...]) -> Tuple[Dict[str, str], Callable[[str, str], str]]:
+    """Files (posix path -> sha256) and a blob reader taken from the scan snapshot."""
+    current: Dict[str, str] = {}
+    for entry in content_store.snapshot.get("files", []):
+        path = Path(entry.get("path", "")).as_posix()
+        digest = entry.get("sha256")
+        if path and digest and Path(path).suffix in exts and content_store.has_blob(digest):
+            current[path] = digest
+    return dict(sorted(current.items())), lambda _path, digest: content_store.get_blob(digest)
 
-    if not overwrite and cfg.index_path.exists():
-        raise RuntimeError("Index exists; use rebuild.")
 
+def _disk_sources(project_root: Path, exts: Tuple[str, ...]) -> Tuple[Dict[str, str], Callable[[str, str], str]]:
+    """Files (posix path -> sha256) and a reader taken from a fresh walk of the tree."""
     patterns = load_patterns(str(project_root))
     ignore_dirs = set(patterns.get("ignore_dirs", [])) | IGNORE_DIRS
+    current: Dict[str, str] = {}
+    for path in _iter_files(project_root, exts, ignore_dirs):
+        current[path.as_posix()] = sha256((project_root / path).read_bytes()).hexdigest()
 
-    files = _iter_files(project_root, cfg.exts, ignore_dirs)
-    chunker = Chunker(cfg.chunk_size_chars, cfg.overlap_chars)
-    provider = OllamaEmbedProvider(cfg)
-
-    chunks: List[Chunk] = []
-    for path in files:
-        chunks.extend(chunker.chunk_file(project_root / path))
-
-    vectors = []
-    metadata = []
-    for idx, chunk in enumerate(chunks, start=1):
-        vec = provider.embed(chunk.text)
-        vectors.append(vec)
-        preview = chunk.text[:200].replace("\n", " ").replace("\r", " ")
-        metadata.append(
-            {
-                "id": idx,
-                "file_path": chunk.file_path,
-                "start_offset": chunk.start_offset,
-                "end_offset": chunk.end_offset,
-                "preview_text": preview,
-            }
-        )
+    def read(file_path: str, _digest: str) -> str:
+        return (project_root / file_path).read_text(encoding="utf-8", errors="replace")
 
-    if vectors:
-        dim = len(vectors[0])
-        matrix = np.stack(vectors, axis=0).astype(np.float32)
-        matrix = _normalize(matrix)
-        index = faiss.IndexFlatIP(dim)
-        index.add(matrix)
-        faiss.write_index(index, str(cfg.index_path))
-    else:
-        dim = 0
-        faiss.write_index(faiss.IndexFlatIP(0), str(cfg.index_path))
+    return current, read
+
+
+def _load_meta(path: Path) -> Dict:
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (json.JSONDecodeError, OSError):
+        return {}
 
-    cfg.metadata_path.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
-    meta_payload = {
-        "model": cfg.model,
-        "dim": dim,
+
+def _is_compatible(
+    meta: Dict, cfg: EmbedConfig, model_id: Optional[str], backend: str, lexical_only: bool = False
+) -> bool:
+    """An existing index can be updated in place only if it was built the same way."""
+    return (
+        meta.get("format_version") == INDEX_FORMAT_VERSION
+        and (lexical_only or meta.get("backend", "faiss") == backend)
+        and meta.get("lexical_only", False) == lexical_only
+        and meta.get("model") == model_id
+        and meta.get("chunk_size_chars") == cfg.chunk_size_chars
+        and meta.get("overlap_chars") == cfg.overlap_chars
+        and meta.get("chunk_mode", "chars") == cfg.chunk_mode
+        and meta.get("index_config", "flat") == cfg.index_type
+    )
+
+
+def _training_sample(staging: BuildStaging, total: int, limit: int) -> np.ndarray:
+    """Evenly strided sample of at most ``limit`` staged vectors, read one batch at a time."""
+    stride = max(1, -(-total // max(1, limit)))
+    parts: List[np.ndarray] = []
+    offset = 0
+    for _, matrix in staging.iter_batches():
+        first = (-offset) % stride
+        parts.append(matrix[first::stride])
+        offset += len(matrix)
+    return np.ascontiguousarray(np.vstack(parts)[:limit], dtype=np.float32)
+
+
+def _plan_key(cfg: EmbedConfig, model_id: str, base: str, stale_ids: List[int], changed: List[Tuple[str, str]], next_id: int) -> str:
+    payload = {
+        "format_version": INDEX_FORMAT_VERSION,
+        "model": model_id,
         "chunk_size_chars": cfg.chunk_size_chars,
         "overlap_chars": cfg.overlap_chars,
-        "created_at": __import__("datetime").datetime.utcnow().isoformat() + "Z",
-        "file_count": len(files),
-        "chunk_count": len(chunks),
+        "chunk_mode": cfg.chunk_mode,
+        "checkpoint_chunks": cfg.checkpoint_chunks,
+        "base": base,
+        "stale_ids": stale_ids,
+        "changed": changed,
+        "next_id": next_id,
     }
-    cfg.meta_path.write_text(json.dumps(meta_payload, indent=2), encoding="utf-8")
+    return sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _iter_batches(chunks: Iterable[Tuple[int, Chunk]], size: int) -> Iterator[List[Tuple[int, Chunk]]]:
+    batch: List[Tuple[int, Chunk]] = []
+    for item in chunks:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
 
-    return len(files), len(chunks), dim
+def build_index(
+    project_root: Path,
+    cfg: EmbedConfig,
+    overwrite: bool = False,
+    resume: bool = False,
+    content_store: Optional[ContentStore] = None,
+    lexical_only: bool = False,
+) -> BuildResult:
+    """
+    Build or incrementally update the embedding index.
+
+    Files whose sha256 is unchanged keep their vectors; vectors of changed or
+    deleted files are removed by chunk id, and only new or changed files are
+    chunked and embedded. ``overwrite=True`` discards the existing index.
+
+    Vectors are embedded in batches of ``cfg.checkpoint_chunks`` and committed
+    to a staging directory as they complete, so memory stays bounded by one
+    batch and ``resume=True`` continues an interrupted build of the same plan
+    from its last committed batch. A fresh plan (``overwrite=True``) is only
+    resumable by another ``overwrite=True`` build; staging of a different plan
+    is discarded and counted in ``discarded_batches``.
+
+    With a ``content_store`` the file list, sha256 values and contents come
+    from the ``pc scan`` snapshot and its blobs, so the index matches the
+    analyzed snapshot and the tree is not walked again. Without one the tree
+    is walked and hashed directly.
+
+    Every chunk is also added to the BM25 lexical index. ``lexical_only=True``
+    skips embedding altogether (no provider, no vector index), which keeps
+    ``pc embed search --mode lexical`` usable without an embedding server.
+    """
+    embedding_dir = project_root / cfg.embedding_dir
+    embedding_dir.mkdir(parents=True, exist_ok=True)
+    index_path = project_root / cfg.index_path
+    metadata_path = project_root / cfg.metadata_path
+    meta_path = project_root / cfg.meta_path
+
+    if content_store is not None:
+        current, read_text = _snapshot_sources(content_store, cfg.exts)
+    else:
+        current, read_text = _disk_sources(project_root, cfg.exts)
+    provider = None if lexical_only else open_embedder(project_root, cfg)
+    model_id = provider.model_id if provider is not None else None
+    backend = resolve_backend(cfg)
+
+    meta = _load_meta(meta_path)
+    incremental = (
+        not overwrite
+        and meta_path.exists()
+        and (lexical_only or index_exists(index_path, backend))
+        and _is_compatible(meta, cfg, model_id, backend, lexical_only)
+    )
+    if not incremental:
+        legacy_metadata = embedding_dir / "metadata.json"
+        if legacy_metadata.exists():
+            legacy_metadata.unlink()
+    store = ChunkMetadataStore.open(metadata_path, fresh=not incremental)
+    try:
+        chunker = Chunker(cfg.chunk_size_chars, cfg.overlap_chars, cfg.chunk_mode)
+        next_id = int(meta.get("next_id", 1)) if incremental else 1
+
+        # Drop deleted and changed files from the metadata; their ids leave the index at merge time
+        stale_ids: List[int] = []
+        indexed = store.file_shas()
+        for file_path, digest in sorted(indexed.items()):
+            if current.get(file_path) != digest:
+                stale_ids.extend(store.remove_file(file_path))
+        changed = [(file_path, digest) for file_path, digest in current.items() if indexed.get(file_path) != digest]
+
+        first_id = next_id
+        base = f"{meta.get('updated_at', '')}:{meta.get('next_id', '')}" if incremental else "fresh"
+        staging = BuildStaging(project_root / cfg.staging_dir)
+        resumed = 0
+        if provider is not None:
+            resumed = staging.open(_plan_key(cfg, model_id, base, stale_ids, changed, next_id), resume)
+
+        def pending_chunks() -> Iterator[Tuple[int, Chunk]]:
+            nonlocal next_id
+            for file_path, digest in changed:
+                store.add_file(file_path, digest)
+                for chunk in chunker.iter_chunks(read_text(file_path, digest), file_path):
+                    chunk_id = next_id
+                    next_id += 1
+                    store.add_chunks([{
+                        "id": chunk_id,
+                        "file_path": chunk.file_path,
+                        "start_offset": chunk.start_offset,
+                        "end_offset": chunk.end_offset,
+                        "preview_text": chunk.text[:200].replace("\n", " ").replace("\r", " "),
+                    }])
+                    store.lexical.add([(chunk_id, chunk.text)])
+                    yield chunk_id, chunk
+
+        embedded = 0
+        dim, kind = 0, "none"
+        if provider is None:
+            for _ in pending_chunks():
+                pass
+            delete_index(index_path)
+        else:
+            # Embed and checkpoint; batches committed by an interrupted run are only re-chunked
+            try:
+                for number, batch in enumerate(_iter_batches(pending_chunks(), max(1, cfg.checkpoint_chunks))):
+                    if number < resumed:
+                        continue
+                    matrix = provider.embed_batch([chunk.text for _, chunk in batch])
+                    ids = np.array([chunk_id for chunk_id, _ in batch], dtype=np.int64)
+                    staging.commit_batch(ids, _normalize(matrix).astype(np.float32))
+                    embedded += len(batch)
+            finally:
+                provider.close()
+
+            # Merge staged batches into the index; a fresh quantized index is trained first
+            index = read_index(index_path, backend) if incremental else None
+            if index is not None and index.d == 0:
+                index = None
+            kind = meta.get("index_type", "flat") if incremental else cfg.index_type
+            if stale_ids and index is not None:
+                index = remove_ids(index, np.array(stale_ids, dtype=np.int64), kind)
+            for ids, matrix in staging.iter_batches():
+                if index is None:
+                    index, kind = create_index(cfg, matrix.shape[1], next_id - first_id, backend)
+                    if not index.is_trained:
+                        index.train(_training_sample(staging, next_id - first_id, cfg.train_sample))
+                elif index.d != matrix.shape[1]:
+                    raise RuntimeError("Embedding dimension changed; run 'pc embed rebuild'.")
+                index.add_with_ids(matrix, ids)
+            if index is None:
+                index, kind = create_index(cfg, 0, 0, backend)
+            dim = int(index.d)
+            write_index(index, index_path, backend)
+
+        store.save()
+        now = datetime.now(timezone.utc).isoformat()
+        meta_payload = {
+            "format_version": INDEX_FORMAT_VERSION,
+            "model": model_id,
+            "lexical_only": lexical_only,
+            "backend": backend,
+            "dim": dim,
+            "chunk_size_chars": cfg.chunk_size_chars,
+            "overlap_chars": cfg.overlap_chars,
+            "chunk_mode": cfg.chunk_mode,
+            "index_type": kind,
+            "index_config": cfg.index_type,
+            "created_at": meta.get("created_at", now) if incremental else now,
+            "updated_at": now,
+            "file_count": len(current),
+            "chunk_count": store.chunk_count,
+            "next_id": next_id,
+        }
+        meta_path.write_text(json.dumps(meta_payload, indent=2), encoding="utf-8")
+        staging.clear()
+
+        return BuildResult(
+            file_count=len(current),
+            chunk_count=store.chunk_count,
+            dim=dim,
+            embedded_chunks=embedded,
+            removed_chunks=len(stale_ids),
+            changed_files=len(changed),
+            resumed_batches=resumed,
+            discarded_batches=staging.discarded,
+        )
+    finally:
+        store.close()
@@ -0,0 +1,150 @@
+"""Construction, training, persistence and tuning of the vector index behind ``pc embed``."""
+
+from __future__ import annotations
+
+import math
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+from project_control.embedding.config import EmbedConfig
+from project_control.embedding.numpy_index import NumpyFlatIndex
+
+try:
+    import faiss
+except ImportError:  # pragma: no cover - exercised on hosts without faiss-cpu wheels
+    faiss = None
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+BACKENDS = ("auto", "faiss", "numpy")
+
+# k-means wants roughly this many training points per centroid.
+_POINTS_PER_CENTROID = 39
+
+
+def _pq_subquantizers(dim: int, wanted: int) -> int:
+    """Largest sub-quantizer count <= ``wanted`` that divides ``dim``."""
+    for m in range(min(wanted, dim), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+def resolve_backend(cfg: EmbedConfig) -> str:
+    """The concrete backend for ``cfg.index_backend``; ``auto`` prefers FAISS when installed."""
+    backend = cfg.index_backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown index_backend: {backend!r} (expected one of {', '.join(BACKENDS)})")
+    if backend == "auto":
+        return "faiss" if faiss is not None else "numpy"
+    if backend == "faiss" and faiss is None:
+        raise RuntimeError("index_backend is 'faiss' but faiss is not installed (pip install faiss-cpu).")
+    return backend
+
+
+def resolve_index_spec(cfg: EmbedConfig, dim: int, n_vectors: int) -> Tuple[str, str]:
+    """
+    Pick the effective index type and its ``faiss.index_factory`` string.
+
+    Quantized types need enough vectors to train; small corpora fall back to
+    ``ivf_flat`` (no PQ codebooks) or ``flat`` (exact search) instead of
+    training degenerate centroids.
+    """
+    kind = cfg.index_type
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"Unknown index_type: {kind!r} (expected one of {', '.join(INDEX_TYPES)})")
+
+    if kind == "hnsw":
+        return kind, f"IDMap2,HNSW{cfg.hnsw_m}"
+
+    if kind in ("ivf_flat", "ivf_pq"):
+        nlist = cfg.ivf_nlist or int(4 * math.sqrt(max(n_vectors, 1)))
+        nlist = min(nlist, n_vectors // _POINTS_PER_CENTROID)
+        if nlist < 1:
+            return "flat", "IDMap2,Flat"
+        if kind == "ivf_pq" and n_vectors >= _POINTS_PER_CENTROID * (1 << cfg.pq_nbits):
+            m = _pq_subquantizers(dim, cfg.pq_m)
+            return kind, f"IDMap2,IVF{nlist},PQ{m}x{cfg.pq_nbits}"
+        return "ivf_flat", f"IDMap2,IVF{nlist},Flat"
+
+    return "flat", "IDMap2,Flat"
+
+
+def create_index(cfg: EmbedConfig, dim: int, n_vectors: int, backend: str = "faiss") -> Tuple[Any, str]:
+    """
+    Create an empty, untrained inner-product index sized for ``n_vectors``.
+
+    The NumPy backend only does exact search, so it always yields ``flat``.
+    """
+    if backend == "numpy":
+        return NumpyFlatIndex(dim), "flat"
+    kind, spec = resolve_index_spec(cfg, dim, n_vectors)
+    return faiss.index_factory(dim, spec, faiss.METRIC_INNER_PRODUCT), kind
+
+
+def index_exists(path: Path, backend: str) -> bool:
+    if backend == "numpy":
+        return all(part.exists() for part in NumpyFlatIndex.files(path))
+    return path.exists()
+
+
+def read_index(path: Path, backend: str) -> Any:
+    if backend == "numpy":
+        return NumpyFlatIndex.read(path)
+    if faiss is None:
+        raise RuntimeError("The index was built with faiss, which is not installed. Run 'pc embed rebuild'.")
+    return faiss.read_index(str(path))
+
+
+def write_index(index: Any, path: Path, backend: str) -> None:
+    if backend == "numpy":
+        index.write(path)
+    else:
+        faiss.write_index(index, str(path))
+
+
+def delete_index(path: Path) -> None:
+    """Remove the index files of every backend at ``path``."""
+    for part in [path, *NumpyFlatIndex.files(path)]:
+        if part.exists():
+            part.unlink()
+
+
+def supports_remove(kind: str) -> bool:
+    return kind != "hnsw"
+
+
+def remove_ids(index: Any, ids: np.ndarray, kind: str) -> Any:
+    """
+    Remove ``ids`` from the index and return the resulting index.
+
+    HNSW graphs cannot delete vectors, so the survivors are reconstructed and
+    re-inserted into a fresh graph of the same shape.
+    """
+    if len(ids) == 0:
+        return index
+    if supports_remove(kind):
+        index.remove_ids(ids)
+        return index
+
+    all_ids = faiss.vector_to_array(index.id_map)
+    keep = ~np.isin(all_ids, ids)
+    inner = faiss.downcast_index(index.index)
+    fresh = faiss.IndexIDMap2(faiss.IndexHNSWFlat(index.d, inner.hnsw.nb_neighbors(0) // 2, index.metric_type))
+    if keep.any():
+        vectors = inner.reconstruct_n(0, inner.ntotal)[keep]
+        fresh.add_with_ids(np.ascontiguousarray(vectors, dtype=np.float32), all_ids[keep])
+    return fresh
+
+
+def apply_search_params(index: Any, nprobe: Optional[int] = None, ef_search: Optional[int] = None) -> None:
+    """Set query-time knobs on IVF (``nprobe``) and HNSW (``efSearch``) indexes; no-op for flat ones."""
+    if isinstance(index, NumpyFlatIndex):
+        return
+    params = faiss.ParameterSpace()
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+    if nprobe is not None and isinstance(inner, faiss.IndexIVF):
+        params.set_index_parameter(index, "nprobe", int(nprobe))
+    if ef_search is not None and isinstance(inner, faiss.IndexHNSW):
+        params.set_index_parameter(index, "efSearch", int(ef_search))
@@ -0,0 +1,121 @@
+"""BM25 inverted index over the chunks of the embedding index."""
+
+from __future__ import annotations
+
+import math
+import re
+import sqlite3
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+_TOKEN_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|[0-9]+")
+_SUBTOKEN_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS postings ("
+    " term TEXT NOT NULL,"
+    " chunk_id INTEGER NOT NULL,"
+    " tf INTEGER NOT NULL,"
+    " PRIMARY KEY (term, chunk_id)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS postings_by_chunk ON postings (chunk_id)",
+    "CREATE TABLE IF NOT EXISTS doc_lengths (chunk_id INTEGER PRIMARY KEY, length INTEGER NOT NULL)",
+)
+
+# Keep well below SQLITE_MAX_VARIABLE_NUMBER on old SQLite builds (999).
+_QUERY_CHUNK = 500
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase identifier tokens plus their sub-tokens.
+
+    ``parseHttpResponse`` yields ``parsehttpresponse``, ``parse``, ``http`` and
+    ``response`` so both exact identifiers and their words match.
+    """
+    tokens: List[str] = []
+    for token in _TOKEN_RE.findall(text):
+        tokens.append(token.lower())
+        parts = _SUBTOKEN_RE.findall(token)
+        if len(parts) > 1:
+            tokens.extend(part.lower() for part in parts)
+    return tokens
+
+
+class LexicalIndex:
+    """
+    Okapi BM25 over chunk ids, stored in the same SQLite file as the chunk metadata.
+
+    Postings are keyed by (term, chunk id) so a query reads only the posting
+    lists of its own terms; removing a file's chunks drops their postings.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, k1: float = 1.2, b: float = 0.75):
+        self._conn = conn
+        self.k1 = k1
+        self.b = b
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+
+    def add(self, chunks: Iterable[Tuple[int, str]]) -> None:
+        postings: List[Tuple[str, int, int]] = []
+        lengths: List[Tuple[int, int]] = []
+        for chunk_id, text in chunks:
+            terms = Counter(tokenize(text))
+            lengths.append((chunk_id, sum(terms.values())))
+            postings.extend((term, chunk_id, tf) for term, tf in terms.items())
+        self._conn.executemany("INSERT OR REPLACE INTO postings (term, chunk_id, tf) VALUES (?, ?, ?)", postings)
+        self._conn.executemany("INSERT OR REPLACE INTO doc_lengths (chunk_id, length) VALUES (?, ?)", lengths)
+
+    def remove(self, chunk_ids: List[int]) -> None:
+        for start in range(0, len(chunk_ids), _QUERY_CHUNK):
+            batch = chunk_ids[start:start + _QUERY_CHUNK]
+            placeholders = ",".join("?" for _ in batch)
+            self._conn.execute(f"DELETE FROM postings WHERE chunk_id IN ({placeholders})", batch)
+            self._conn.execute(f"DELETE FROM doc_lengths WHERE chunk_id IN ({placeholders})", batch)
+
+    def clear(self) -> None:
+        self._conn.execute("DELETE FROM postings")
+        self._conn.execute("DELETE FROM doc_lengths")
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[int, float]]:
+        """Return up to ``top_k`` (chunk_id, bm25 score) pairs, best first."""
+        terms = Counter(tokenize(query))
+        if not terms:
+            return []
+        doc_count, total_length = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM doc_lengths"
+        ).fetchone()
+        if not doc_count:
+            return []
+        avg_length = max(total_length / doc_count, 1e-9)
+
+        matched: Dict[int, List[Tuple[float, int]]] = {}
+        for term, query_tf in terms.items():
+            rows = self._conn.execute("SELECT chunk_id, tf FROM postings WHERE term = ?", (term,)).fetchall()
+            if not rows:
+                continue
+            idf = math.log(1.0 + (doc_count - len(rows) + 0.5) / (len(rows) + 0.5))
+            for chunk_id, tf in rows:
+                matched.setdefault(chunk_id, []).append((idf * query_tf, tf))
+        if not matched:
+            return []
+
+        lengths = self._lengths(list(matched))
+        scores: List[Tuple[int, float]] = []
+        for chunk_id, contributions in matched.items():
+            norm = self.k1 * (1.0 - self.b + self.b * lengths.get(chunk_id, avg_length) / avg_length)
+            score = sum(weight * tf * (self.k1 + 1.0) / (tf + norm) for weight, tf in contributions)
+            scores.append((chunk_id, score))
+        scores.sort(key=lambda item: (-item[1], item[0]))
+        return scores[:top_k]
+
+    def _lengths(self, chunk_ids: List[int]) -> Dict[int, int]:
+        found: Dict[int, int] = {}
+        for start in range(0, len(chunk_ids), _QUERY_CHUNK):
+            batch = chunk_ids[start:start + _QUERY_CHUNK]
+            placeholders = ",".join("?" for _ in batch)
+            rows = self._conn.execute(
+                f"SELECT chunk_id, length FROM doc_lengths WHERE chunk_id IN ({placeholders})", batch
+            )
+            found.update(rows)
+        return found
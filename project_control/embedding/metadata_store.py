@@ -0,0 +1,122 @@
+"""Per-file and per-chunk bookkeeping for the embedding index."""
+
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from project_control.embedding.lexical_index import LexicalIndex
+
+# Keep well below SQLITE_MAX_VARIABLE_NUMBER on old SQLite builds (999).
+_QUERY_CHUNK = 500
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, sha256 TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS chunks ("
+    " id INTEGER PRIMARY KEY,"
+    " file_path TEXT NOT NULL,"
+    " start_offset INTEGER NOT NULL,"
+    " end_offset INTEGER NOT NULL,"
+    " preview_text TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS chunks_by_file ON chunks (file_path)",
+)
+
+
+class ChunkMetadataStore:
+    """
+    Tracks which chunk ids belong to which file (and at which sha256).
+
+    Chunk ids are the int64 ids stored in the vector index, so a changed or
+    deleted file can have exactly its vectors removed. The BM25 postings of
+    the chunks (``lexical``) share the same file. Records live in an
+    SQLite file keyed by chunk id: a search reads only the rows it returns
+    instead of parsing every preview up front. Changes become visible on
+    ``save()``; closing without saving discards them.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self.lexical = LexicalIndex(self._conn)
+        self._conn.commit()
+
+    @classmethod
+    def open(cls, path: Path, fresh: bool = False) -> "ChunkMetadataStore":
+        """Open the store at ``path``; ``fresh=True`` starts from an empty store."""
+        store = cls(path)
+        if fresh:
+            store._conn.execute("DELETE FROM chunks")
+            store._conn.execute("DELETE FROM files")
+            store.lexical.clear()
+        return store
+
+    def save(self) -> None:
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def file_sha(self, file_path: str) -> Optional[str]:
+        row = self._conn.execute("SELECT sha256 FROM files WHERE path = ?", (file_path,)).fetchone()
+        return row[0] if row else None
+
+    def file_shas(self) -> Dict[str, str]:
+        return dict(self._conn.execute("SELECT path, sha256 FROM files"))
+
+    def paths(self) -> List[str]:
+        return [row[0] for row in self._conn.execute("SELECT path FROM files ORDER BY path")]
+
+    def chunk_ids(self, file_path: str) -> List[int]:
+        rows = self._conn.execute("SELECT id FROM chunks WHERE file_path = ? ORDER BY id", (file_path,))
+        return [row[0] for row in rows]
+
+    def remove_file(self, file_path: str) -> List[int]:
+        """Forget a file and return the chunk ids that must leave the index."""
+        ids = self.chunk_ids(file_path)
+        self._conn.execute("DELETE FROM chunks WHERE file_path = ?", (file_path,))
+        self._conn.execute("DELETE FROM files WHERE path = ?", (file_path,))
+        self.lexical.remove(ids)
+        return ids
+
+    def add_file(self, file_path: str, sha256: str) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO files (path, sha256) VALUES (?, ?)", (file_path, sha256))
+
+    def add_chunks(self, records: Iterable[Dict[str, Any]]) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO chunks (id, file_path, start_offset, end_offset, preview_text)"
+            " VALUES (:id, :file_path, :start_offset, :end_offset, :preview_text)",
+            records,
+        )
+
+    def get(self, chunk_id: int) -> Optional[Dict[str, Any]]:
+        return self.get_many([chunk_id]).get(int(chunk_id))
+
+    def get_many(self, chunk_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """Fetch records for the given ids; unknown ids are omitted."""
+        wanted = list(dict.fromkeys(int(i) for i in chunk_ids))
+        found: Dict[int, Dict[str, Any]] = {}
+        for start in range(0, len(wanted), _QUERY_CHUNK):
+            batch = wanted[start:start + _QUERY_CHUNK]
+            placeholders = ",".join("?" for _ in batch)
+            rows = self._conn.execute(
+                "SELECT id, file_path, start_offset, end_offset, preview_text"
+                f" FROM chunks WHERE id IN ({placeholders})",
+                batch,
+            )
+            for chunk_id, file_path, start_offset, end_offset, preview in rows:
+                found[chunk_id] = {
+                    "id": chunk_id,
+                    "file_path": file_path,
+                    "start_offset": start_offset,
+                    "end_offset": end_offset,
+                    "preview_text": preview,
+                }
+        return found
+
+    @property
+    def chunk_count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
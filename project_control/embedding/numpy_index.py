@@ -0,0 +1,116 @@
+"""Pure-NumPy exact inner-product index, used when FAISS is not installed."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Rows scored per block; bounds the temporary score matrix to block x queries.
+_BLOCK_ROWS = 65536
+
+
+def _vectors_path(path: Path) -> Path:
+    return path.with_name(path.stem + ".vectors.npy")
+
+
+def _ids_path(path: Path) -> Path:
+    return path.with_name(path.stem + ".ids.npy")
+
+
+class NumpyFlatIndex:
+    """
+    Brute-force flat index with the subset of the FAISS ``IndexIDMap2`` API used by ``pc embed``.
+
+    Vectors are one float32 matrix saved as ``.npy`` and memory-mapped on
+    load, so opening the index for a query does not read it into memory.
+    Search scores the matrix in blocks and keeps a running top-k with
+    ``argpartition``; mutations copy the matrix into memory first.
+    """
+
+    is_trained = True
+
+    def __init__(self, d: int, vectors: Optional[np.ndarray] = None, ids: Optional[np.ndarray] = None):
+        self.d = int(d)
+        self._vectors = vectors if vectors is not None else np.zeros((0, self.d), dtype=np.float32)
+        self._ids = ids if ids is not None else np.zeros(0, dtype=np.int64)
+        self._rows: Optional[Dict[int, int]] = None
+
+    @property
+    def ntotal(self) -> int:
+        return int(self._ids.shape[0])
+
+    def train(self, _vectors: np.ndarray) -> None:
+        pass
+
+    def add_with_ids(self, vectors: np.ndarray, ids: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.d)
+        self._vectors = np.concatenate([np.asarray(self._vectors), vectors])
+        self._ids = np.concatenate([np.asarray(self._ids), np.asarray(ids, dtype=np.int64)])
+        self._rows = None
+
+    def remove_ids(self, ids: np.ndarray) -> int:
+        keep = ~np.isin(self._ids, np.asarray(ids, dtype=np.int64))
+        removed = int(self.ntotal - keep.sum())
+        self._vectors = np.asarray(self._vectors)[keep]
+        self._ids = np.asarray(self._ids)[keep]
+        self._rows = None
+        return removed
+
+    def reconstruct(self, chunk_id: int) -> np.ndarray:
+        if self._rows is None:
+            self._rows = {int(value): row for row, value in enumerate(self._ids)}
+        row = self._rows.get(int(chunk_id))
+        if row is None:
+            raise RuntimeError(f"id {chunk_id} not found in index")
+        return np.array(self._vectors[row], dtype=np.float32)
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (scores, ids) of shape (n_queries, k), padded with -inf / -1 like FAISS."""
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.d)
+        n_queries = queries.shape[0]
+        best_scores = np.full((n_queries, 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((n_queries, 0), dtype=np.int64)
+        for start in range(0, self.ntotal, _BLOCK_ROWS):
+            block = np.asarray(self._vectors[start:start + _BLOCK_ROWS])
+            scores = queries @ block.T
+            if scores.shape[1] > k:
+                part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, part, axis=1)
+                rows = part + start
+            else:
+                rows = np.broadcast_to(np.arange(start, start + scores.shape[1]), scores.shape)
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            best_rows = np.concatenate([best_rows, rows], axis=1)
+            if best_scores.shape[1] > k:
+                part = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, part, axis=1)
+                best_rows = np.take_along_axis(best_rows, part, axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_ids = np.asarray(self._ids)[np.take_along_axis(best_rows, order, axis=1)]
+
+        out_scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+        out_ids = np.full((n_queries, k), -1, dtype=np.int64)
+        found = best_scores.shape[1]
+        out_scores[:, :found] = best_scores
+        out_ids[:, :found] = best_ids
+        return out_scores, out_ids
+
+    def write(self, path: Path) -> None:
+        for target, array in ((_vectors_path(path), self._vectors), (_ids_path(path), self._ids)):
+            tmp = target.with_name(target.stem + ".tmp.npy")
+            np.save(tmp, np.asarray(array))
+            tmp.replace(target)
+
+    @classmethod
+    def read(cls, path: Path) -> "NumpyFlatIndex":
+        vectors = np.load(_vectors_path(path), mmap_mode="r")
+        ids = np.load(_ids_path(path))
+        return cls(vectors.shape[1], vectors, ids)
+
+    @staticmethod
+    def files(path: Path) -> List[Path]:
+        return [_vectors_path(path), _ids_path(path)]
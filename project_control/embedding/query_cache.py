@@ -0,0 +1,145 @@
+"""Query embedding cache and query log for ``SearchEngine``."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from project_control.embedding.embedding_cache import _QUERY_CHUNK, chunk_key
+
+
+class QueryCache:
+    """
+    LRU cache of query text -> embedding vector, keyed by model.
+
+    Two tiers: an in-process ``OrderedDict`` of up to ``memory_entries``
+    vectors (warm across calls on one engine, e.g. ``search_many``) in front
+    of a ``queries`` table in the shared ``cache.sqlite``. The table keeps at
+    most ``max_entries`` rows per model; the least recently used are evicted
+    on insert. ``path=None`` keeps only the in-process tier.
+    """
+
+    def __init__(self, path: Optional[Path], max_entries: int = 10000, memory_entries: int = 1024):
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        if path is not None and max_entries > 0:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path))
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS queries ("
+                " model TEXT NOT NULL,"
+                " query_sha TEXT NOT NULL,"
+                " dim INTEGER NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " last_used REAL NOT NULL,"
+                " PRIMARY KEY (model, query_sha))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_queries_lru ON queries(model, last_used)")
+            self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, model: str, queries: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Return cached vectors for ``queries`` (missing ones are omitted) and mark them as used."""
+        found: Dict[str, np.ndarray] = {}
+        cold: Dict[str, str] = {}
+        for query in dict.fromkeys(queries):
+            key = (model, chunk_key(query))
+            vec = self._memory.get(key)
+            if vec is not None:
+                self._memory.move_to_end(key)
+                found[query] = vec
+            else:
+                cold[key[1]] = query
+
+        if cold and self._conn is not None:
+            shas = list(cold)
+            for start in range(0, len(shas), _QUERY_CHUNK):
+                batch = shas[start:start + _QUERY_CHUNK]
+                placeholders = ",".join("?" for _ in batch)
+                rows = self._conn.execute(
+                    f"SELECT query_sha, dim, vector FROM queries WHERE model = ? AND query_sha IN ({placeholders})",
+                    [model, *batch],
+                ).fetchall()
+                for sha, dim, blob in rows:
+                    vec = np.frombuffer(blob, dtype=np.float32)
+                    if vec.shape[0] == dim:
+                        found[cold[sha]] = vec
+                        self._remember((model, sha), vec)
+                self._touch(model, [sha for sha, _, _ in rows])
+
+        self.hits += len(found)
+        self.misses += len(set(queries)) - len(found)
+        return found
+
+    def put_many(self, model: str, items: Sequence[Tuple[str, np.ndarray]]) -> None:
+        now = time.time()
+        rows = []
+        for query, vec in items:
+            vec = np.asarray(vec, dtype=np.float32)
+            sha = chunk_key(query)
+            self._remember((model, sha), vec)
+            rows.append((model, sha, int(vec.shape[0]), vec.tobytes(), now))
+        if not rows or self._conn is None:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO queries (model, query_sha, dim, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        self._conn.execute(
+            "DELETE FROM queries WHERE model = ? AND query_sha IN ("
+            " SELECT query_sha FROM queries WHERE model = ? ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (model, model, self.max_entries),
+        )
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        if self._conn is None:
+            return len(self._memory)
+        return int(self._conn.execute("SELECT COUNT(*) FROM queries").fetchone()[0])
+
+    def _remember(self, key: Tuple[str, str], vec: np.ndarray) -> None:
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = vec
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _touch(self, model: str, shas: Sequence[str]) -> None:
+        if not shas:
+            return
+        now = time.time()
+        self._conn.executemany(
+            "UPDATE queries SET last_used = ? WHERE model = ? AND query_sha = ?",
+            [(now, model, sha) for sha in shas],
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class QueryLog:
+    """Append-only JSON Lines log of search queries (one object per query)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def write(self, entries: Sequence[Dict[str, Any]]) -> None:
+        if not entries:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as handle:
+            for entry in entries:
+                handle.write(json.dumps(entry, ensure_ascii=False) + "\n")
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
 import json
+import time
 from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, List, Optional, Tuple
 
-import faiss
 import numpy as np
 
 from project_control.embedding.config import EmbedConfig
-from project_control.embedding.embed_provider import OllamaEmbedProvider
+from project_control.embedding.embed_provider import build_provider
 from project_control.embedding.index_builder import _normalize
+from project_control.embedding.index_factory import apply_search_params, index_exists, read_index
+from project_control.embedding.metadata_store import ChunkMetadataStore
+from project_control.embedding.query_cache import QueryCache, QueryLog
 
 
 @dataclass(frozen=True)
@@ -22,37 +26,225 @@ class SearchResult:
     preview_text: str
 
 
+SEARCH_MODES = ("vector", "lexical", "hybrid")
+
+
 class SearchEngine:
-    def __init__(self, project_root: Path, cfg: EmbedConfig | None = None):
+    """
+    Query the chunks indexed by ``pc embed build``.
+
+    Modes: ``vector`` (nearest neighbours of the query embedding), ``lexical``
+    (BM25 only; needs no embedding server or vector index) and ``hybrid``
+    (BM25 candidates reranked by vector similarity, or fused with the vector
+    ranking by reciprocal rank fusion when the index cannot return stored
+    vectors, as with IVF indexes).
+
+    Query vectors are cached per model (in process and, for cacheable
+    providers, in ``cache.sqlite``), so repeated queries skip the embedding
+    server; every query is appended to ``queries.jsonl`` unless
+    ``query_log`` is off.
+    """
+
+    def __init__(self, project_root: Path, cfg: EmbedConfig | None = None, mode: Optional[str] = None):
         self.cfg = cfg or EmbedConfig()
         self.root = project_root
+        self.mode = mode or self.cfg.search_mode
+        if self.mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {self.mode!r} (expected one of {', '.join(SEARCH_MODES)})")
+        self.index = None
+        self.provider = None
+        self.query_cache: Optional[QueryCache] = None
+        self.query_log = QueryLog(project_root / self.cfg.query_log_path) if self.cfg.query_log else None
         self._load_index()
-        self.provider = OllamaEmbedProvider(self.cfg)
+        if self.mode == "lexical":
+            return
+        try:
+            self.provider = build_provider(self.cfg)
+            built_with = self.meta.get("model")
+            if built_with and built_with != self.provider.model_id:
+                raise RuntimeError(
+                    f"Index was built with '{built_with}' but the configured provider is "
+                    f"'{self.provider.model_id}'. Run 'pc embed rebuild'."
+                )
+            self.query_cache = QueryCache(
+                project_root / self.cfg.cache_path if self.provider.cacheable else None,
+                max_entries=self.cfg.query_cache_entries,
+            )
+        except Exception:
+            # The metadata store (and provider) are already open
+            self.close()
+            raise
 
     def _load_index(self) -> None:
-        if not self.cfg.index_path.exists():
+        index_path = self.root / self.cfg.index_path
+        meta_path = self.root / self.cfg.meta_path
+        if not meta_path.exists():
             raise FileNotFoundError("Embedding index not found. Run 'pc embed build' first.")
-        self.index = faiss.read_index(str(self.cfg.index_path))
-        self.metadata = json.loads(self.cfg.metadata_path.read_text(encoding="utf-8"))
+        self.meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if self.mode != "lexical":
+            if self.meta.get("lexical_only"):
+                raise RuntimeError(
+                    "Index was built with --lexical-only. Use '--mode lexical' or run 'pc embed rebuild'."
+                )
+            backend = self.meta.get("backend", "faiss")
+            if not index_exists(index_path, backend):
+                raise FileNotFoundError("Embedding index not found. Run 'pc embed build' first.")
+            self.index = read_index(index_path, backend)
+        self.metadata = ChunkMetadataStore.open(self.root / self.cfg.metadata_path)
+
+    @property
+    def index_type(self) -> str:
+        return self.meta.get("index_type", "flat")
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[SearchResult]:
+        """
+        Return the ``top_k`` chunks best matching ``query`` in the engine's mode.
+
+        ``nprobe`` (IVF lists scanned) and ``ef_search`` (HNSW candidate list
+        size) trade speed for recall on approximate indexes; they default to
+        the config values and are ignored by flat indexes.
+        """
+        return self.search_many([query], top_k=top_k, nprobe=nprobe, ef_search=ef_search)[0]
 
-    def search(self, query: str, top_k: int = 5) -> List[SearchResult]:
-        query_vec = self.provider.embed(query)
-        if self.index.d != len(query_vec):
+    def search_many(
+        self,
+        queries: Iterable[str],
+        top_k: int = 5,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+    ) -> List[List[SearchResult]]:
+        """
+        Search several queries at once; returns one result list per query, in order.
+
+        Uncached queries are embedded in a single ``embed_batch`` call and, in
+        vector mode, looked up with a single index search.
+        """
+        queries = list(queries)
+        if not queries:
+            return []
+        started = time.perf_counter()
+        cached: List[Optional[bool]] = [None] * len(queries)
+        if self.mode == "lexical":
+            rankings = [self.metadata.lexical.search(query, top_k) for query in queries]
+        else:
+            apply_search_params(
+                self.index,
+                nprobe=self.cfg.nprobe if nprobe is None else nprobe,
+                ef_search=self.cfg.ef_search if ef_search is None else ef_search,
+            )
+            query_mat, cached = self._embed_queries(queries)
+            if self.mode == "hybrid":
+                rankings = [self._hybrid(query, query_mat[row:row + 1], top_k) for row, query in enumerate(queries)]
+            else:
+                rankings = self._vector(query_mat, top_k)
+        results = self._results(rankings)
+        self._log(queries, results, cached, top_k, time.perf_counter() - started)
+        return results
+
+    def _embed_queries(self, queries: List[str]) -> Tuple[np.ndarray, List[Optional[bool]]]:
+        """Normalized query matrix plus, per query, whether its vector came from the cache."""
+        model = self.provider.model_id
+        vectors = self.query_cache.get_many(model, queries)
+        missing = [query for query in dict.fromkeys(queries) if query not in vectors]
+        if missing:
+            computed = list(zip(missing, self.provider.embed_batch(missing)))
+            self.query_cache.put_many(model, computed)
+            vectors.update(computed)
+        query_mat = np.stack([vectors[query] for query in queries]).astype(np.float32)
+        if self.index.d != query_mat.shape[1]:
             raise RuntimeError("Embedding dimension mismatch between index and provider.")
-        query_mat = _normalize(np.array([query_vec], dtype=np.float32))
+        fresh = set(missing)
+        return _normalize(query_mat), [query not in fresh for query in queries]
+
+    def _vector(self, query_mat: np.ndarray, top_k: int) -> List[List[Tuple[int, float]]]:
+        if self.index.ntotal == 0:
+            return [[] for _ in range(query_mat.shape[0])]
         scores, idxs = self.index.search(query_mat, top_k)
-        results: List[SearchResult] = []
-        for score, idx in zip(scores[0], idxs[0]):
-            if idx < 0 or idx >= len(self.metadata):
-                continue
-            meta = self.metadata[idx]
-            results.append(
-                SearchResult(
-                    file_path=meta.get("file_path", ""),
-                    start_offset=int(meta.get("start_offset", 0)),
-                    end_offset=int(meta.get("end_offset", 0)),
-                    similarity_score=float(score),
-                    preview_text=meta.get("preview_text", ""),
+        return [
+            [(int(idx), float(score)) for score, idx in zip(row_scores, row_idxs) if idx >= 0]
+            for row_scores, row_idxs in zip(scores, idxs)
+        ]
+
+    def _hybrid(self, query: str, query_mat: np.ndarray, top_k: int) -> List[Tuple[int, float]]:
+        candidates = self.metadata.lexical.search(query, max(top_k, self.cfg.hybrid_candidates))
+        if not candidates:
+            return self._vector(query_mat, top_k)[0]
+        try:
+            vectors = np.vstack([self.index.reconstruct(chunk_id) for chunk_id, _ in candidates])
+        except RuntimeError:
+            ranked = self._vector(query_mat, max(top_k, self.cfg.hybrid_candidates))[0]
+            return self._fuse(candidates, ranked, top_k=top_k)
+        scores = vectors @ query_mat[0]
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [(candidates[i][0], float(scores[i])) for i in order]
+
+    def _fuse(self, *rankings: List[Tuple[int, float]], top_k: int = 5) -> List[Tuple[int, float]]:
+        """Reciprocal rank fusion: score(d) = sum over rankings of 1 / (rrf_k + rank(d))."""
+        fused: Dict[int, float] = {}
+        for ranking in rankings:
+            for rank, (chunk_id, _) in enumerate(ranking, 1):
+                fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (self.cfg.rrf_k + rank)
+        return sorted(fused.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+
+    def _results(self, rankings: List[List[Tuple[int, float]]]) -> List[List[SearchResult]]:
+        records = self.metadata.get_many(list({chunk_id for ranked in rankings for chunk_id, _ in ranked}))
+        results: List[List[SearchResult]] = []
+        for ranked in rankings:
+            hits: List[SearchResult] = []
+            for chunk_id, score in ranked:
+                meta = records.get(chunk_id)
+                if meta is None:
+                    continue
+                hits.append(
+                    SearchResult(
+                        file_path=meta.get("file_path", ""),
+                        start_offset=int(meta.get("start_offset", 0)),
+                        end_offset=int(meta.get("end_offset", 0)),
+                        similarity_score=float(score),
+                        preview_text=meta.get("preview_text", ""),
+                    )
                 )
-            )
+            results.append(hits)
         return results
+
+    def _log(
+        self,
+        queries: List[str],
+        results: List[List[SearchResult]],
+        cached: List[Optional[bool]],
+        top_k: int,
+        elapsed_s: float,
+    ) -> None:
+        if self.query_log is None:
+            return
+        now = datetime.now(timezone.utc).isoformat()
+        self.query_log.write([
+            {
+                "ts": now,
+                "mode": self.mode,
+                "query": query,
+                "top_k": top_k,
+                "results": len(hits),
+                "top_file": hits[0].file_path if hits else None,
+                "cached": hit_cache,
+                "batch": len(queries),
+                "elapsed_ms": round(elapsed_s * 1000.0, 3),
+            }
+            for query, hits, hit_cache in zip(queries, results, cached)
+        ])
+
+    def close(self) -> None:
+        self.metadata.close()
+        self.index = None
+        if self.query_cache is not None:
+            self.query_cache.close()
+            self.query_cache = None
+        if self.provider is not None:
+            self.provider.close()
+            self.provider = None
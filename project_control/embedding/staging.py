@@ -0,0 +1,89 @@
+"""On-disk staging area for checkpointed embedding builds."""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Iterator, Tuple
+
+import numpy as np
+
+_MANIFEST = "manifest.json"
+
+
+class BuildStaging:
+    """
+    Holds embedded batches of an in-progress build until they are merged into the index.
+
+    Each batch (chunk ids + vectors) is written to its own ``.npz`` file and
+    only then counted in ``manifest.json``, so an interrupted build leaves a
+    consistent prefix of committed batches behind. The manifest also records
+    the ``plan_key`` of the build; a resume is only honoured when the plan
+    (files, ids, model, chunking) is identical.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.plan_key = ""
+        self.committed = 0
+        # Batches of another plan thrown away by a resume attempt
+        self.discarded = 0
+
+    def _manifest_path(self) -> Path:
+        return self.path / _MANIFEST
+
+    def _batch_path(self, number: int) -> Path:
+        return self.path / f"batch_{number:05d}.npz"
+
+    def _write_manifest(self) -> None:
+        tmp = self.path / (_MANIFEST + ".tmp")
+        tmp.write_text(json.dumps({"plan_key": self.plan_key, "committed": self.committed}), encoding="utf-8")
+        os.replace(tmp, self._manifest_path())
+
+    def open(self, plan_key: str, resume: bool) -> int:
+        """
+        Prepare staging for ``plan_key`` and return the number of batches already committed.
+
+        Without ``resume`` (or when the staged plan differs) stale staging is
+        discarded; ``discarded`` counts the batches a resume had to drop.
+        """
+        self.discarded = 0
+        if resume and self._manifest_path().exists():
+            try:
+                manifest = json.loads(self._manifest_path().read_text(encoding="utf-8"))
+            except (json.JSONDecodeError, OSError):
+                manifest = {}
+            committed = int(manifest.get("committed", 0))
+            if manifest.get("plan_key") == plan_key and all(
+                self._batch_path(number).exists() for number in range(committed)
+            ):
+                self.plan_key = plan_key
+                self.committed = committed
+                return committed
+            self.discarded = committed
+        self.clear()
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.plan_key = plan_key
+        self.committed = 0
+        self._write_manifest()
+        return 0
+
+    def commit_batch(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        target = self._batch_path(self.committed)
+        tmp = target.with_name(target.stem + ".tmp.npz")
+        np.savez(tmp, ids=np.asarray(ids, dtype=np.int64), vectors=np.asarray(vectors, dtype=np.float32))
+        os.replace(tmp, target)
+        self.committed += 1
+        self._write_manifest()
+
+    def iter_batches(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yield (ids, vectors) of every committed batch, one batch in memory at a time."""
+        for number in range(self.committed):
+            with np.load(self._batch_path(number)) as data:
+                yield data["ids"], data["vectors"]
+
+    def clear(self) -> None:
+        if self.path.exists():
+            shutil.rmtree(self.path)
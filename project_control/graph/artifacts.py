@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 
 def ensure_output_dir(project_root: Path) -> Path:
@@ -32,6 +32,15 @@ def write_report_only(project_root: Path, graph: Dict, metrics: Dict) -> Path:
     return report_path
 
 
+def load_graph(project_root: Path) -> Optional[Dict]:
+    """The graph written by the last build, or None if there is no readable one."""
+    graph_path = project_root / ".project-control" / "out" / "graph.snapshot.json"
+    try:
+        return json.loads(graph_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
 def _sort_json(obj):
     if isinstance(obj, dict):
         return {k: _sort_json(obj[k]) for k in sorted(obj)}
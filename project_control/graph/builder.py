@@ -5,12 +5,14 @@ from __future__ import annotations
 import logging
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 import importlib.metadata
 
 from fnmatch import fnmatch
 
 from project_control.config.graph_config import GraphConfig, hash_config
+from project_control.graph.extraction import ExtractionCache, extract_imports
+from project_control.graph.extractors.base import ImportOccurrence
 from project_control.graph.extractors.registry import build_registry
 from project_control.graph.resolver import DEFAULT_JS_EXTENSIONS, PythonResolver, SpecifierResolver
 from project_control.core.content_store import ContentStore
@@ -20,29 +22,98 @@ logger = logging.getLogger(__name__)
 
 
 class GraphBuilder:
-    def __init__(self, project_root: Path, snapshot: Dict, content_store: ContentStore, config: GraphConfig):
+    def __init__(
+        self,
+        project_root: Path,
+        snapshot: Dict,
+        content_store: ContentStore,
+        config: GraphConfig,
+        jobs: Optional[int] = None,
+    ):
         self.project_root = project_root
         self.snapshot = snapshot
         self.content_store = content_store
         self.config = config
         self.extractor_registry = build_registry(config)
-
-    def build(self) -> Dict:
+        # Import extraction workers (None: one per CPU, 1: in-process)
+        self.jobs = jobs
+
+    def build(self, previous: Optional[Dict] = None) -> Dict:
+        """
+        Build the graph from scratch.
+
+        Node ids follow sorted path order, unless a ``previous`` graph is
+        given: paths it already has keep their ids and new paths take ids
+        from its ``meta.nextId`` counter, so an id is never handed to a
+        second path.
+        """
         # Collect nodes
         logger.info("Collecting graph nodes...")
-        nodes = self._collect_nodes()
+        nodes, next_id = self._collect_nodes(_node_ids(previous), _next_id(previous))
         path_to_id = {node["path"]: node["id"] for node in nodes}
         logger.info(f"Collected {len(nodes)} nodes")
 
         # Build resolvers
-        resolver = SpecifierResolver(self.project_root, path_to_id.keys(), self.config.alias, extension_order=self.config.languages.get("js_ts", {}).get("include_exts", DEFAULT_JS_EXTENSIONS))
-        py_resolver = PythonResolver(self.project_root, path_to_id.keys())
+        resolver, py_resolver = self._resolvers(path_to_id)
 
         # Collect edges with progress bar
         logger.info("Collecting graph edges...")
         edges = self._collect_edges(nodes, path_to_id, resolver, py_resolver)
         logger.info(f"Collected {len(edges)} edges")
 
+        return self._assemble(nodes, path_to_id, edges, next_id)
+
+    def update(self, previous: Dict) -> Dict:
+        """
+        Bring ``previous`` (a graph of an earlier snapshot) up to date with the current snapshot.
+
+        Only files whose content changed, and new files, are extracted and
+        resolved again. The other files keep their edges; when files were
+        added or removed, those edges are re-resolved from their stored
+        specifiers (no file is read for that), since a target may have
+        appeared or disappeared. Node ids of unchanged paths are kept. The
+        result equals ``build(previous)``. Falls back to a full build when
+        ``previous`` was built with another config or lacks per-node hashes.
+        """
+        old_nodes = {node["path"]: node for node in previous.get("nodes", [])}
+        if (
+            previous.get("meta", {}).get("configHash") != hash_config(self.config)
+            or any("sha256" not in node for node in old_nodes.values())
+        ):
+            logger.info("Previous graph cannot be updated; rebuilding")
+            return self.build(previous)
+
+        nodes, next_id = self._collect_nodes(_node_ids(previous), _next_id(previous))
+        path_to_id = {node["path"]: node["id"] for node in nodes}
+        changed = [
+            node["path"] for node in nodes
+            if node["path"] not in old_nodes or old_nodes[node["path"]]["sha256"] != node["sha256"]
+        ]
+        targets_changed = set(path_to_id) != set(old_nodes)
+        logger.info(f"Updating graph: {len(changed)} changed file(s), {len(old_nodes.keys() - path_to_id.keys())} removed")
+
+        resolver, py_resolver = self._resolvers(path_to_id)
+        old_paths = {node["id"]: node["path"] for node in previous.get("nodes", [])}
+        changed_set = set(changed)
+        edges: List[Dict] = []
+        for edge in previous.get("edges", []):
+            path = old_paths.get(edge["fromId"])
+            if path not in path_to_id or path in changed_set:
+                continue
+            if targets_changed:
+                occurrence = ImportOccurrence(edge["specifier"], edge["kind"], edge["line"], edge["lineText"])
+                edges.append(self._edge(path, occurrence, path_to_id, resolver, py_resolver))
+            else:
+                edges.append(dict(edge))
+
+        extracted = self._extract(changed)
+        for path in changed:
+            for record in extracted.get(path, []):
+                edges.append(self._edge(path, record, path_to_id, resolver, py_resolver))
+
+        return self._assemble(nodes, path_to_id, self._sort_edges(edges, nodes), next_id)
+
+    def _assemble(self, nodes: List[Dict], path_to_id: Dict[str, int], edges: List[Dict], next_id: int) -> Dict:
         # Resolve entrypoints
         entrypoints = self._resolve_entrypoints(path_to_id, edges)
 
@@ -52,6 +123,8 @@ class GraphBuilder:
             "toolVersion": _tool_version(),
             "configHash": hash_config(self.config),
             "snapshotHash": compute_snapshot_hash(self.snapshot),
+            # First id a new path gets (ids of removed paths are not reused)
+            "nextId": next_id,
         }
 
         graph = {
@@ -62,7 +135,15 @@ class GraphBuilder:
         }
         return graph
 
-    def _collect_nodes(self) -> List[Dict]:
+    def _resolvers(self, path_to_id: Dict[str, int]) -> Tuple[SpecifierResolver, PythonResolver]:
+        resolver = SpecifierResolver(self.project_root, path_to_id.keys(), self.config.alias, extension_order=self.config.languages.get("js_ts", {}).get("include_exts", DEFAULT_JS_EXTENSIONS))
+        py_resolver = PythonResolver(self.project_root, path_to_id.keys())
+        return resolver, py_resolver
+
+    def _collect_nodes(
+        self, previous_ids: Optional[Dict[str, int]] = None, next_id: int = 1
+    ) -> Tuple[List[Dict], int]:
+        """Nodes of the snapshot and the next unused id."""
         include = self.config.include_globs
         exclude = self.config.exclude_globs
         allowed_exts = set(self.config.enabled_extensions())
@@ -82,13 +163,76 @@ class GraphBuilder:
                     "path": path_posix,
                     "ext": ext,
                     "sizeBytes": entry.get("size", 0),
+                    "sha256": entry.get("sha256"),
                 }
             )
 
         result.sort(key=lambda n: n["path"])
-        for idx, node in enumerate(result, start=1):
-            node["id"] = idx
-        return result
+        if previous_ids is None:
+            for idx, node in enumerate(result, start=1):
+                node["id"] = idx
+            return result, len(result) + 1
+
+        # Keep the ids of known paths; new paths are numbered from the counter
+        for node in result:
+            if node["path"] in previous_ids:
+                node["id"] = previous_ids[node["path"]]
+            else:
+                node["id"] = next_id
+                next_id += 1
+        return result, next_id
+
+    def _extract(self, paths: List[str], progress: Optional[ProgressBar] = None) -> Dict[str, List[ImportOccurrence]]:
+        """Import occurrences of ``paths`` (CPU-bound: cached per blob, parallel)."""
+        sha_by_path = {
+            Path(entry["path"]).as_posix(): entry.get("sha256")
+            for entry in self.snapshot.get("files", [])
+            if entry.get("path")
+        }
+        items = [
+            (path, sha_by_path[path])
+            for path in paths
+            if Path(path).suffix in self.extractor_registry and sha_by_path.get(path)
+        ]
+        cache = ExtractionCache.for_control_dir(self.content_store.snapshot_path.parent)
+        try:
+            return extract_imports(
+                items,
+                self.extractor_registry,
+                self.content_store.content_dir,
+                jobs=self.jobs,
+                on_progress=progress.update if progress is not None else None,
+                cache=cache,
+            )
+        finally:
+            cache.close()
+
+    def _edge(
+        self,
+        path: str,
+        record: ImportOccurrence,
+        path_to_id: Dict[str, int],
+        resolver: SpecifierResolver,
+        py_resolver: PythonResolver,
+    ) -> Dict:
+        py_exts = set(self.config.languages.get("python", {}).get("include_exts", []))
+        if Path(path).suffix in py_exts:
+            resolved_path, is_external = py_resolver.resolve(path, record.specifier)
+        else:
+            resolved_path, is_external = resolver.resolve(path, record.specifier)
+
+        to_id = path_to_id.get(resolved_path) if resolved_path else None
+        return {
+            "fromId": path_to_id[path],
+            "toId": to_id,
+            "specifier": record.specifier,
+            "kind": record.kind,
+            "line": record.line,
+            "lineText": record.lineText,
+            "isExternal": is_external or to_id is None,
+            "isDynamic": record.kind == "dynamic",
+            "resolvedPath": resolved_path if resolved_path else None,
+        }
 
     def _collect_edges(
         self,
@@ -99,53 +243,21 @@ class GraphBuilder:
     ) -> List[Dict]:
         edges: List[Dict] = []
         node_paths = [n["path"] for n in nodes]
-        extractor_by_ext = self.extractor_registry
-        js_exts = set(self.config.languages.get("js_ts", {}).get("include_exts", []))
-        py_exts = set(self.config.languages.get("python", {}).get("include_exts", []))
 
         # Use progress bar for edge collection
         progress = ProgressBar(len(node_paths), "Building dependency graph", show_eta=True)
 
-        for idx, path in enumerate(node_paths, 1):
-            ext = Path(path).suffix
-            extractor = extractor_by_ext.get(ext)
-            if extractor is None:
-                progress.update(idx)
-                continue
-            try:
-                content = self.content_store.get_text(path)
-            except Exception as e:
-                logger.debug(f"Failed to get content for {path}: {e}")
-                progress.update(idx)
-                continue
-
-            records = extractor.extract(path, content)
-            from_id = path_to_id[path]
-
-            for record in records:
-                if ext in py_exts:
-                    resolved_path, is_external = py_resolver.resolve(path, record.specifier)
-                else:
-                    resolved_path, is_external = resolver.resolve(path, record.specifier)
-
-                to_id = path_to_id.get(resolved_path) if resolved_path else None
-                edge = {
-                    "fromId": from_id,
-                    "toId": to_id,
-                    "specifier": record.specifier,
-                    "kind": record.kind,
-                    "line": record.line,
-                    "lineText": record.lineText,
-                    "isExternal": is_external or to_id is None,
-                    "isDynamic": record.kind == "dynamic",
-                    "resolvedPath": resolved_path if resolved_path else None,
-                }
-                edges.append(edge)
-
-            progress.update(idx)
+        # Extraction first; edges are then resolved in node order
+        extracted = self._extract(node_paths, progress)
+        for path in node_paths:
+            for record in extracted.get(path, []):
+                edges.append(self._edge(path, record, path_to_id, resolver, py_resolver))
 
         progress.finish(f"Built {len(edges)} dependencies")
+        return self._sort_edges(edges, nodes)
 
+    @staticmethod
+    def _sort_edges(edges: List[Dict], nodes: List[Dict]) -> List[Dict]:
         id_to_path = {node["id"]: node["path"] for node in nodes}
         edges.sort(
             key=lambda e: (
@@ -180,6 +292,22 @@ class GraphBuilder:
         return sorted(node_id for node_id, deg in indegree.items() if deg == 0)
 
 
+def _node_ids(graph: Optional[Dict]) -> Optional[Dict[str, int]]:
+    """Path -> node id of ``graph`` (None without a graph)."""
+    if graph is None:
+        return None
+    return {node["path"]: node["id"] for node in graph.get("nodes", [])}
+
+
+def _next_id(graph: Optional[Dict]) -> int:
+    """First unused node id of ``graph`` (1 without a graph)."""
+    if graph is None:
+        return 1
+    largest = max((node["id"] for node in graph.get("nodes", [])), default=0)
+    # Graphs written before meta.nextId existed only know their current ids
+    return max(int(graph.get("meta", {}).get("nextId") or 0), largest + 1)
+
+
 def _tool_version() -> str | None:
     try:
         return importlib.metadata.version("project_control")
@@ -11,13 +11,22 @@ from project_control.core.content_store import ContentStore
 from project_control.core.snapshot_service import load_snapshot
 from project_control.graph.builder import GraphBuilder, compute_snapshot_hash
 from project_control.graph.metrics import compute_metrics
-from project_control.graph.artifacts import write_artifacts
+from project_control.graph.artifacts import load_graph, write_artifacts
 
 
-def ensure_graph(project_root: Path, config: GraphConfig | None = None, force: bool = False) -> Tuple[Path, Path, Path]:
+def ensure_graph(
+    project_root: Path,
+    config: GraphConfig | None = None,
+    force: bool = False,
+    jobs: int | None = None,
+) -> Tuple[Path, Path, Path]:
     """
     Ensure graph artifacts exist and are in sync with snapshot/config.
     Returns paths (snapshot_json, metrics_json, report_md).
+    ``jobs`` is the number of import extraction workers used by a rebuild.
+    A stale graph is updated incrementally (only changed files are
+    re-extracted); ``force`` rebuilds it from scratch. Both keep the node ids
+    of unchanged paths.
     """
     try:
         snapshot = load_snapshot(project_root)  # may raise FileNotFoundError
@@ -47,8 +56,12 @@ def ensure_graph(project_root: Path, config: GraphConfig | None = None, force: b
     if needs_build:
         snapshot_path = project_root / ".project-control" / "snapshot.json"
         content_store = ContentStore(snapshot, snapshot_path)
-        builder = GraphBuilder(project_root, snapshot, content_store, config)
-        graph = builder.build()
+        builder = GraphBuilder(project_root, snapshot, content_store, config, jobs=jobs)
+        previous = load_graph(project_root)
+        if previous is not None and not force:
+            graph = builder.update(previous)
+        else:
+            graph = builder.build(previous)
         metrics = compute_metrics(graph, config)
         snapshot_path_out, metrics_path_out, report_path_out = write_artifacts(project_root, graph, metrics)
         return snapshot_path_out, metrics_path_out, report_path_out
@@ -0,0 +1,219 @@
+"""Import extraction stage of the graph build: per-blob result cache, optional process pool."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from project_control.graph.extractors.base import BaseExtractor, ImportOccurrence
+
+logger = logging.getLogger(__name__)
+
+# Below this many files extraction runs in-process (pool start-up dominates)
+PARALLEL_MIN_FILES = 200
+BATCH_FILES = 100
+
+# (specifier, kind, line, lineText): an ImportOccurrence without dataclass overhead when pickled
+OccurrenceTuple = Tuple[str, str, int, str]
+
+# (path, blob sha256)
+WorkItem = Tuple[str, str]
+
+CACHE_FILE_NAME = "occurrences.sqlite"
+
+_QUERY_CHUNK = 500
+
+
+def extractor_id(extractor: BaseExtractor) -> Optional[str]:
+    """``name:version`` of an extractor, or None if it does not declare both (never cached)."""
+    name = getattr(extractor, "name", None)
+    version = getattr(extractor, "version", None)
+    if not isinstance(name, str) or version is None:
+        return None
+    return f"{name}:{version}"
+
+
+class ExtractionCache:
+    """
+    Persistent import occurrences keyed by (blob sha256, extension, extractor id).
+
+    An extractor's output depends only on these, so a file whose content did
+    not change is never parsed again. Stored as zlib-compressed JSON in one
+    SQLite file under ``.project-control/cache/extract/``.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS occurrences ("
+            " sha256 TEXT NOT NULL,"
+            " ext TEXT NOT NULL,"
+            " extractor TEXT NOT NULL,"
+            " occurrences BLOB NOT NULL,"
+            " PRIMARY KEY (sha256, ext, extractor))"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def for_control_dir(cls, control_dir: Path) -> "ExtractionCache":
+        """Cache of the project whose ``.project-control`` directory is ``control_dir``."""
+        return cls(control_dir / "cache" / "extract" / CACHE_FILE_NAME)
+
+    def get_many(self, keys: Iterable[Tuple[str, str, str]]) -> Dict[Tuple[str, str, str], List[OccurrenceTuple]]:
+        found: Dict[Tuple[str, str, str], List[OccurrenceTuple]] = {}
+        unique = list(dict.fromkeys(keys))
+        for ext, extractor in sorted({(ext, extractor) for _, ext, extractor in unique}):
+            shas = [sha for sha, e, x in unique if e == ext and x == extractor]
+            for start in range(0, len(shas), _QUERY_CHUNK):
+                batch = shas[start:start + _QUERY_CHUNK]
+                placeholders = ",".join("?" for _ in batch)
+                rows = self._conn.execute(
+                    "SELECT sha256, occurrences FROM occurrences"
+                    f" WHERE ext = ? AND extractor = ? AND sha256 IN ({placeholders})",
+                    [ext, extractor, *batch],
+                )
+                for sha, blob in rows:
+                    found[(sha, ext, extractor)] = [tuple(o) for o in json.loads(zlib.decompress(blob))]
+        return found
+
+    def put_many(self, items: Dict[Tuple[str, str, str], List[OccurrenceTuple]]) -> None:
+        rows = [
+            (sha, ext, extractor, zlib.compress(json.dumps(occurrences).encode("utf-8")))
+            for (sha, ext, extractor), occurrences in items.items()
+        ]
+        if not rows:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO occurrences (sha256, ext, extractor, occurrences) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _extract_batch(
+    task: Tuple[str, Mapping[str, BaseExtractor], Sequence[WorkItem]],
+) -> List[Tuple[str, Optional[List[OccurrenceTuple]]]]:
+    """Read and extract one batch of blobs (runs in pool workers); None marks an unreadable blob."""
+    content_dir, extractors, items = task
+    results: List[Tuple[str, Optional[List[OccurrenceTuple]]]] = []
+    for path, sha in items:
+        try:
+            content = (Path(content_dir) / f"{sha}.blob").read_text(encoding="utf-8", errors="ignore")
+        except OSError as e:
+            logger.debug(f"Failed to get content for {path}: {e}")
+            results.append((path, None))
+            continue
+        extractor = extractors[Path(path).suffix]
+        occurrences = extractor.extract(path, content)
+        results.append((path, [(o.specifier, o.kind, o.line, o.lineText) for o in occurrences]))
+    return results
+
+
+def _iter_results(
+    tasks: List[Tuple[str, Mapping[str, BaseExtractor], Sequence[WorkItem]]],
+    jobs: int,
+) -> Iterator[List[Tuple[str, Optional[List[OccurrenceTuple]]]]]:
+    """Batch results in task order, from a process pool when possible."""
+    done = 0
+    if jobs > 1 and len(tasks) > 1:
+        try:
+            executor = ProcessPoolExecutor(max_workers=min(jobs, len(tasks)))
+        except (OSError, NotImplementedError) as e:
+            logger.debug(f"No process pool ({e}); extracting in-process")
+        else:
+            try:
+                for results in executor.map(_extract_batch, tasks):
+                    done += 1
+                    yield results
+                return
+            except (BrokenProcessPool, OSError) as e:
+                logger.debug(f"Process pool failed ({e}); extracting the rest in-process")
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+    for task in tasks[done:]:
+        yield _extract_batch(task)
+
+
+def extract_imports(
+    items: Iterable[WorkItem],
+    extractors: Mapping[str, BaseExtractor],
+    content_dir: Path,
+    jobs: Optional[int] = None,
+    on_progress: Optional[Callable[[int], None]] = None,
+    cache: Optional[ExtractionCache] = None,
+) -> Dict[str, List[ImportOccurrence]]:
+    """
+    Extract the imports of ``(path, sha256)`` items, reading blobs from ``content_dir``.
+
+    Results found in ``cache`` are reused; only the remaining items are
+    extracted, and their results are added to it. Those go to worker
+    processes in batches when there are at least ``PARALLEL_MIN_FILES`` of
+    them and ``jobs`` (default: CPU count) is above one; workers read the
+    blobs themselves and send back plain tuples. The result does not depend
+    on the number of workers. Paths whose blob cannot be read are left out.
+
+    Args:
+        items: (path, blob sha256) pairs; every path's suffix must be in ``extractors``.
+        extractors: Extension -> extractor (must be picklable for the pool).
+        content_dir: The ContentStore blob directory.
+        jobs: Worker processes; 1 extracts in-process.
+        on_progress: Called with the number of items done after each batch.
+        cache: Per-blob result cache (None: extract everything).
+    """
+    items = list(items)
+    keys: Dict[str, Tuple[str, str, str]] = {}
+    for path, sha in items:
+        ext = Path(path).suffix
+        extractor = extractor_id(extractors[ext])
+        if extractor is not None:
+            keys[path] = (sha, ext, extractor)
+    cached = cache.get_many(keys.values()) if cache is not None and keys else {}
+
+    extracted: Dict[str, List[ImportOccurrence]] = {}
+    pending: List[WorkItem] = []
+    for path, sha in items:
+        occurrences = cached.get(keys[path]) if path in keys else None
+        if occurrences is None:
+            pending.append((path, sha))
+        else:
+            extracted[path] = [ImportOccurrence(*occurrence) for occurrence in occurrences]
+    done = len(items) - len(pending)
+    if on_progress is not None and done:
+        on_progress(done)
+
+    jobs = jobs if jobs is not None else (os.cpu_count() or 1)
+    if len(pending) < PARALLEL_MIN_FILES:
+        jobs = 1
+    tasks = [
+        (str(content_dir), extractors, pending[start:start + BATCH_FILES])
+        for start in range(0, len(pending), BATCH_FILES)
+    ]
+
+    fresh: Dict[Tuple[str, str, str], List[OccurrenceTuple]] = {}
+    for results in _iter_results(tasks, jobs):
+        for path, occurrences in results:
+            done += 1
+            if occurrences is None:
+                continue
+            extracted[path] = [ImportOccurrence(*occurrence) for occurrence in occurrences]
+            if path in keys:
+                fresh[keys[path]] = occurrences
+        if on_progress is not None:
+            on_progress(done)
+
+    if cache is not None:
+        cache.put_many(fresh)
+    logger.debug(f"Extracted imports of {len(pending)} file(s), {len(items) - len(pending)} from cache")
+    return extracted
@@ -15,7 +15,14 @@ class ImportOccurrence:
 
 
 class BaseExtractor(Protocol):
-    """Interface for language-specific import extractors."""
+    """
+    Interface for language-specific import extractors.
+
+    Extractors may define ``name`` and ``version`` class attributes; their
+    results are then cached per blob by the graph build (see
+    ``graph.extraction``), so ``version`` must change whenever the output
+    for the same content does.
+    """
 
     def extract(self, path: str, content_text: str) -> List[ImportOccurrence]:  # pragma: no cover - interface
         raise NotImplementedError
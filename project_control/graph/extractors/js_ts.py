@@ -9,6 +9,10 @@ from project_control.graph.extractors.base import BaseExtractor, ImportOccurrenc
 
 
 class JsTsExtractor(BaseExtractor):
+    # Identify cached extraction results; bump version when output changes
+    name = "js_ts"
+    version = 1
+
     # Patterns kept simple for speed; anchored per-line for determinism.
     _ESM_RE = re.compile(
         r"""^\s*(?:import|export)\s+(?:[^;]*?\s+from\s+)?(?P<q>["'])(?P<spec>[^"']+)(?P=q)""",
@@ -9,6 +9,10 @@ from project_control.graph.extractors.base import BaseExtractor, ImportOccurrenc
 
 
 class PythonAstExtractor(BaseExtractor):
+    # Identify cached extraction results; bump version when output changes
+    name = "python_ast"
+    version = 1
+
     def extract(self, path: str, content_text: str) -> List[ImportOccurrence]:
         lines = content_text.splitlines()
         try:
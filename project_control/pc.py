@@ -55,6 +55,9 @@ def build_parser() -> argparse.ArgumentParser:
     search_parser.add_argument("--files-only", action="store_true", help="Return only file paths")
     search_parser.add_argument("--json", action="store_true", help="Output in JSON format")
     search_parser.add_argument("--no-color", action="store_true", help="Disable colored output")
+    search_parser.add_argument("--max-results", type=int, default=None, help="Stop after N matches")
+    search_parser.add_argument("--index", action="store_true",
+                               help="Use the snapshot trigram index (built on first use; ripgrep fallback)")
 
     find_parser = subparsers.add_parser("find")
     find_parser.add_argument("symbol", nargs="?")
@@ -75,10 +78,12 @@ def build_parser() -> argparse.ArgumentParser:
     graph_build_parser = graph_subparsers.add_parser("build")
     graph_build_parser.add_argument("project_root", nargs="?", default=".")
     graph_build_parser.add_argument("--config", type=str, help="Path to graph config YAML", default=None)
+    graph_build_parser.add_argument("--jobs", type=int, default=None, help="Import extraction worker processes (default: one per CPU; 1 disables the pool)")
 
     graph_report_parser = graph_subparsers.add_parser("report")
     graph_report_parser.add_argument("project_root", nargs="?", default=".")
     graph_report_parser.add_argument("--config", type=str, help="Path to graph config YAML", default=None)
+    graph_report_parser.add_argument("--jobs", type=int, default=None, help="Import extraction worker processes (default: one per CPU; 1 disables the pool)")
 
     graph_trace_parser = graph_subparsers.add_parser("trace")
     graph_trace_parser.add_argument("target")
@@ -94,6 +99,7 @@ def build_parser() -> argparse.ArgumentParser:
     graph_trace_parser.add_argument("--max-paths", type=int, default=50, help="Limit number of returned paths")
     graph_trace_parser.add_argument("--no-limits", action="store_true", help="Disable depth/path limits")
     graph_trace_parser.add_argument("--config", type=str, help="Path to graph config YAML", default=None)
+    graph_trace_parser.add_argument("--jobs", type=int, default=None, help="Import extraction worker processes (default: one per CPU; 1 disables the pool)")
 
     subparsers.add_parser("ui")
 
@@ -149,12 +155,20 @@ def build_parser() -> argparse.ArgumentParser:
     embed_sub = embed_parser.add_subparsers(dest="embed_cmd")
     embed_build = embed_sub.add_parser("build")
     embed_build.add_argument("path", nargs="?", default=".")
+    embed_build.add_argument("--resume", action="store_true", help="Continue an interrupted build from its last checkpoint")
+    embed_build.add_argument("--lexical-only", action="store_true", help="Build only the BM25 index (no embedding server)")
     embed_rebuild = embed_sub.add_parser("rebuild")
     embed_rebuild.add_argument("path", nargs="?", default=".")
+    embed_rebuild.add_argument("--lexical-only", action="store_true", help="Build only the BM25 index (no embedding server)")
+    embed_rebuild.add_argument("--resume", action="store_true", help="Continue an interrupted rebuild from its last checkpoint")
     embed_search = embed_sub.add_parser("search")
     embed_search.add_argument("query")
     embed_search.add_argument("path", nargs="?", default=".")
     embed_search.add_argument("--top-k", type=int, default=5)
+    embed_search.add_argument("--mode", choices=["vector", "lexical", "hybrid"], default=None,
+                              help="Ranking: embeddings, BM25, or BM25 candidates reranked by embeddings")
+    embed_search.add_argument("--nprobe", type=int, default=None, help="IVF lists to scan (ivf_* indexes)")
+    embed_search.add_argument("--ef-search", type=int, default=None, help="HNSW candidate list size (hnsw index)")
     return parser
 
 
@@ -6,6 +6,8 @@ import logging
 import subprocess
 from typing import Sequence
 
+from project_control.utils import py_search
+
 LOGGER = logging.getLogger(__name__)
 
 
@@ -18,7 +20,8 @@ def run_rg(pattern: str, extra_args: Sequence[str] | None = None) -> str:
         extra_args: Additional command-line arguments forwarded to rg.
 
     Returns:
-        Captured stdout (empty string if rg is unavailable or no matches).
+        Captured stdout, ``path:line:text`` per match (empty string if no
+        matches). Without rg, the in-process search produces the same lines.
     """
     cmd = ["rg", pattern, "--line-number", "--no-heading"]
     if extra_args:
@@ -34,5 +37,8 @@ def run_rg(pattern: str, extra_args: Sequence[str] | None = None) -> str:
         )
         return result.stdout
     except FileNotFoundError:
-        LOGGER.warning("ripgrep (rg) not found in PATH.")
-        return ""
+        LOGGER.warning("ripgrep (rg) not found in PATH; using the slower in-process search.")
+        return "".join(
+            f"{path}:{line}:{text}\n"
+            for path, line, text in py_search.iter_matches(["-e", pattern, *(extra_args or [])])
+        )
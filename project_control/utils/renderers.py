@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from typing import Iterable, Iterator
+
 from project_control.utils.terminal import Colors
 
 
@@ -288,6 +290,37 @@ def render_patterns(result: dict, colored: bool = True) -> str:
     return "\n".join(lines)
 
 
+def _search_header(colored: bool) -> list[str]:
+    if colored:
+        return [f"{Colors.BOLD}{Colors.BLUE}Search Results{Colors.RESET}", f"{Colors.DIM}{'=' * 50}{Colors.RESET}"]
+    return ["Search Results", "=" * 50]
+
+
+def _search_count(count: int, colored: bool) -> str:
+    if colored:
+        return f"\n{Colors.GREEN}Found {count} result(s){Colors.RESET}"
+    return f"\nFound {count} result(s)"
+
+
+def _search_no_results(colored: bool) -> str:
+    if colored:
+        return f"  {Colors.YELLOW}No results found{Colors.RESET}"
+    return "  * No results found"
+
+
+def _search_match_lines(match: dict, files_only: bool, colored: bool) -> list[str]:
+    if files_only:
+        if colored:
+            return [f"  {Colors.CYAN}*{Colors.RESET} {match['file']}"]
+        return [f"  * {match['file']}"]
+    if colored:
+        return [
+            f"  {Colors.CYAN}*{Colors.RESET} {match['file']}:{Colors.YELLOW}{match['line']}{Colors.RESET}",
+            f"    {Colors.DIM}{match['text']}{Colors.RESET}",
+        ]
+    return [f"  * {match['file']}:{match['line']}", f"    {match['text']}"]
+
+
 def render_search(result: dict, colored: bool = True) -> str:
     """
     Render smart search result.
@@ -299,45 +332,44 @@ def render_search(result: dict, colored: bool = True) -> str:
     Returns:
         Formatted string output.
     """
-    lines = []
-
-    # Title
-    if colored:
-        lines.append(f"{Colors.BOLD}{Colors.BLUE}Search Results{Colors.RESET}")
-        lines.append(f"{Colors.DIM}{'=' * 50}{Colors.RESET}")
-    else:
-        lines.append("Search Results")
-        lines.append("=" * 50)
+    lines = _search_header(colored)
 
     matches = result.get("matches", [])
     stats = result.get("stats", {})
 
     # Results count
-    if colored:
-        lines.append(f"\n{Colors.GREEN}Found {len(matches)} result(s){Colors.RESET}")
-    else:
-        lines.append(f"\nFound {len(matches)} result(s)")
+    lines.append(_search_count(len(matches), colored))
 
     if matches:
         files_only = stats.get("files_only", False)
-        if files_only:
-            for match in matches:
-                if colored:
-                    lines.append(f"  {Colors.CYAN}*{Colors.RESET} {match['file']}")
-                else:
-                    lines.append(f"  * {match['file']}")
-        else:
-            for match in matches:
-                if colored:
-                    lines.append(f"  {Colors.CYAN}*{Colors.RESET} {match['file']}:{Colors.YELLOW}{match['line']}{Colors.RESET}")
-                    lines.append(f"    {Colors.DIM}{match['text']}{Colors.RESET}")
-                else:
-                    lines.append(f"  * {match['file']}:{match['line']}")
-                    lines.append(f"    {match['text']}")
+        for match in matches:
+            lines.extend(_search_match_lines(match, files_only, colored))
     else:
-        if colored:
-            lines.append(f"  {Colors.YELLOW}No results found{Colors.RESET}")
-        else:
-            lines.append("  * No results found")
+        lines.append(_search_no_results(colored))
 
     return "\n".join(lines)
+
+
+def iter_render_search(matches: Iterable[dict], files_only: bool = False, colored: bool = True) -> Iterator[str]:
+    """
+    Render a stream of search matches line by line, as they arrive.
+
+    Same layout as ``render_search`` except that the result count, unknown
+    until the stream ends, comes after the matches.
+
+    Args:
+        matches: Match dicts, e.g. from ``search_analyzer.iter_search``.
+        files_only: Matches carry only a ``file`` key.
+        colored: If True, use colored output (default: True).
+
+    Yields:
+        Output lines.
+    """
+    yield from _search_header(colored)
+    count = 0
+    for match in matches:
+        count += 1
+        yield from _search_match_lines(match, files_only, colored)
+    if not count:
+        yield _search_no_results(colored)
+    yield _search_count(count, colored)
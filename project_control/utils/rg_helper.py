@@ -1,14 +1,33 @@
-"""Ripgrep wrapper with structured JSON output parsing."""
+"""
+Ripgrep wrapper with structured JSON output parsing.
+
+Without ``rg`` on PATH every helper falls back to the in-process search of
+``py_search``, which returns the same result shapes.
+"""
 
 from __future__ import annotations
 
 import json
 import logging
+import os
+import re
 import subprocess
-from typing import Sequence, TypedDict
+import tempfile
+from types import ModuleType
+from typing import Callable, Dict, Iterator, List, Mapping, Sequence, Tuple, TypedDict, Union
+
 
 LOGGER = logging.getLogger(__name__)
 
+# Patterns per rg pass in run_rg_multi. Large alternations of regexes can hit
+# rg's compiled-regex size limit; literals are cheap (Aho-Corasick) either way.
+RG_MAX_PATTERNS_PER_PASS = 2000
+
+_WORD_RE = re.compile(r"\w+")
+_INLINE_FLAGS = re.compile(r"\(\?[aiLmsux]+\)")
+
+_WARNED_MISSING_RG = False
+
 
 class RgMatch(TypedDict, total=False):
     """Structured ripgrep match result."""
@@ -20,23 +39,72 @@ class RgMatch(TypedDict, total=False):
     submatches: list[dict]
 
 
-def run_rg_json(
+def _rg_missing() -> ModuleType:
+    """
+    The in-process search engine, warning (once per process) that rg is missing.
+
+    Imported on use: ``py_search`` itself depends on this module.
+    """
+    global _WARNED_MISSING_RG
+    if not _WARNED_MISSING_RG:
+        LOGGER.warning("ripgrep (rg) not found in PATH; using the slower in-process search.")
+        _WARNED_MISSING_RG = True
+    from project_control.utils import py_search
+
+    return py_search
+
+
+def _stream_rg(cmd: Sequence[str]) -> Iterator[str]:
+    """
+    Yield ripgrep's stdout line by line while it runs.
+
+    Closing the generator early (``max_results`` reached, consumer stopped)
+    kills rg instead of letting it finish the walk. Raises FileNotFoundError
+    on the first ``next()`` when rg is not installed.
+    """
+    proc = subprocess.Popen(
+        list(cmd),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        encoding="utf-8",
+        errors="ignore",
+    )
+    finished = False
+    try:
+        for line in proc.stdout:
+            yield line
+        finished = True
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        returncode = proc.wait()
+        if finished and returncode not in (0, 1):
+            LOGGER.warning("ripgrep exited with status %s", returncode)
+
+
+def iter_rg_json(
     patterns: Sequence[str],
     extra_args: Sequence[str] | None = None,
-) -> list[dict]:
+    max_results: int | None = None,
+    include_raw: bool = False,
+) -> Iterator[dict]:
     """
-    Execute ripgrep with JSON output and return structured matches.
+    Stream ripgrep JSON matches as rg produces them.
 
     Args:
         patterns: List of regex patterns to search for (supports multi-pattern via -e).
         extra_args: Additional command-line arguments forwarded to rg.
+        max_results: Stop (and kill rg) after this many matches.
+        include_raw: Keep the full rg JSON event under ``raw`` (off by default;
+            it roughly triples the memory held per match).
 
-    Returns:
-        List of parsed JSON match dictionaries. Each contains at least:
-        - path: str (file path)
-        - line_number: int (match line number)
-        - text: str (matching line text)
+    Yields:
+        Match dicts with ``file``, ``line`` and ``text`` (and ``raw`` if requested).
     """
+    if max_results is not None and max_results <= 0:
+        return
     cmd = ["rg", "--json", "--line-number", "--no-heading"]
 
     for pattern in patterns:
@@ -45,67 +113,243 @@ def run_rg_json(
     if extra_args:
         cmd.extend(extra_args)
 
+    lines = _stream_rg(cmd)
+    count = 0
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="ignore",
-        )
-        if not result.stdout:
-            return []
-
-        matches = []
-        for line in result.stdout.strip().split("\n"):
+        for line in lines:
+            # Skip begin/end/summary events without parsing them
+            if not line.startswith('{"type":"match"'):
+                continue
             try:
                 data = json.loads(line)
-                if data.get("type") == "match":
-                    match_data = data.get("data", {})
-                    path = match_data.get("path", {})
-                    if isinstance(path, dict):
-                        path_text = path.get("text", "")
-                    else:
-                        path_text = str(path)
-
-                    lines = match_data.get("lines", {})
-                    text = lines.get("text", "").strip()
-
-                    line_number = match_data.get("line_number")
-                    if line_number is None:
-                        line_number = 0
-
-                    matches.append({
-                        "file": path_text,
-                        "line": line_number,
-                        "text": text,
-                        "raw": data,
-                    })
             except json.JSONDecodeError as e:
                 LOGGER.warning(f"Failed to parse ripgrep JSON: {e}")
                 continue
-
-        return matches
-
+            path_text, line_number, text = _match_fields(data)
+            match = {"file": path_text, "line": line_number, "text": text.strip()}
+            if include_raw:
+                match["raw"] = data
+            yield match
+            count += 1
+            if max_results is not None and count >= max_results:
+                return
     except FileNotFoundError:
-        LOGGER.warning("ripgrep (rg) not found in PATH.")
-        return []
+        for path_text, line_number, text in _rg_missing().iter_matches(cmd[1:], max_results=max_results):
+            match = {"file": path_text, "line": line_number, "text": text.strip()}
+            if include_raw:
+                match["raw"] = _match_event(path_text, line_number, text)
+            yield match
+    finally:
+        lines.close()
 
 
-def run_rg_files_only(
+def run_rg_json(
     patterns: Sequence[str],
     extra_args: Sequence[str] | None = None,
-) -> list[str]:
+    max_results: int | None = None,
+    include_raw: bool = False,
+) -> list[dict]:
     """
-    Execute ripgrep and return only file paths (no line details).
+    Execute ripgrep with JSON output and return structured matches.
 
     Args:
-        patterns: List of regex patterns to search for.
+        patterns: List of regex patterns to search for (supports multi-pattern via -e).
         extra_args: Additional command-line arguments forwarded to rg.
+        max_results: Stop (and kill rg) after this many matches.
+        include_raw: Keep the full rg JSON event of each match under ``raw``.
 
     Returns:
-        List of unique file paths containing matches.
+        List of parsed JSON match dictionaries. Each contains at least:
+        - file: str (file path)
+        - line: int (match line number)
+        - text: str (matching line text)
+    """
+    return list(iter_rg_json(patterns, extra_args, max_results=max_results, include_raw=include_raw))
+
+
+def _match_fields(data: dict) -> Tuple[str, int, str]:
+    """Return (path, line_number, line text) of an rg ``--json`` match event."""
+    match_data = data.get("data", {})
+    path = match_data.get("path", {})
+    path_text = path.get("text", "") if isinstance(path, dict) else str(path)
+    text = match_data.get("lines", {}).get("text", "")
+    return path_text, match_data.get("line_number") or 0, text
+
+
+def _match_event(path_text: str, line_number: int, text: str) -> dict:
+    """An rg ``--json`` match event for a match found by the in-process search."""
+    return {
+        "type": "match",
+        "data": {"path": {"text": path_text}, "lines": {"text": text + "\n"}, "line_number": line_number},
+    }
+
+
+def _attributor(
+    patterns: Sequence[str],
+    fixed_strings: bool,
+    ignore_case: bool,
+    word_regexp: bool,
+) -> Callable[[str], List[str]]:
+    """
+    Build a function mapping a matched line to the patterns (of ``patterns``) it matches.
+
+    rg reports matching lines but not which ``-e``/``-f`` pattern matched, so
+    attribution is redone in Python: whole-word literals by a token lookup,
+    other literals by substring tests and regexes with ``re``.
     """
+    if fixed_strings and word_regexp and all(_WORD_RE.fullmatch(p) for p in patterns):
+        by_token: Dict[str, List[str]] = {}
+        for pattern in patterns:
+            by_token.setdefault(pattern.lower() if ignore_case else pattern, []).append(pattern)
+
+        def by_tokens(text: str) -> List[str]:
+            tokens = set(_WORD_RE.findall(text.lower() if ignore_case else text))
+            return [p for token in tokens for p in by_token.get(token, ())]
+
+        return by_tokens
+
+    if fixed_strings and not word_regexp:
+        needles = [(p.lower() if ignore_case else p, p) for p in patterns]
+
+        def by_substring(text: str) -> List[str]:
+            haystack = text.lower() if ignore_case else text
+            return [p for needle, p in needles if needle in haystack]
+
+        return by_substring
+
+    flags = re.IGNORECASE if ignore_case else 0
+    compiled = []
+    for pattern in patterns:
+        source = re.escape(pattern) if fixed_strings else pattern
+        if word_regexp:
+            source = rf"(?<!\w)(?:{source})(?!\w)"
+        compiled.append((re.compile(source, flags), pattern))
+
+    def by_regex(text: str) -> List[str]:
+        return [p for regex, p in compiled if regex.search(text)]
+
+    return by_regex
+
+
+def python_compilable(pattern: str) -> bool:
+    """Whether Python's ``re`` compiles ``pattern`` and it has no literal newline (rg rejects those)."""
+    try:
+        re.compile(pattern)
+    except re.error:
+        return False
+    return "\n" not in pattern
+
+
+def python_joinable(patterns: Sequence[str]) -> bool:
+    """
+    Whether compilable ``patterns`` mean the same when joined into one "|" alternation.
+
+    Not when one starts with inline flags such as "(?i)" (only valid at the
+    start of a regex) or has groups: group names would clash and numbered
+    backreferences would point at another pattern's groups.
+    """
+    return not any(_INLINE_FLAGS.match(p) or re.compile(p).groups for p in patterns)
+
+
+def _run_rg_pass(
+    patterns: Sequence[str],
+    flags: Sequence[str],
+    extra_args: Sequence[str] | None,
+) -> Iterator[Tuple[str, int, str]]:
+    """One ``rg --json`` pass over ``patterns`` (passed through a pattern file)."""
+    handle = tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".rgpatterns", delete=False)
+    try:
+        with handle:
+            handle.write("\n".join(patterns) + "\n")
+        cmd = ["rg", "--json", "--line-number", *flags, "-f", handle.name]
+        if extra_args:
+            cmd.extend(extra_args)
+        try:
+            for line in _stream_rg(cmd):
+                if not line.startswith('{"type":"match"'):
+                    continue
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError as e:
+                    LOGGER.warning(f"Failed to parse ripgrep JSON: {e}")
+                    continue
+                yield _match_fields(data)
+        except FileNotFoundError:
+            yield from _rg_missing().iter_matches(cmd[1:])
+    finally:
+        os.unlink(handle.name)
+
+
+def run_rg_multi(
+    queries: Mapping[str, Union[str, Sequence[str]]],
+    extra_args: Sequence[str] | None = None,
+    fixed_strings: bool = False,
+    ignore_case: bool = False,
+    word_regexp: bool = False,
+    max_patterns: int = RG_MAX_PATTERNS_PER_PASS,
+) -> dict[str, list[dict]]:
+    """
+    Run many named queries in as few ripgrep passes as possible.
+
+    All patterns go to a single ``rg --json -f <pattern file>`` pass (split
+    into passes of at most ``max_patterns``), and every matching line is
+    attributed back to the queries whose patterns match it. Patterns that
+    Python's ``re`` cannot compile (rg-only syntax) get a pass of their own.
+
+    Args:
+        queries: Query name -> pattern or list of patterns (matches of any count).
+        extra_args: Additional rg arguments (paths, globs, ``--type``). They must
+            not change how patterns match; use the flags below instead.
+        fixed_strings: Treat patterns as literals (``-F``).
+        ignore_case: Case-insensitive matching (``-i``).
+        word_regexp: Only match whole words (``-w``).
+        max_patterns: Maximum number of patterns per rg pass.
+
+    Returns:
+        Query name -> list of ``{"file", "line", "text"}`` matches, for every
+        query name (empty list when nothing matched). A line matching several
+        queries is listed under each of them.
+    """
+    names_by_pattern: Dict[str, List[str]] = {}
+    for name, patterns in queries.items():
+        for pattern in [patterns] if isinstance(patterns, str) else patterns:
+            if pattern:
+                names_by_pattern.setdefault(pattern, []).append(name)
+    results: dict[str, list[dict]] = {name: [] for name in queries}
+    if not names_by_pattern:
+        return results
+
+    flags = [flag for flag, on in (("-F", fixed_strings), ("-i", ignore_case), ("-w", word_regexp)) if on]
+    batched = [p for p in names_by_pattern if fixed_strings or python_compilable(p)]
+    step = max(1, max_patterns)
+    passes: List[List[str]] = [batched[start:start + step] for start in range(0, len(batched), step)]
+    # Patterns Python cannot attribute run alone, so every line they match is theirs
+    in_batches = set(batched)
+    passes.extend([p] for p in names_by_pattern if p not in in_batches)
+
+    for patterns in passes:
+        attribute = _attributor(patterns, fixed_strings, ignore_case, word_regexp) if len(patterns) > 1 else None
+        for path_text, line_number, text in _run_rg_pass(patterns, flags, extra_args):
+            matched = attribute(text) if attribute else patterns
+            match = {"file": path_text, "line": line_number, "text": text.strip()}
+            for name in dict.fromkeys(n for p in matched for n in names_by_pattern[p]):
+                results[name].append(match)
+    return results
+
+
+def iter_rg_files(
+    patterns: Sequence[str],
+    extra_args: Sequence[str] | None = None,
+    max_results: int | None = None,
+) -> Iterator[str]:
+    """
+    Stream paths of files containing matches (``rg --files-with-matches``) as rg finds them.
+
+    Paths come in rg's (unsorted) discovery order; ``max_results`` stops and
+    kills rg after that many files.
+    """
+    if max_results is not None and max_results <= 0:
+        return
     cmd = ["rg", "--files-with-matches"]
 
     for pattern in patterns:
@@ -114,21 +358,35 @@ def run_rg_files_only(
     if extra_args:
         cmd.extend(extra_args)
 
+    lines = _stream_rg(cmd)
+    count = 0
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="ignore",
-        )
-        if not result.stdout:
-            return []
-
-        # Parse file paths (each line is a file path)
-        files = [line.strip() for line in result.stdout.strip().split("\n") if line.strip()]
-        return sorted(set(files))
-
+        for line in lines:
+            path = line.strip()
+            if not path:
+                continue
+            yield path
+            count += 1
+            if max_results is not None and count >= max_results:
+                return
     except FileNotFoundError:
-        LOGGER.warning("ripgrep (rg) not found in PATH.")
-        return []
+        yield from _rg_missing().iter_files(cmd[1:], max_results=max_results)
+    finally:
+        lines.close()
+
+
+def run_rg_files_only(
+    patterns: Sequence[str],
+    extra_args: Sequence[str] | None = None,
+) -> list[str]:
+    """
+    Execute ripgrep and return only file paths (no line details).
+
+    Args:
+        patterns: List of regex patterns to search for.
+        extra_args: Additional command-line arguments forwarded to rg.
+
+    Returns:
+        List of unique file paths containing matches.
+    """
+    return sorted(set(iter_rg_files(patterns, extra_args)))
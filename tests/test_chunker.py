@@ -0,0 +1,128 @@
+"""Tests for the character and syntax-aware chunkers used by pc embed."""
+
+import subprocess
+import sys
+import types
+import unittest
+
+from project_control.embedding.chunker import Chunker
+
+PY_SOURCE = '''"""Module docstring."""
+
+import os
+
+
+def first(a):
+    return a + 1
+
+
+@decorator
+def second(b):
+    # helper comment
+    return b * 2
+
+
+class Widget:
+    def render(self):
+        return "<div>"
+
+    def size(self):
+        return 42
+'''
+
+JS_SOURCE = """import { api } from './api';
+
+// fetch one user
+export function loadUser(id) {
+  const url = `/users/${id}`;   // not a brace: }
+  return api.get(url, { retry: true });
+}
+
+export class Cache {
+  get(key) { return this.items['{' + key]; }
+  /* } unbalanced in comment */
+  set(key, value) { this.items[key] = value; }
+}
+"""
+
+
+class CharChunkerTests(unittest.TestCase):
+    def test_windows_overlap(self):
+        chunks = Chunker(10, 4).chunk_text("abcdefghijklmnopqrstuvwxyz", "a.txt")
+        self.assertEqual([(c.start_offset, c.end_offset) for c in chunks], [(0, 10), (6, 16), (12, 22), (18, 26)])
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            Chunker(mode="tokens")
+
+
+class SyntaxChunkerTests(unittest.TestCase):
+    def _chunks(self, text, path, size):
+        chunks = Chunker(size, 50, mode="syntax").chunk_text(text, path)
+        for chunk in chunks:
+            self.assertEqual(text[chunk.start_offset:chunk.end_offset], chunk.text)
+            self.assertLessEqual(len(chunk.text), size)
+        return chunks
+
+    def test_iter_chunks_is_a_generator(self):
+        self.assertIsInstance(Chunker(mode="syntax").iter_chunks(PY_SOURCE, "m.py"), types.GeneratorType)
+
+    def test_python_cuts_at_definitions(self):
+        chunks = self._chunks(PY_SOURCE, "m.py", 90)
+        starts = [c.text.strip().splitlines()[0] for c in chunks]
+        self.assertEqual(starts, ['"""Module docstring."""', "@decorator", "class Widget:", "def size(self):"])
+        self.assertTrue(all("def second" not in c.text or "@decorator" in c.text for c in chunks))
+        # No overlap: chunks tile the file in order
+        self.assertEqual([c.start_offset for c in chunks[1:]], [c.end_offset for c in chunks[:-1]])
+
+    def test_small_definitions_are_packed_together(self):
+        chunks = self._chunks(PY_SOURCE, "m.py", 1000)
+        self.assertEqual(len(chunks), 1)
+
+    def test_js_scanner_ignores_braces_in_strings_and_comments(self):
+        chunks = self._chunks(JS_SOURCE, "m.js", 160)
+        heads = [c.text.strip().splitlines()[0] for c in chunks]
+        self.assertIn("// fetch one user", heads)
+        self.assertIn("export class Cache {", heads)
+        load_user = next(c.text for c in chunks if "loadUser" in c.text)
+        self.assertTrue(load_user.rstrip().endswith("}"))
+
+    def test_oversized_body_is_split_inside(self):
+        body = "".join(f"  const v{i} = compute({i});\n" for i in range(40))
+        text = f"function big() {{\n{body}}}\n"
+        chunks = self._chunks(text, "big.ts", 200)
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(c.text.startswith(("function", "  const", "}")) for c in chunks))
+
+    def test_identical_chunks_are_emitted_once(self):
+        block = "export function same() {\n  return 1;\n}\n\n"
+        chunks = self._chunks(block * 5, "dup.js", len(block))
+        self.assertEqual(len(chunks), 1)
+
+    def test_unparseable_python_falls_back_to_indentation(self):
+        text = "def broken(:\n    pass\n\ndef ok():\n    return 1\n"
+        chunks = self._chunks(text, "bad.py", 25)
+        self.assertTrue(any(c.text.startswith("def ok") for c in chunks))
+
+    def test_markdown_cuts_at_headings(self):
+        text = "# Title\nintro\n\n## Usage\nrun it\n\n## License\nMIT\n"
+        chunks = self._chunks(text, "README.md", 20)
+        self.assertEqual([c.text.splitlines()[0] for c in chunks], ["# Title", "## Usage", "## License"])
+
+    def test_other_files_use_character_windows(self):
+        chunks = Chunker(10, 0, mode="syntax").chunk_text("x" * 25, "data.txt")
+        self.assertEqual([len(c.text) for c in chunks], [10, 10, 5])
+
+
+class ImportTests(unittest.TestCase):
+    def test_chunker_imports_without_the_embedding_extra(self):
+        code = (
+            "import sys; sys.modules['numpy'] = sys.modules['faiss'] = None; "
+            "from project_control.embedding.chunker import Chunker"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -235,5 +235,54 @@ class DeadAnalyzerTests(unittest.TestCase):
         self.assertIn("MyUtils", call_args)
 
 
+
+class _StubIndex:
+    """Token index stub: token -> referencing files."""
+
+    def __init__(self, postings):
+        self.postings = postings
+
+    def files_with(self, token):
+        return set(self.postings.get(token, ()))
+
+
+class DeadAnalyzerTokenIndexTests(unittest.TestCase):
+    """Usage counts from a token index instead of ripgrep."""
+
+    @patch("project_control.analysis.dead_analyzer.run_rg_files_only")
+    def test_index_lookup_replaces_ripgrep(self, mock_rg):
+        index = _StubIndex({
+            "orphan": ["src/orphan.py"],
+            "low_usage": ["src/main.py", "src/app.py"],
+            "healthy": ["a.py", "b.py", "c.py", "d.py"],
+        })
+
+        result = analyze_dead_code(["src/orphan.py", "src/low_usage.py", "src/healthy.py"], token_index=index)
+
+        mock_rg.assert_not_called()
+        self.assertEqual(result["high"], ["src/orphan.py"])
+        self.assertEqual(result["medium"], ["src/low_usage.py"])
+
+    def test_build_token_index_from_snapshot(self):
+        from project_control.analysis.dead_analyzer import build_token_index
+
+        class _Store:
+            blobs = {"s1": "import helpers\n", "s2": "def helper(): pass\n", "s3": "helpers.run()\n"}
+
+            def get_blob(self, sha):
+                return self.blobs[sha]
+
+        snapshot = {"files": [
+            {"path": "main.py", "sha256": "s1"},
+            {"path": "lib/helpers.py", "sha256": "s2"},
+            {"path": "tests/test_x.py", "sha256": "s3"},
+        ]}
+        index = build_token_index(snapshot, _Store())
+
+        result = analyze_dead_code([f["path"] for f in snapshot["files"]], token_index=index)
+        self.assertEqual(result["medium"], ["lib/helpers.py"])
+        self.assertEqual(result["high"], ["main.py"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,239 @@
+"""Tests for embedding providers: the Ollama HTTP client (against a local stub) and the offline hashing provider."""
+
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+try:
+    import numpy  # noqa: F401
+    import requests  # noqa: F401
+    HAS_EMBEDDING_DEPS = True
+except ImportError:
+    HAS_EMBEDDING_DEPS = False
+
+if HAS_EMBEDDING_DEPS:
+    import numpy as np
+    from project_control.core.embedding_service import EmbeddingService
+    from project_control.embedding.config import EmbedConfig, load_embed_config
+    from project_control.embedding.index_builder import build_index
+    from project_control.embedding.embed_provider import (
+        HashingEmbedProvider,
+        OllamaEmbedProvider,
+        build_provider,
+    )
+
+
+def _vector_for(text: str) -> list:
+    return [float(len(text)), 1.0, 0.0]
+
+
+class _StubOllama(BaseHTTPRequestHandler):
+    """Minimal Ollama lookalike; behaviour is controlled through class attributes."""
+
+    batch_endpoint = True
+    fail_first = 0
+    delay_s = 0.0
+    lock = threading.Lock()
+    requests_seen: list = []
+    in_flight = 0
+    max_in_flight = 0
+
+    def log_message(self, *args):  # keep test output quiet
+        pass
+
+    def _reply(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        cls = type(self)
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        with cls.lock:
+            cls.requests_seen.append((self.path, payload))
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+            should_fail = cls.fail_first > 0
+            if should_fail:
+                cls.fail_first -= 1
+        try:
+            if cls.delay_s:
+                time.sleep(cls.delay_s)
+            if should_fail:
+                self._reply(503, {"error": "busy"})
+            elif self.path == "/api/embed" and cls.batch_endpoint:
+                self._reply(200, {"embeddings": [_vector_for(t) for t in payload["input"]]})
+            elif self.path == "/api/embeddings":
+                self._reply(200, {"embedding": _vector_for(payload["prompt"])})
+            else:
+                self._reply(404, {"error": "not found"})
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+
+@unittest.skipUnless(HAS_EMBEDDING_DEPS, "embedding extra not installed")
+class OllamaEmbedProviderTests(unittest.TestCase):
+    def setUp(self):
+        _StubOllama.batch_endpoint = True
+        _StubOllama.fail_first = 0
+        _StubOllama.delay_s = 0.0
+        _StubOllama.requests_seen = []
+        _StubOllama.in_flight = 0
+        _StubOllama.max_in_flight = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubOllama)
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _provider(self, **overrides):
+        cfg = EmbedConfig(base_url=self.base_url, retry_backoff_s=0.0, **overrides)
+        return OllamaEmbedProvider(cfg)
+
+    def test_batches_inputs_and_preserves_order(self):
+        texts = [f"text-{'x' * i}" for i in range(10)]
+        provider = self._provider(batch_size=4, max_in_flight=3)
+
+        matrix = provider.embed_batch(texts)
+
+        self.assertEqual(matrix.shape, (10, 3))
+        self.assertEqual([row[0] for row in matrix.tolist()], [float(len(t)) for t in texts])
+        self.assertEqual(len(_StubOllama.requests_seen), 3)
+        self.assertTrue(all(path == "/api/embed" for path, _ in _StubOllama.requests_seen))
+
+    def test_service_reuses_the_chunk_vectors_of_pc_embed(self):
+        source = "".join(f"function handler{i}(event) {{ return event.value{i}; }}\n" for i in range(40))
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / ".project-control").mkdir()
+            (root / ".project-control" / "patterns.yaml").write_text(
+                f"embedding:\n  base_url: '{self.base_url}'\n  model: stub\n  retry_backoff_s: 0\n"
+                "  chunk_size_chars: 300\n  overlap_chars: 50\n  chunk_mode: syntax\n",
+                encoding="utf-8",
+            )
+            (root / "app.js").write_text(source, encoding="utf-8")
+            build_index(root, load_embed_config(root))
+            embedded = len(_StubOllama.requests_seen)
+            self.assertGreater(embedded, 0)
+
+            with mock.patch.dict(os.environ, {"PC_EMBED_MODEL": "stub"}):
+                service = EmbeddingService(root)
+            with mock.patch.object(service.provider, "close", wraps=service.provider.close) as close:
+                vector = service.compute_embedding(source, "sha-of-app-js", "app.js")
+                service.close()
+        self.assertEqual(len(_StubOllama.requests_seen), embedded)
+        self.assertEqual(len(vector), 3)
+        close.assert_called_once()
+
+    def test_respects_max_in_flight(self):
+        _StubOllama.delay_s = 0.05
+        provider = self._provider(batch_size=1, max_in_flight=2)
+
+        provider.embed_batch([str(i) for i in range(8)])
+
+        self.assertLessEqual(_StubOllama.max_in_flight, 2)
+        self.assertEqual(len(_StubOllama.requests_seen), 8)
+
+    def test_retries_transient_errors(self):
+        _StubOllama.fail_first = 2
+        provider = self._provider(max_retries=3)
+
+        vec = provider.embed("hello")
+
+        self.assertEqual(vec.tolist(), [5.0, 1.0, 0.0])
+        self.assertEqual(len(_StubOllama.requests_seen), 3)
+
+    def test_gives_up_after_max_retries(self):
+        _StubOllama.fail_first = 10
+        provider = self._provider(max_retries=1)
+
+        with self.assertRaises(RuntimeError):
+            provider.embed("hello")
+        self.assertEqual(len(_StubOllama.requests_seen), 2)
+
+    def test_falls_back_to_single_text_endpoint(self):
+        _StubOllama.batch_endpoint = False
+        provider = self._provider(batch_size=8)
+
+        matrix = provider.embed_batch(["a", "bb", "ccc"])
+
+        self.assertEqual([row[0] for row in matrix.tolist()], [1.0, 2.0, 3.0])
+        paths = [path for path, _ in _StubOllama.requests_seen]
+        self.assertEqual(paths, ["/api/embed", "/api/embeddings", "/api/embeddings", "/api/embeddings"])
+
+    def test_connection_error_is_reported(self):
+        cfg = EmbedConfig(base_url="http://127.0.0.1:9", max_retries=0, request_timeout_s=1.0)
+        provider = OllamaEmbedProvider(cfg)
+
+        with self.assertRaises(RuntimeError) as ctx:
+            provider.embed("hello")
+        self.assertIn("Cannot connect to Ollama server", str(ctx.exception))
+
+
+@unittest.skipUnless(HAS_EMBEDDING_DEPS, "embedding extra not installed")
+class HashingEmbedProviderTests(unittest.TestCase):
+    def test_vectors_are_stable_and_normalised(self):
+        cfg = EmbedConfig(provider="hashing", hashing_dim=256)
+        text = "def parseHttpResponse(raw_body):\n    return json.loads(raw_body)"
+
+        first = HashingEmbedProvider(cfg).embed(text)
+        second = HashingEmbedProvider(cfg).embed(text)
+
+        self.assertEqual(first.shape, (256,))
+        self.assertTrue(np.array_equal(first, second))
+        self.assertAlmostEqual(float(np.linalg.norm(first)), 1.0, places=5)
+
+    def test_related_code_scores_higher_than_unrelated(self):
+        provider = HashingEmbedProvider(EmbedConfig(provider="hashing"))
+        query, related, unrelated = provider.embed_batch([
+            "load user profile from database",
+            "def load_user_profile(db, user_id): return db.users.get(user_id)",
+            "function renderCanvas(ctx) { ctx.fillRect(0, 0, width, height) }",
+        ])
+
+        self.assertGreater(float(query @ related), float(query @ unrelated))
+
+    def test_empty_text_gives_zero_vector(self):
+        provider = HashingEmbedProvider(EmbedConfig(provider="hashing", hashing_dim=32))
+        self.assertFalse(provider.embed("  \n ").any())
+
+    def test_build_provider_selects_backend(self):
+        self.assertIsInstance(build_provider(EmbedConfig(provider="hashing")), HashingEmbedProvider)
+        self.assertIsInstance(build_provider(EmbedConfig()), OllamaEmbedProvider)
+        with self.assertRaises(ValueError):
+            build_provider(EmbedConfig(provider="nope"))
+
+    def test_provider_selected_from_patterns_yaml(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / ".project-control").mkdir()
+            (root / ".project-control" / "patterns.yaml").write_text(
+                "embedding:\n  provider: hashing\n  hashing_dim: 64\n  semantic_orphan_threshold: 0.5\n",
+                encoding="utf-8",
+            )
+
+            cfg = load_embed_config(root)
+            service = EmbeddingService(root)
+            vector = service.compute_embedding("class UserManager:\n    pass\n", "abc123")
+
+        self.assertEqual(cfg.provider, "hashing")
+        self.assertEqual(cfg.hashing_dim, 64)
+        self.assertEqual(len(vector), 64)
+
+
+if __name__ == "__main__":
+    unittest.main()
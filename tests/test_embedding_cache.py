@@ -0,0 +1,99 @@
+"""Tests for the chunk-level embedding cache shared by ghost and pc embed."""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+if HAS_NUMPY:
+    from project_control.embedding.config import EmbedConfig
+    from project_control.embedding.embedding_cache import CachedEmbedder, EmbeddingCache, open_embedder
+
+
+class _CountingProvider:
+    """Deterministic fake provider that records every text it embeds."""
+
+    def __init__(self):
+        self.seen = []
+
+    def embed_batch(self, texts):
+        self.seen.extend(texts)
+        return np.array([[float(len(t)), float(sum(map(ord, t)) % 97)] for t in texts], dtype=np.float32)
+
+
+@unittest.skipUnless(HAS_NUMPY, "embedding extra not installed")
+class EmbeddingCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "embedding" / "cache.sqlite"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_only_changed_chunks_are_embedded(self):
+        provider = _CountingProvider()
+        cache = EmbeddingCache(self.path)
+        embedder = CachedEmbedder(provider, cache, "model-a")
+
+        first = embedder.embed_batch(["alpha", "beta", "gamma"])
+        provider.seen.clear()
+        second = embedder.embed_batch(["alpha", "beta (edited)", "gamma"])
+
+        self.assertEqual(provider.seen, ["beta (edited)"])
+        self.assertTrue(np.array_equal(first[0], second[0]))
+        self.assertTrue(np.array_equal(first[2], second[2]))
+        self.assertEqual(embedder.hits, 2)
+        self.assertEqual(embedder.misses, 4)
+        cache.close()
+
+    def test_duplicate_texts_embedded_once(self):
+        provider = _CountingProvider()
+        cache = EmbeddingCache(self.path)
+        embedder = CachedEmbedder(provider, cache, "model-a")
+
+        matrix = embedder.embed_batch(["same", "same", "other"])
+
+        self.assertEqual(provider.seen, ["same", "other"])
+        self.assertEqual(matrix.shape, (3, 2))
+        cache.close()
+
+    def test_exposes_the_model_id_of_the_provider(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            embedder = open_embedder(Path(tmp), EmbedConfig(provider="ollama", model="m-1"))
+            try:
+                self.assertEqual(embedder.model_id, "m-1")
+            finally:
+                embedder.close()
+
+    def test_cache_is_keyed_by_model(self):
+        provider = _CountingProvider()
+        cache = EmbeddingCache(self.path)
+        CachedEmbedder(provider, cache, "model-a").embed_batch(["alpha"])
+        provider.seen.clear()
+
+        CachedEmbedder(provider, cache, "model-b").embed_batch(["alpha"])
+
+        self.assertEqual(provider.seen, ["alpha"])
+        cache.close()
+
+    def test_cache_persists_across_instances(self):
+        provider = _CountingProvider()
+        cache = EmbeddingCache(self.path)
+        CachedEmbedder(provider, cache, "model-a").embed_batch(["alpha", "beta"])
+        cache.close()
+        provider.seen.clear()
+
+        reopened = EmbeddingCache(self.path)
+        CachedEmbedder(provider, reopened, "model-a").embed_batch(["alpha", "beta"])
+
+        self.assertEqual(provider.seen, [])
+        reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""Tests for the parallel import extraction stage of the graph build."""
+
+import json
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+from project_control.config.graph_config import GraphConfig
+from project_control.core.content_store import ContentStore
+from project_control.core.scanner import scan_project
+from project_control.core.snapshot_service import save_snapshot
+from project_control.graph import extraction
+from project_control.graph.builder import GraphBuilder
+from project_control.graph.extractors.js_ts import JsTsExtractor
+from project_control.graph.extractors.python_ast import PythonAstExtractor
+
+IGNORE_DIRS = [".git", ".project-control", "node_modules", "__pycache__"]
+EXTS = [".py", ".js", ".ts"]
+
+
+class ParallelExtractionTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        for i in range(12):
+            (self.root / "pkg").mkdir(exist_ok=True)
+            (self.root / "pkg" / f"mod{i}.py").write_text(
+                f"import os\nfrom pkg.mod{(i + 1) % 12} import thing\nfrom .mod{(i + 5) % 12} import other\n",
+                encoding="utf-8",
+            )
+            (self.root / "web").mkdir(exist_ok=True)
+            (self.root / "web" / f"page{i}.ts").write_text(
+                f"import {{ a }} from './page{(i + 3) % 12}';\nconst x = require('lodash');\n",
+                encoding="utf-8",
+            )
+        (self.root / "pkg" / "broken.py").write_text("def broken(:\n", encoding="utf-8")
+        with patch("builtins.print"):
+            self.snapshot = scan_project(str(self.root), IGNORE_DIRS, EXTS)
+        save_snapshot(self.snapshot, self.root)
+        self.store = ContentStore(self.snapshot, self.root / ".project-control" / "snapshot.json")
+        self.config = GraphConfig(languages={
+            "js_ts": {"enabled": True, "include_exts": [".js", ".ts"]},
+            "python": {"enabled": True, "include_exts": [".py"]},
+        })
+        self.cache_dir = self.root / ".project-control" / "cache" / "extract"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _build(self, jobs):
+        graph = GraphBuilder(self.root, self.snapshot, self.store, self.config, jobs=jobs).build()
+        graph["meta"].pop("createdAt")
+        return json.dumps(graph, indent=2, sort_keys=True)
+
+    def test_pool_output_is_identical_to_serial(self):
+        serial = self._build(jobs=1)
+        shutil.rmtree(self.cache_dir)
+        with patch.object(extraction, "PARALLEL_MIN_FILES", 0), patch.object(extraction, "BATCH_FILES", 4), \
+                patch.object(extraction, "ProcessPoolExecutor", wraps=ProcessPoolExecutor) as pool:
+            parallel = self._build(jobs=3)
+        pool.assert_called_once_with(max_workers=3)
+        self.assertEqual(parallel, serial)
+        self.assertIn('"specifier": "lodash"', serial)
+        self.assertIn('"specifier": "pkg.mod1"', serial)
+
+    def test_missing_blobs_are_skipped(self):
+        sha = next(f["sha256"] for f in self.snapshot["files"] if f["path"] == "pkg/mod0.py")
+        (self.root / ".project-control" / "content" / f"{sha}.blob").unlink()
+        graph = GraphBuilder(self.root, self.snapshot, self.store, self.config, jobs=1).build()
+        from_paths = {n["id"]: n["path"] for n in graph["nodes"]}
+        self.assertNotIn("pkg/mod0.py", {from_paths[e["fromId"]] for e in graph["edges"]})
+        self.assertIn("pkg/mod0.py", from_paths.values())
+
+
+    def test_cached_results_are_reused(self):
+        first = self._build(jobs=1)
+        self.assertTrue((self.cache_dir / "occurrences.sqlite").exists())
+        with patch.object(PythonAstExtractor, "extract", side_effect=AssertionError("re-parsed")), \
+                patch.object(JsTsExtractor, "extract", side_effect=AssertionError("re-parsed")):
+            self.assertEqual(self._build(jobs=1), first)
+
+    def test_only_changed_files_are_extracted(self):
+        self._build(jobs=1)
+        (self.root / "web" / "page0.ts").write_text("import './page5';\n", encoding="utf-8")
+        with patch("builtins.print"):
+            self.snapshot = scan_project(str(self.root), IGNORE_DIRS, EXTS)
+        save_snapshot(self.snapshot, self.root)
+        self.store = ContentStore(self.snapshot, self.root / ".project-control" / "snapshot.json")
+        with patch.object(JsTsExtractor, "extract", autospec=True, side_effect=JsTsExtractor.extract) as js, \
+                patch.object(PythonAstExtractor, "extract", side_effect=AssertionError("re-parsed")):
+            graph = json.loads(self._build(jobs=1))
+        self.assertEqual([call.args[1] for call in js.call_args_list], ["web/page0.ts"])
+        self.assertIn("./page5", [e["specifier"] for e in graph["edges"]])
+
+    def test_extractor_version_is_part_of_the_key(self):
+        self._build(jobs=1)
+        with patch.object(JsTsExtractor, "version", 2), \
+                patch.object(JsTsExtractor, "extract", autospec=True, side_effect=JsTsExtractor.extract) as js:
+            self._build(jobs=1)
+        self.assertEqual(js.call_count, 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+"""Tests for incremental graph updates and stable node ids."""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from project_control.config.graph_config import GraphConfig
+from project_control.core.content_store import ContentStore
+from project_control.core.scanner import scan_project
+from project_control.core.snapshot_service import save_snapshot
+from project_control.graph.builder import GraphBuilder
+from project_control.graph.ensure import ensure_graph
+from project_control.graph.extractors.js_ts import JsTsExtractor
+from project_control.graph.extractors.python_ast import PythonAstExtractor
+
+IGNORE_DIRS = [".git", ".project-control", "node_modules", "__pycache__"]
+EXTS = [".py", ".js", ".ts"]
+
+FILES = {
+    "src/a.ts": "import { b } from './b';\nimport { later } from './later';\n",
+    "src/b.ts": "import { c } from './c';\nconst fs = require('fs');\n",
+    "src/c.ts": "export const c = 1;\n",
+    "src/main.ts": "import './a';\nimport('./c');\n",
+    "pkg/core.py": "import os\nfrom pkg.util import helper\nfrom pkg.extra import thing\n",
+    "pkg/util.py": "def helper():\n    return 1\n",
+}
+
+
+class IncrementalGraphTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        for rel, text in FILES.items():
+            self._write(rel, text)
+        self.config = GraphConfig(languages={
+            "js_ts": {"enabled": True, "include_exts": [".js", ".ts"]},
+            "python": {"enabled": True, "include_exts": [".py"]},
+        })
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, rel, text):
+        path = self.root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+    def _builder(self):
+        with patch("builtins.print"):
+            snapshot = scan_project(str(self.root), IGNORE_DIRS, EXTS)
+        save_snapshot(snapshot, self.root)
+        store = ContentStore(snapshot, self.root / ".project-control" / "snapshot.json")
+        return GraphBuilder(self.root, snapshot, store, self.config, jobs=1)
+
+    @staticmethod
+    def _dump(graph):
+        graph = json.loads(json.dumps(graph))
+        graph["meta"].pop("createdAt")
+        return json.dumps(graph, indent=2, sort_keys=True)
+
+    @staticmethod
+    def _by_path(graph):
+        """The graph with ids replaced by paths (comparable across id assignments)."""
+        paths = {n["id"]: n["path"] for n in graph["nodes"]}
+        nodes = sorted((n["path"], n["ext"], n["sizeBytes"], n["sha256"]) for n in graph["nodes"])
+        edges = [
+            (paths[e["fromId"]], paths.get(e["toId"]), e["specifier"], e["kind"], e["line"], e["isExternal"])
+            for e in graph["edges"]
+        ]
+        entrypoints = sorted(paths[i] for i in graph["entrypoints"])
+        return nodes, edges, entrypoints
+
+    def _assert_update_matches_rebuild(self, previous):
+        builder = self._builder()
+        updated = builder.update(previous)
+        self.assertEqual(self._dump(updated), self._dump(builder.build(previous)))
+        self.assertEqual(self._by_path(updated), self._by_path(builder.build()))
+        return updated
+
+    def test_added_file_keeps_ids_and_resolves_new_target(self):
+        previous = self._builder().build()
+        self._write("src/later.ts", "export const later = 1;\n")
+        self._write("pkg/extra.py", "thing = 1\n")
+        graph = self._assert_update_matches_rebuild(previous)
+
+        old_ids = {n["path"]: n["id"] for n in previous["nodes"]}
+        new_ids = {n["path"]: n["id"] for n in graph["nodes"]}
+        self.assertEqual({p: new_ids[p] for p in old_ids}, old_ids)
+        self.assertEqual(new_ids["pkg/extra.py"], max(old_ids.values()) + 1)
+        self.assertEqual(new_ids["src/later.ts"], max(old_ids.values()) + 2)
+        resolved = {(e["fromId"], e["toId"]) for e in graph["edges"]}
+        self.assertIn((new_ids["src/a.ts"], new_ids["src/later.ts"]), resolved)
+        self.assertIn((new_ids["pkg/core.py"], new_ids["pkg/extra.py"]), resolved)
+
+    def test_ids_of_removed_paths_are_not_reused(self):
+        first = self._builder().build()
+        self.assertEqual(first["meta"]["nextId"], len(FILES) + 1)
+        last = max(first["nodes"], key=lambda n: n["id"])
+        (self.root / last["path"]).unlink()
+        second = self._assert_update_matches_rebuild(first)
+        self.assertEqual(second["meta"]["nextId"], len(FILES) + 1)
+
+        self._write("src/later.ts", "export const later = 1;\n")
+        third = self._assert_update_matches_rebuild(second)
+        ids = {n["path"]: n["id"] for n in third["nodes"]}
+        self.assertEqual(ids["src/later.ts"], len(FILES) + 1)
+        self.assertNotIn(last["id"], ids.values())
+        self.assertEqual(third["meta"]["nextId"], len(FILES) + 2)
+
+    def test_removed_file_turns_its_imports_external(self):
+        previous = self._builder().build()
+        (self.root / "src" / "c.ts").unlink()
+        graph = self._assert_update_matches_rebuild(previous)
+        edge = next(e for e in graph["edges"] if e["specifier"] == "./c" and e["kind"] == "esm")
+        self.assertIsNone(edge["toId"])
+        self.assertTrue(edge["isExternal"])
+        self.assertNotIn("src/c.ts", {n["path"] for n in graph["nodes"]})
+
+    def test_modified_file_is_the_only_one_extracted(self):
+        previous = self._builder().build()
+        self._write("src/main.ts", "import './b';\n")
+        builder = self._builder()
+        with patch.object(JsTsExtractor, "extract", autospec=True, side_effect=JsTsExtractor.extract) as js, \
+                patch.object(PythonAstExtractor, "extract", side_effect=AssertionError("re-parsed")), \
+                patch("project_control.graph.builder.ExtractionCache.get_many", return_value={}):
+            graph = builder.update(previous)
+        self.assertEqual([call.args[1] for call in js.call_args_list], ["src/main.ts"])
+        self.assertEqual(self._dump(graph), self._dump(builder.build(previous)))
+        main_id = next(n["id"] for n in graph["nodes"] if n["path"] == "src/main.ts")
+        self.assertEqual([e["specifier"] for e in graph["edges"] if e["fromId"] == main_id], ["./b"])
+
+    def test_config_change_falls_back_to_full_build(self):
+        previous = self._builder().build()
+        self.config = GraphConfig(
+            languages={"js_ts": {"enabled": True, "include_exts": [".js", ".ts"]}},
+        )
+        builder = self._builder()
+        self.assertEqual(self._dump(builder.update(previous)), self._dump(builder.build(previous)))
+        self.assertFalse([n for n in builder.update(previous)["nodes"] if n["ext"] == ".py"])
+
+    def test_ensure_graph_updates_a_stale_graph(self):
+        self._builder()
+        graph_path, _, _ = ensure_graph(self.root, self.config, jobs=1)
+        first = json.loads(graph_path.read_text(encoding="utf-8"))
+        self._write("src/later.ts", "export const later = 1;\n")
+        self._builder()
+        with patch.object(GraphBuilder, "build", side_effect=AssertionError("full rebuild")):
+            ensure_graph(self.root, self.config, jobs=1)
+        second = json.loads(graph_path.read_text(encoding="utf-8"))
+        ids = {n["path"]: n["id"] for n in second["nodes"]}
+        self.assertEqual({n["path"]: ids[n["path"]] for n in first["nodes"]},
+                         {n["path"]: n["id"] for n in first["nodes"]})
+        self.assertIn("src/later.ts", ids)
+
+
+if __name__ == "__main__":
+    unittest.main()
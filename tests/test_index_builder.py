@@ -0,0 +1,244 @@
+"""Tests for incremental updates of the pc embed index."""
+
+import argparse
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+try:
+    import faiss  # noqa: F401
+    import numpy  # noqa: F401
+    HAS_EMBEDDING_DEPS = True
+except ImportError:
+    HAS_EMBEDDING_DEPS = False
+
+if HAS_EMBEDDING_DEPS:
+    from project_control.embedding import index_builder
+    from project_control.embedding.config import EmbedConfig
+    from project_control.embedding.embed_provider import HashingEmbedProvider
+    from project_control.embedding.index_builder import build_index
+    from project_control.embedding.metadata_store import ChunkMetadataStore
+    from project_control.embedding.search_engine import SearchEngine
+    from project_control.core.content_store import ContentStore
+    from project_control.core.scanner import scan_project
+
+
+@unittest.skipUnless(HAS_EMBEDDING_DEPS, "embedding extra not installed")
+class IncrementalBuildTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.cfg = EmbedConfig(provider="hashing", hashing_dim=256, chunk_size_chars=120, overlap_chars=20)
+        (self.root / "src").mkdir()
+        self._write("src/http.js", "function parseHttpResponse(body) { return JSON.parse(body); }\n" * 3)
+        self._write("src/math.ts", "export function addNumbers(a: number, b: number) { return a + b; }\n")
+        self._write("README.md", "# Demo\nSmall project for tests.\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, rel, text):
+        (self.root / rel).write_text(text, encoding="utf-8")
+
+    def test_first_build_embeds_everything(self):
+        result = build_index(self.root, self.cfg)
+        self.assertEqual(result.file_count, 3)
+        self.assertEqual(result.changed_files, 3)
+        self.assertEqual(result.embedded_chunks, result.chunk_count)
+        self.assertTrue((self.root / self.cfg.index_path).exists())
+
+    def test_unchanged_tree_embeds_nothing(self):
+        first = build_index(self.root, self.cfg)
+        second = build_index(self.root, self.cfg)
+        self.assertEqual(second.embedded_chunks, 0)
+        self.assertEqual(second.removed_chunks, 0)
+        self.assertEqual(second.chunk_count, first.chunk_count)
+
+    def test_only_changed_and_deleted_files_are_touched(self):
+        first = build_index(self.root, self.cfg)
+        self._write("src/math.ts", "export function multiplyNumbers(a: number, b: number) { return a * b; }\n")
+        (self.root / "README.md").unlink()
+
+        second = build_index(self.root, self.cfg)
+        self.assertEqual(second.changed_files, 1)
+        self.assertEqual(second.embedded_chunks, 1)
+        self.assertEqual(second.removed_chunks, 2)
+        self.assertEqual(second.chunk_count, first.chunk_count - 1)
+
+        engine = SearchEngine(self.root, self.cfg)
+        self.assertEqual(engine.index.ntotal, second.chunk_count)
+        paths = {hit.file_path for hit in engine.search("multiply numbers", top_k=10)}
+        self.assertNotIn("README.md", paths)
+        self.assertEqual(engine.search("multiplyNumbers", top_k=1)[0].file_path, "src/math.ts")
+
+    def test_incremental_matches_full_rebuild(self):
+        build_index(self.root, self.cfg)
+        self._write("src/http.js", "function sendHttpRequest(url) { return fetch(url); }\n")
+        build_index(self.root, self.cfg)
+        incremental = [(h.file_path, h.start_offset, round(h.similarity_score, 5))
+                       for h in SearchEngine(self.root, self.cfg).search("http request", top_k=5)]
+
+        build_index(self.root, self.cfg, overwrite=True)
+        full = [(h.file_path, h.start_offset, round(h.similarity_score, 5))
+                for h in SearchEngine(self.root, self.cfg).search("http request", top_k=5)]
+        self.assertEqual(incremental, full)
+
+    def test_config_change_forces_full_rebuild(self):
+        build_index(self.root, self.cfg)
+        cfg = EmbedConfig(provider="hashing", hashing_dim=128, chunk_size_chars=120, overlap_chars=20)
+        result = build_index(self.root, cfg)
+        self.assertEqual(result.changed_files, 3)
+        self.assertEqual(result.dim, 128)
+
+    def test_chunk_mode_change_forces_full_rebuild(self):
+        build_index(self.root, self.cfg)
+        cfg = EmbedConfig(provider="hashing", hashing_dim=256, chunk_size_chars=120, overlap_chars=20,
+                          chunk_mode="syntax")
+        result = build_index(self.root, cfg)
+        self.assertEqual(result.changed_files, 3)
+        self.assertEqual(result.embedded_chunks, result.chunk_count)
+
+    def test_build_from_snapshot_uses_scan_content(self):
+        snapshot = scan_project(str(self.root), [".git", ".project-control"], [".js", ".ts"])
+        store = ContentStore(snapshot, self.root / ".project-control" / "snapshot.json")
+        # Edits after the scan are not seen: the index follows the snapshot
+        self._write("src/math.ts", "export const unrelated = 1;\n")
+
+        with mock.patch.object(index_builder, "_iter_files") as walk:
+            result = build_index(self.root, self.cfg, content_store=store)
+        walk.assert_not_called()
+        self.assertEqual(result.file_count, 2)
+        hit = SearchEngine(self.root, self.cfg).search("addNumbers", top_k=1)[0]
+        self.assertEqual(hit.file_path, "src/math.ts")
+        self.assertIn("addNumbers", hit.preview_text)
+
+        expected = {entry["path"].replace("\\", "/"): entry["sha256"] for entry in snapshot["files"]}
+        store = ChunkMetadataStore.open(self.root / self.cfg.metadata_path)
+        self.assertEqual(store.file_shas(), expected)
+        store.close()
+
+    def test_search_reads_only_returned_rows(self):
+        build_index(self.root, self.cfg)
+        engine = SearchEngine(self.root, self.cfg)
+        with mock.patch.object(engine.metadata, "get_many", wraps=engine.metadata.get_many) as fetch:
+            hits = engine.search("parseHttpResponse", top_k=2)
+        engine.close()
+        self.assertEqual(len(hits), 2)
+        fetch.assert_called_once()
+        self.assertEqual(len(fetch.call_args[0][0]), 2)
+
+    def test_model_mismatch_closes_the_metadata_store(self):
+        build_index(self.root, self.cfg)
+        other = EmbedConfig(provider="hashing", hashing_dim=128, chunk_size_chars=120, overlap_chars=20)
+        with mock.patch.object(ChunkMetadataStore, "close", autospec=True, side_effect=ChunkMetadataStore.close) as close:
+            with self.assertRaises(RuntimeError):
+                SearchEngine(self.root, other)
+        close.assert_called_once()
+
+    def test_cli_search_closes_the_engine_on_error(self):
+        from project_control.cli.router import dispatch
+
+        build_index(self.root, self.cfg)
+        args = argparse.Namespace(command="embed", embed_cmd="search", path=str(self.root), query="x", top_k=5)
+        with mock.patch("project_control.embedding.config.load_embed_config", return_value=self.cfg), \
+                mock.patch.object(SearchEngine, "search", side_effect=RuntimeError("boom")), \
+                mock.patch.object(SearchEngine, "close", autospec=True, side_effect=SearchEngine.close) as close, \
+                mock.patch("builtins.print"):
+            self.assertNotEqual(dispatch(args), 0)
+        close.assert_called_once()
+
+    def test_interrupted_update_keeps_previous_metadata(self):
+        build_index(self.root, self.cfg)
+        self._write("src/math.ts", "export function subtract(a: number, b: number) { return a - b; }\n")
+        with mock.patch.object(index_builder, "write_index", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                build_index(self.root, self.cfg)
+        store = ChunkMetadataStore.open(self.root / self.cfg.metadata_path)
+        self.assertIn("addNumbers", " ".join(r["preview_text"] for r in store.get_many(range(1, 100)).values()))
+        store.close()
+
+
+if HAS_EMBEDDING_DEPS:
+
+    class _FlakyProvider(HashingEmbedProvider):
+        """Hashing provider that raises after a fixed number of embed_batch calls."""
+
+        def __init__(self, config, fail_after):
+            super().__init__(config)
+            self.fail_after = fail_after
+            self.batches = 0
+
+        def embed_batch(self, texts):
+            if self.fail_after is not None and self.batches >= self.fail_after:
+                raise RuntimeError("embedding server went away")
+            self.batches += 1
+            return super().embed_batch(texts)
+
+
+@unittest.skipUnless(HAS_EMBEDDING_DEPS, "embedding extra not installed")
+class ResumableBuildTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.cfg = EmbedConfig(
+            provider="hashing", hashing_dim=128, chunk_size_chars=60, overlap_chars=0, checkpoint_chunks=2
+        )
+        for n in range(5):
+            (self.root / f"mod{n}.js").write_text(f"function handler{n}(event) {{ return event.value{n}; }}\n" * 2)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _build(self, fail_after=None, **kwargs):
+        provider = _FlakyProvider(self.cfg, fail_after)
+        with mock.patch.object(index_builder, "open_embedder", return_value=provider):
+            return index_builder.build_index(self.root, self.cfg, **kwargs), provider
+
+    def test_resume_continues_from_last_checkpoint(self):
+        with self.assertRaises(RuntimeError):
+            self._build(fail_after=2)
+        self.assertTrue((self.root / self.cfg.staging_dir / "batch_00001.npz").exists())
+
+        result, provider = self._build(resume=True)
+        self.assertEqual(result.resumed_batches, 2)
+        self.assertEqual(result.embedded_chunks, result.chunk_count - 4)
+        self.assertFalse((self.root / self.cfg.staging_dir).exists())
+
+        resumed = SearchEngine(self.root, self.cfg).search("handler3 event", top_k=3)
+        build_index(self.root, self.cfg, overwrite=True)
+        full = SearchEngine(self.root, self.cfg).search("handler3 event", top_k=3)
+        self.assertEqual(resumed, full)
+
+    def test_plain_build_discards_stale_staging(self):
+        with self.assertRaises(RuntimeError):
+            self._build(fail_after=1)
+        result, _ = self._build()
+        self.assertEqual(result.resumed_batches, 0)
+        self.assertEqual(result.embedded_chunks, result.chunk_count)
+
+    def test_resume_ignores_staging_of_a_different_plan(self):
+        with self.assertRaises(RuntimeError):
+            self._build(fail_after=1)
+        (self.root / "mod0.js").write_text("function changed() {}\n")
+        result, _ = self._build(resume=True)
+        self.assertEqual(result.resumed_batches, 0)
+        self.assertEqual(result.discarded_batches, 1)
+        self.assertEqual(result.embedded_chunks, result.chunk_count)
+
+    def test_interrupted_rebuild_resumes_only_as_a_rebuild(self):
+        self._build()
+        with self.assertRaises(RuntimeError):
+            self._build(fail_after=2, overwrite=True)
+        result, _ = self._build(resume=True, overwrite=True)
+        self.assertEqual(result.resumed_batches, 2)
+        self.assertEqual(result.discarded_batches, 0)
+
+        with self.assertRaises(RuntimeError):
+            self._build(fail_after=2, overwrite=True)
+        result, _ = self._build(resume=True)
+        self.assertEqual((result.resumed_batches, result.discarded_batches), (0, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+"""Tests for configurable FAISS index types used by pc embed."""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+try:
+    import faiss
+    import numpy as np
+    HAS_EMBEDDING_DEPS = True
+except ImportError:
+    HAS_EMBEDDING_DEPS = False
+
+if HAS_EMBEDDING_DEPS:
+    from project_control.embedding.config import EmbedConfig
+    from project_control.embedding.index_builder import build_index
+    from project_control.embedding.index_factory import (
+        apply_search_params,
+        create_index,
+        remove_ids,
+        resolve_index_spec,
+    )
+    from project_control.embedding.search_engine import SearchEngine
+
+
+def _unit_vectors(n, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    vecs = rng.standard_normal((n, dim)).astype(np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+@unittest.skipUnless(HAS_EMBEDDING_DEPS, "embedding extra not installed")
+class ResolveIndexSpecTests(unittest.TestCase):
+    def test_flat_is_default(self):
+        self.assertEqual(resolve_index_spec(EmbedConfig(), 64, 10), ("flat", "IDMap2,Flat"))
+
+    def test_small_corpus_falls_back(self):
+        self.assertEqual(resolve_index_spec(EmbedConfig(index_type="ivf_flat"), 64, 20)[0], "flat")
+        self.assertEqual(resolve_index_spec(EmbedConfig(index_type="ivf_pq"), 64, 2000)[0], "ivf_flat")
+
+    def test_ivf_pq_subquantizers_divide_dim(self):
+        cfg = EmbedConfig(index_type="ivf_pq", pq_m=16, pq_nbits=4, ivf_nlist=8)
+        self.assertEqual(resolve_index_spec(cfg, 24, 5000), ("ivf_pq", "IDMap2,IVF8,PQ12x4"))
+
+    def test_unknown_type_is_rejected(self):
+        with self.assertRaises(ValueError):
+            resolve_index_spec(EmbedConfig(index_type="lsh"), 64, 10)
+
+    def test_hnsw_remove_rebuilds_survivors(self):
+        vecs = _unit_vectors(200, 16)
+        index, kind = create_index(EmbedConfig(index_type="hnsw", hnsw_m=8), 16, 200)
+        index.add_with_ids(vecs, np.arange(1, 201, dtype=np.int64))
+
+        index = remove_ids(index, np.array([5, 6, 7], dtype=np.int64), kind)
+        self.assertEqual(index.ntotal, 197)
+        apply_search_params(index, ef_search=128)
+        _, ids = index.search(vecs[9:10], 1)
+        self.assertEqual(int(ids[0][0]), 10)
+        _, ids = index.search(vecs[5:6], 5)
+        self.assertNotIn(6, ids[0].tolist())
+
+    def test_search_params_reach_ivf(self):
+        vecs = _unit_vectors(1000, 16)
+        index, kind = create_index(EmbedConfig(index_type="ivf_flat", ivf_nlist=10), 16, 1000)
+        self.assertEqual(kind, "ivf_flat")
+        index.train(vecs)
+        apply_search_params(index, nprobe=7)
+        self.assertEqual(faiss.extract_index_ivf(index).nprobe, 7)
+
+
+@unittest.skipUnless(HAS_EMBEDDING_DEPS, "embedding extra not installed")
+class QuantizedBuildTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        for n in range(60):
+            text = "".join(f"export function task{n}_{k}(input{k}) {{ return input{k} * {k}; }}\n" for k in range(12))
+            (self.root / f"mod{n}.js").write_text(text, encoding="utf-8")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _cfg(self, **kwargs):
+        return EmbedConfig(provider="hashing", hashing_dim=64, chunk_size_chars=60, overlap_chars=0,
+                           checkpoint_chunks=100, train_sample=500, **kwargs)
+
+    def _meta(self, cfg):
+        return json.loads((self.root / cfg.meta_path).read_text(encoding="utf-8"))
+
+    def test_ivf_index_is_trained_and_recorded(self):
+        cfg = self._cfg(index_type="ivf_flat", ivf_nlist=8)
+        result = build_index(self.root, cfg)
+        self.assertGreater(result.chunk_count, 8 * 39)
+        self.assertEqual(self._meta(cfg)["index_type"], "ivf_flat")
+
+        engine = SearchEngine(self.root, cfg)
+        hit = engine.search("task7_3 input3", top_k=1, nprobe=8)[0]
+        self.assertEqual(hit.file_path, "mod7.js")
+
+    def test_hnsw_incremental_update(self):
+        cfg = self._cfg(index_type="hnsw", hnsw_m=8)
+        first = build_index(self.root, cfg)
+        (self.root / "mod3.js").write_text("export const renamedThing = 1;\n", encoding="utf-8")
+        second = build_index(self.root, cfg)
+        self.assertEqual(self._meta(cfg)["index_type"], "hnsw")
+        self.assertLess(second.chunk_count, first.chunk_count)
+
+        engine = SearchEngine(self.root, cfg)
+        self.assertEqual(engine.index.ntotal, second.chunk_count)
+        self.assertEqual(engine.search("renamedThing", top_k=1, ef_search=200)[0].file_path, "mod3.js")
+
+    def test_changing_index_type_rebuilds(self):
+        build_index(self.root, self._cfg())
+        cfg = self._cfg(index_type="ivf_flat", ivf_nlist=4)
+        result = build_index(self.root, cfg)
+        self.assertEqual(result.embedded_chunks, result.chunk_count)
+        self.assertEqual(self._meta(cfg)["index_type"], "ivf_flat")
+
+
+if __name__ == "__main__":
+    unittest.main()
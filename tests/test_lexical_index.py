@@ -0,0 +1,135 @@
+"""Tests for the BM25 lexical index and the hybrid search modes of pc embed."""
+
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from project_control.embedding.lexical_index import LexicalIndex, tokenize
+
+try:
+    import faiss  # noqa: F401
+    import numpy  # noqa: F401
+    HAS_EMBEDDING_DEPS = True
+except ImportError:
+    HAS_EMBEDDING_DEPS = False
+
+if HAS_EMBEDDING_DEPS:
+    from project_control.embedding import search_engine
+    from project_control.embedding.config import EmbedConfig
+    from project_control.embedding.index_builder import build_index
+    from project_control.embedding.search_engine import SearchEngine
+
+
+class LexicalIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.index = LexicalIndex(self.conn)
+        self.index.add([
+            (1, "function parseHttpResponse(body) { return JSON.parse(body); }"),
+            (2, "function renderButton(label) { return '<button>' + label; }"),
+            (3, "// http client helpers: sendHttpRequest, retryHttpRequest"),
+        ])
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_tokenize_splits_identifiers(self):
+        self.assertEqual(
+            tokenize("parseHTTPResponse x2"),
+            ["parsehttpresponse", "parse", "http", "response", "x2", "x", "2"],
+        )
+
+    def test_exact_identifier_ranks_first(self):
+        ranked = self.index.search("parseHttpResponse", top_k=3)
+        self.assertEqual(ranked[0][0], 1)
+        self.assertEqual({chunk_id for chunk_id, _ in ranked}, {1, 3})
+
+    def test_rare_terms_outweigh_common_ones(self):
+        ranked = self.index.search("button function", top_k=3)
+        self.assertEqual(ranked[0][0], 2)
+
+    def test_removed_chunks_are_not_returned(self):
+        self.index.remove([1])
+        self.assertEqual([chunk_id for chunk_id, _ in self.index.search("http parse")], [3])
+
+    def test_unknown_terms_return_nothing(self):
+        self.assertEqual(self.index.search("zzz"), [])
+        self.assertEqual(self.index.search("  "), [])
+
+    def test_imports_without_the_embedding_extra(self):
+        code = (
+            "import sys; sys.modules['numpy'] = sys.modules['faiss'] = None; "
+            "from project_control.embedding.lexical_index import LexicalIndex"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+@unittest.skipUnless(HAS_EMBEDDING_DEPS, "embedding extra not installed")
+class SearchModeTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        files = {
+            "auth.js": "export function checkPassword(user, password) { return hash(password) === user.hash; }\n",
+            "cart.js": "export function addToCart(cart, item) { cart.items.push(item); return cart; }\n",
+            "http.js": "export function fetchJson(url) { return fetch(url).then(r => r.json()); }\n",
+            "notes.md": "Each password hash is salted before storage.\n",
+        }
+        for name, text in files.items():
+            (self.root / name).write_text(text, encoding="utf-8")
+        self.cfg = EmbedConfig(provider="hashing", hashing_dim=256, chunk_size_chars=400, overlap_chars=0)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _search(self, query, mode, cfg=None, top_k=2):
+        engine = SearchEngine(self.root, cfg or self.cfg, mode=mode)
+        try:
+            return [hit.file_path for hit in engine.search(query, top_k=top_k)]
+        finally:
+            engine.close()
+
+    def test_lexical_only_build_needs_no_provider(self):
+        with mock.patch("project_control.embedding.index_builder.open_embedder") as embedder, \
+                mock.patch.object(search_engine, "build_provider") as provider:
+            result = build_index(self.root, self.cfg, lexical_only=True)
+            self.assertEqual(self._search("addToCart", "lexical")[0], "cart.js")
+        embedder.assert_not_called()
+        provider.assert_not_called()
+        self.assertEqual(result.embedded_chunks, 0)
+        self.assertFalse((self.root / self.cfg.index_path).exists())
+        with self.assertRaises(RuntimeError):
+            SearchEngine(self.root, self.cfg, mode="vector")
+
+    def test_hybrid_reranks_lexical_candidates(self):
+        build_index(self.root, self.cfg)
+        hits = self._search("password hash", "hybrid", top_k=5)
+        self.assertEqual(set(hits), {"auth.js", "notes.md"})
+        self.assertEqual(self._search("checkPassword", "hybrid")[0], "auth.js")
+
+    def test_hybrid_falls_back_to_vectors_without_lexical_match(self):
+        build_index(self.root, self.cfg)
+        self.assertEqual(self._search("qqq", "hybrid"), self._search("qqq", "vector"))
+
+    def test_hybrid_fuses_when_vectors_cannot_be_reconstructed(self):
+        build_index(self.root, self.cfg)
+        engine = SearchEngine(self.root, self.cfg, mode="hybrid")
+        with mock.patch.object(engine.index, "reconstruct", side_effect=RuntimeError("direct map not initialized")):
+            hits = engine.search("addToCart cart items", top_k=2)
+        engine.close()
+        self.assertEqual(hits[0].file_path, "cart.js")
+        self.assertLessEqual(hits[0].similarity_score, 2.0 / (self.cfg.rrf_k + 1))
+
+    def test_unknown_mode_is_rejected(self):
+        build_index(self.root, self.cfg)
+        with self.assertRaises(ValueError):
+            SearchEngine(self.root, self.cfg, mode="fuzzy")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""Tests for the pure-NumPy fallback vector index."""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    import faiss  # noqa: F401
+    HAS_FAISS = True
+except ImportError:
+    HAS_FAISS = False
+
+if HAS_NUMPY:
+    from project_control.embedding import index_factory, numpy_index
+    from project_control.embedding.config import EmbedConfig
+    from project_control.embedding.index_builder import build_index
+    from project_control.embedding.numpy_index import NumpyFlatIndex
+    from project_control.embedding.search_engine import SearchEngine
+
+
+def _unit_vectors(n, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    vecs = rng.standard_normal((n, dim)).astype(np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+@unittest.skipUnless(HAS_NUMPY, "embedding extra not installed")
+class NumpyFlatIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.vecs = _unit_vectors(500, 16)
+        self.ids = np.arange(1000, 1500, dtype=np.int64)
+        self.index = NumpyFlatIndex(16)
+        self.index.add_with_ids(self.vecs, self.ids)
+
+    def _exact(self, queries, k):
+        scores = queries @ self.vecs.T
+        order = np.argsort(-scores, axis=1)[:, :k]
+        return self.ids[order]
+
+    def test_blocked_search_matches_brute_force(self):
+        queries = _unit_vectors(3, 16, seed=1)
+        with mock.patch.object(numpy_index, "_BLOCK_ROWS", 64):
+            scores, ids = self.index.search(queries, 7)
+        np.testing.assert_array_equal(ids, self._exact(queries, 7))
+        self.assertTrue(np.all(np.diff(scores, axis=1) <= 0))
+
+    def test_results_are_padded_like_faiss(self):
+        small = NumpyFlatIndex(16)
+        small.add_with_ids(self.vecs[:2], self.ids[:2])
+        scores, ids = small.search(self.vecs[:1], 4)
+        self.assertEqual(ids[0].tolist()[2:], [-1, -1])
+        self.assertTrue(np.isneginf(scores[0][3]))
+
+    def test_remove_and_reconstruct(self):
+        self.assertEqual(self.index.remove_ids(np.array([1000, 1001, 9999])), 2)
+        self.assertEqual(self.index.ntotal, 498)
+        np.testing.assert_array_equal(self.index.reconstruct(1002), self.vecs[2])
+        with self.assertRaises(RuntimeError):
+            self.index.reconstruct(1000)
+
+    def test_write_and_memory_mapped_read(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "index.faiss"
+            self.index.write(path)
+            loaded = NumpyFlatIndex.read(path)
+            self.assertIsInstance(loaded._vectors, np.memmap)
+            queries = _unit_vectors(2, 16, seed=2)
+            np.testing.assert_array_equal(loaded.search(queries, 5)[1], self.index.search(queries, 5)[1])
+            loaded.add_with_ids(queries, np.array([1, 2]))
+            self.assertEqual(loaded.ntotal, 502)
+
+
+@unittest.skipUnless(HAS_NUMPY, "embedding extra not installed")
+class NumpyBackendBuildTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        for n in range(20):
+            (self.root / f"mod{n}.js").write_text(
+                f"export function handler{n}(event) {{ return event.value{n} + {n}; }}\n", encoding="utf-8"
+            )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _cfg(self, backend):
+        return EmbedConfig(provider="hashing", hashing_dim=64, chunk_size_chars=200, overlap_chars=0,
+                           index_backend=backend)
+
+    def _search(self, cfg, query):
+        engine = SearchEngine(self.root, cfg)
+        try:
+            return [(hit.file_path, round(hit.similarity_score, 5)) for hit in engine.search(query, top_k=5)]
+        finally:
+            engine.close()
+
+    def test_auto_uses_numpy_without_faiss(self):
+        cfg = self._cfg("auto")
+        with mock.patch.object(index_factory, "faiss", None):
+            build_index(self.root, cfg)
+            (self.root / "mod3.js").write_text("export const renamed = 1;\n", encoding="utf-8")
+            result = build_index(self.root, cfg)
+            self.assertEqual(result.embedded_chunks, 1)
+            hits = self._search(cfg, "handler7 event")
+        self.assertEqual(hits[0][0], "mod7.js")
+        self.assertFalse((self.root / cfg.index_path).exists())
+
+    def test_explicit_faiss_without_faiss_fails_clearly(self):
+        with mock.patch.object(index_factory, "faiss", None):
+            with self.assertRaises(RuntimeError):
+                build_index(self.root, self._cfg("faiss"))
+
+    @unittest.skipUnless(HAS_FAISS, "faiss not installed")
+    def test_backends_agree(self):
+        build_index(self.root, self._cfg("numpy"))
+        numpy_hits = self._search(self._cfg("numpy"), "handler12 value12")
+        build_index(self.root, self._cfg("faiss"))
+        faiss_hits = self._search(self._cfg("faiss"), "handler12 value12")
+        # Tied scores may come back in a different order; compare ranks by score
+        self.assertEqual([score for _, score in faiss_hits], [score for _, score in numpy_hits])
+        self.assertEqual(faiss_hits[0], numpy_hits[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -12,6 +12,11 @@ def _make_snapshot(paths: list[str]) -> dict:
     return {"files": [{"path": p} for p in paths]}
 
 
+def _rg_results(matches: list[dict]):
+    """Fake run_rg_multi: every query gets ``matches``."""
+    return lambda queries, *args, **kwargs: {name: list(matches) for name in queries}
+
+
 def _fake_content_store() -> object:
     """ContentStore is not used by orphan_detector, pass a sentinel."""
     return None
@@ -20,31 +25,31 @@ def _fake_content_store() -> object:
 class OrphanDetectorTests(unittest.TestCase):
     """Test the orphan detector in isolation."""
 
-    @patch("project_control.analysis.orphan_detector.run_rg")
+    @patch("project_control.analysis.orphan_detector.run_rg_multi")
     def test_unreferenced_code_file_is_orphan(self, mock_rg):
         """A .py file with no imports/requires referencing it should be orphaned."""
-        mock_rg.return_value = ""  # rg finds nothing → orphan
+        mock_rg.side_effect = _rg_results([])  # rg finds nothing → orphan
 
         snapshot = _make_snapshot(["src/utils.py"])
         result = detect_orphans(snapshot, {}, _fake_content_store())
 
         self.assertEqual(result, ["src/utils.py"])
 
-    @patch("project_control.analysis.orphan_detector.run_rg")
+    @patch("project_control.analysis.orphan_detector.run_rg_multi")
     def test_referenced_file_is_not_orphan(self, mock_rg):
         """A file whose stem appears in rg results is NOT orphaned."""
         # rg returns a match → file is referenced
-        mock_rg.return_value = "some/file.py:1:from utils import something"
+        mock_rg.side_effect = _rg_results([{"file": "some/file.py", "line": 1, "text": "from utils import something"}])
 
         snapshot = _make_snapshot(["src/utils.py"])
         result = detect_orphans(snapshot, {}, _fake_content_store())
 
         self.assertEqual(result, [])
 
-    @patch("project_control.analysis.orphan_detector.run_rg")
+    @patch("project_control.analysis.orphan_detector.run_rg_multi")
     def test_entrypoint_skipped_even_if_unreferenced(self, mock_rg):
         """Files listed in patterns['entrypoints'] are never orphans."""
-        mock_rg.return_value = ""
+        mock_rg.side_effect = _rg_results([])
 
         snapshot = _make_snapshot(["app.py", "server.py"])
         patterns = {"entrypoints": ["app.py"]}
@@ -55,31 +60,47 @@ class OrphanDetectorTests(unittest.TestCase):
         self.assertIn("server.py", result)
         self.assertNotIn("app.py", result)
 
-    @patch("project_control.analysis.orphan_detector.run_rg")
+    @patch("project_control.analysis.orphan_detector.run_rg_multi")
     def test_non_code_files_ignored(self, mock_rg):
         """Files with non-code extensions (.json, .md, .txt) are skipped."""
-        mock_rg.return_value = ""
+        mock_rg.side_effect = _rg_results([])
 
         snapshot = _make_snapshot(["data/config.json", "docs/readme.md", "notes.txt"])
         result = detect_orphans(snapshot, {}, _fake_content_store())
 
         self.assertEqual(result, [])
 
-    @patch("project_control.analysis.orphan_detector.run_rg")
+    @patch("project_control.analysis.orphan_detector.run_rg_multi")
     def test_js_and_ts_files_detected(self, mock_rg):
         """JS and TS files are checked for orphan status."""
-        mock_rg.return_value = ""
+        mock_rg.side_effect = _rg_results([])
 
         snapshot = _make_snapshot(["src/helpers.js", "src/types.ts"])
         result = detect_orphans(snapshot, {}, _fake_content_store())
 
         self.assertEqual(sorted(result), ["src/helpers.js", "src/types.ts"])
 
-    @patch("project_control.analysis.orphan_detector.run_rg")
+    @patch("project_control.analysis.orphan_detector.run_rg_multi")
     def test_empty_snapshot_returns_empty(self, mock_rg):
         """Empty snapshot produces no orphans."""
         result = detect_orphans({"files": []}, {}, _fake_content_store())
         self.assertEqual(result, [])
+        mock_rg.assert_not_called()
+
+    @patch("project_control.analysis.orphan_detector.run_rg_multi")
+    def test_all_candidates_share_one_search(self, mock_rg):
+        """Every candidate is a named query of a single batched rg call."""
+        mock_rg.side_effect = lambda queries, *a, **k: {
+            name: [{"file": "main.py", "line": 1, "text": "import helpers"}] if "helpers" in name else []
+            for name in queries
+        }
+
+        snapshot = _make_snapshot(["src/helpers.py", "src/unused.py", "lib/unused.py"])
+        result = detect_orphans(snapshot, {}, _fake_content_store())
+
+        mock_rg.assert_called_once()
+        self.assertEqual(set(mock_rg.call_args[0][0]), {"src/helpers.py", "src/unused.py", "lib/unused.py"})
+        self.assertEqual(result, ["src/unused.py", "lib/unused.py"])
 
 
 if __name__ == "__main__":
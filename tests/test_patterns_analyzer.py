@@ -0,0 +1,128 @@
+"""Tests for patterns_analyzer — batched pattern scan with per-file cache."""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from project_control.analysis import patterns_analyzer
+from project_control.analysis.patterns_analyzer import analyze_patterns
+from project_control.core.search_scope import SearchScope
+
+PATTERNS_YAML = """\
+patterns:
+  debug_code:
+    - 'console\\.log'
+    - 'print\\('
+  hardcoded_secrets:
+    - 'password\\s*=\\s*["\\x27]'
+  empty_group: []
+"""
+
+FILES = {
+    "src/app.py": "import os\nprint('hi')\npassword = 'hunter2'\n",
+    "web/app.js": "const a = 1;\nconsole.log(a);\n",
+    "docs/readme.md": "print('not code')\n",
+}
+
+
+class PatternsAnalyzerTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        for rel, text in FILES.items():
+            path = self.root / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text, encoding="utf-8")
+        self.patterns_file = self.root / "patterns.yaml"
+        self.patterns_file.write_text(PATTERNS_YAML, encoding="utf-8")
+        self.scope = SearchScope(list(FILES), self.root / "scope.ignore")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _analyze(self):
+        return analyze_patterns(self.root, patterns_file=self.patterns_file, scope=self.scope)
+
+    @patch("project_control.analysis.patterns_analyzer.SearchScope.load", return_value=None)
+    @patch("project_control.analysis.patterns_analyzer.run_rg_multi")
+    def test_without_snapshot_all_groups_share_one_rg_pass(self, mock_multi, _load):
+        mock_multi.return_value = {
+            "debug_code": [{"file": "web/app.js", "line": 2, "text": "console.log(a);"}],
+            "hardcoded_secrets": [],
+        }
+        result = analyze_patterns(self.root, patterns_file=self.patterns_file)
+        mock_multi.assert_called_once()
+        self.assertEqual(sorted(mock_multi.call_args[0][0]), ["debug_code", "hardcoded_secrets"])
+        self.assertEqual(result["patterns"], {
+            "debug_code": {"matches": [{"line": 2, "text": "console.log(a);", "file": "web/app.js"}]},
+        })
+        self.assertEqual(result["stats"], {"total_patterns": 3, "matched_patterns": 1, "total_matches": 1})
+
+    def test_scoped_scan_matches_code_files(self):
+        result = self._analyze()
+        self.assertEqual(result["patterns"]["debug_code"]["matches"], [
+            {"line": 2, "text": "print('hi')", "file": "src/app.py"},
+            {"line": 2, "text": "console.log(a);", "file": "web/app.js"},
+        ])
+        self.assertEqual(result["patterns"]["hardcoded_secrets"]["matches"], [
+            {"line": 3, "text": "password = 'hunter2'", "file": "src/app.py"},
+        ])
+        self.assertEqual(result["stats"]["total_matches"], 3)
+
+    def test_rerun_only_scans_changed_files(self):
+        first = self._analyze()
+        scanned = []
+        real_matcher = patterns_analyzer._file_matcher
+
+        def counting_matcher(groups):
+            match = real_matcher(groups)
+            return lambda text: scanned.append(text) or match(text)
+
+        with patch.object(patterns_analyzer, "_file_matcher", counting_matcher):
+            self.assertEqual(self._analyze(), first)
+            self.assertEqual(scanned, [])
+
+            path = self.root / "web" / "app.js"
+            path.write_text("debugger;\n", encoding="utf-8")
+            os.utime(path, ns=(1, 1))
+            result = self._analyze()
+        self.assertEqual(scanned, ["debugger;\n"])
+        self.assertEqual(len(result["patterns"]["debug_code"]["matches"]), 1)
+
+    def test_changing_patterns_invalidates_cache(self):
+        self._analyze()
+        self.patterns_file.write_text("patterns:\n  imports:\n    - '^import '\n", encoding="utf-8")
+        result = self._analyze()
+        self.assertEqual(result["patterns"]["imports"]["matches"], [
+            {"line": 1, "text": "import os", "file": "src/app.py"},
+        ])
+
+    def test_inline_flags_are_kept_per_pattern(self):
+        self.patterns_file.write_text("patterns:\n  loud:\n    - '(?i)PRINT'\n    - 'console'\n", encoding="utf-8")
+        result = self._analyze()
+        self.assertEqual([m["file"] for m in result["patterns"]["loud"]["matches"]], ["src/app.py", "web/app.js"])
+
+    def test_patterns_with_groups_are_kept_per_pattern(self):
+        self.patterns_file.write_text(
+            "patterns:\n"
+            "  quoted:\n    - \"(?P<q>')hi(?P=q)\"\n    - \"(?P<q>')hunter2(?P=q)\"\n"
+            "  backref:\n    - '(i)mport'\n    - \"(')hi\\\\1\"\n",
+            encoding="utf-8",
+        )
+        result = self._analyze()
+        self.assertEqual([m["line"] for m in result["patterns"]["quoted"]["matches"]], [2, 3])
+        self.assertEqual([m["line"] for m in result["patterns"]["backref"]["matches"]], [1, 2])
+
+    @patch("project_control.analysis.patterns_analyzer.run_rg_multi")
+    def test_patterns_python_cannot_compile_go_to_rg(self, mock_multi):
+        self.patterns_file.write_text("patterns:\n  odd:\n    - '(?<name>x)'\n    - 'console'\n", encoding="utf-8")
+        mock_multi.return_value = {"odd": [{"file": "a.js", "line": 1, "text": "x"}]}
+        result = self._analyze()
+        self.assertEqual(mock_multi.call_args[0][0], {"odd": ["(?<name>x)"]})
+        self.assertEqual([m["file"] for m in result["patterns"]["odd"]["matches"]], ["a.js", "web/app.js"])
+
+
+if __name__ == "__main__":
+    unittest.main()
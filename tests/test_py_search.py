@@ -0,0 +1,115 @@
+"""Tests for the in-process search used when ripgrep is not installed."""
+
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from project_control.core.scanner import scan_project
+from project_control.core.search_scope import SearchScope, read_scope_file
+from project_control.utils import py_search
+from project_control.utils.py_search import iter_files, iter_matches
+
+FILES = {
+    "src/app.py": "from services import UserService\nservice = UserService()\n",
+    "src/cart.js": "import { Cart } from './cart';\nconst c = new Cart();\n// usercount\n",
+    "src/Ünïcode.py": "naïve = 'ÜSER'\n",
+    "README.md": "UserService and Cart docs\n",
+    ".hidden/notes.py": "UserService\n",
+    "node_modules/pkg/index.js": "UserService\n",
+}
+
+
+class PySearchTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        for rel, text in FILES.items():
+            path = self.root / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text, encoding="utf-8")
+        (self.root / "src" / "image.png").write_bytes(b"\x89PNG\x00UserService")
+        self.cwd = os.getcwd()
+        os.chdir(self.root)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def _scope(self):
+        with patch("builtins.print"):
+            snapshot = scan_project(str(self.root), [".project-control", ".hidden", "node_modules"], [".py", ".js"])
+        control_dir = self.root / ".project-control"
+        (control_dir / "snapshot.json").write_text(json.dumps(snapshot), encoding="utf-8")
+        return SearchScope.for_snapshot(snapshot, control_dir)
+
+    def test_working_directory_search(self):
+        self.assertEqual(list(iter_matches(["-e", "UserService"])), [
+            ("README.md", 1, "UserService and Cart docs"),
+            ("src/app.py", 1, "from services import UserService"),
+            ("src/app.py", 2, "service = UserService()"),
+        ])
+        self.assertEqual(list(iter_files(["-e", "UserService", "--hidden"])),
+                         [".hidden/notes.py", "README.md", "src/app.py"])
+
+    def test_flags_types_and_globs(self):
+        self.assertEqual(list(iter_files(["-e", "user", "-i", "-w"])), [])
+        self.assertEqual(list(iter_files(["-e", "user", "-i"])), ["README.md", "src/app.py", "src/cart.js"])
+        self.assertEqual(list(iter_files(["-e", "Cart", "--type", "js"])), ["src/cart.js"])
+        self.assertEqual(list(iter_files(["-e", "Cart", "-g", "*.md"])), ["README.md"])
+        self.assertEqual(list(iter_files(["-e", "Cart", "-g", "!*.md"])), ["src/cart.js"])
+        self.assertEqual(list(iter_files(["-F", "-e", "UserService()"])), ["src/app.py"])
+        self.assertEqual(list(iter_files(["-e", "Cart", "-L"])), ["src/app.py", "src/Ünïcode.py"])
+        self.assertEqual(list(iter_files(["-e", "(?i)üser"])), ["src/Ünïcode.py"])
+
+    def test_explicit_paths(self):
+        self.assertEqual(list(iter_files(["-e", "Cart", "src"])), ["src/cart.js"])
+        self.assertEqual(list(iter_matches(["-e", "UserService", "node_modules/pkg/index.js"])),
+                         [("node_modules/pkg/index.js", 1, "UserService")])
+
+    def test_snapshot_scope_reads_blobs(self):
+        scope = self._scope()
+        self.assertEqual(sorted(read_scope_file(scope.ignore_file)), sorted(scope.paths))
+        # Blobs hold the scanned content: later edits on disk are not seen
+        (self.root / "src" / "app.py").write_text("nothing here\n", encoding="utf-8")
+        self.assertEqual(list(iter_files(["-e", "UserService", *scope.rg_args()])), ["src/app.py"])
+        self.assertEqual(list(iter_files(["-e", "Cart", "--type", "py", *scope.rg_args()])), [])
+
+    def test_patterns_with_groups_are_searched_separately(self):
+        self.assertEqual(list(iter_files(["-e", "(?P<n>Cart)", "-e", "(?P<n>UserService)"])),
+                         list(iter_files(["-e", "Cart|UserService"])))
+        self.assertEqual([line for _, line, _ in iter_matches(["-e", "(o)m", "-e", r"(e)rvic\1", "src/app.py"])],
+                         [1, 2])
+        self.assertEqual(list(iter_files(["-e", "(?i)userservice", "-w"])), ["README.md", "src/app.py"])
+
+    @unittest.skipUnless(shutil.which("git"), "git not installed")
+    def test_gitignore_is_respected_without_a_scope(self):
+        subprocess.run(["git", "init", "-q"], check=True)
+        Path(".gitignore").write_text("README.md\n", encoding="utf-8")
+        self.assertEqual(list(iter_files(["-e", "UserService"])), ["src/app.py"])
+        self.assertEqual(list(iter_files(["-e", "UserService", "--no-ignore"])), ["README.md", "src/app.py"])
+
+    def test_max_results_and_unusable_patterns(self):
+        self.assertEqual(len(list(iter_matches(["-e", "e"], max_results=2))), 2)
+        self.assertEqual(list(iter_matches(["-e", "(?<name>x)"])), [])
+
+    def test_process_pool_gives_the_same_results(self):
+        serial = list(iter_matches(["-e", "Cart|User", "--hidden"], jobs=1))
+        with patch.object(py_search, "PARALLEL_MIN_BYTES", 0), patch.object(py_search, "BATCH_FILES", 1):
+            self.assertEqual(list(iter_matches(["-e", "Cart|User", "--hidden"], jobs=2)), serial)
+        self.assertEqual(len(serial), 6)
+
+    def test_prefilter_skips_files_without_the_literals(self):
+        prefilter = py_search._prefilter([r"new\s+Cart", r"import \w+"], False, False)
+        self.assertTrue(prefilter(b"IMPORT x"))
+        self.assertTrue(prefilter(b"new  cart"))
+        self.assertFalse(prefilter(b"const c = Cart;"))
+        self.assertIsNone(py_search._prefilter(["a.b"], False, False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+"""Tests for the query embedding cache, query log and batched search of pc embed."""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+try:
+    import faiss  # noqa: F401
+    import numpy as np
+    HAS_EMBEDDING_DEPS = True
+except ImportError:
+    HAS_EMBEDDING_DEPS = False
+
+if HAS_EMBEDDING_DEPS:
+    from project_control.embedding import search_engine
+    from project_control.embedding.config import EmbedConfig
+    from project_control.embedding.embed_provider import HashingEmbedProvider
+    from project_control.embedding.index_builder import build_index
+    from project_control.embedding.query_cache import QueryCache
+    from project_control.embedding.search_engine import SearchEngine
+
+    class _CountingProvider(HashingEmbedProvider):
+        """Hashing provider that records every batch sent to it and opts into caching."""
+
+        def __init__(self, config):
+            super().__init__(config)
+            self.cacheable = True
+            self.batches = []
+
+        def embed_batch(self, texts):
+            self.batches.append(list(texts))
+            return super().embed_batch(texts)
+
+
+@unittest.skipUnless(HAS_EMBEDDING_DEPS, "embedding extra not installed")
+class QueryCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "cache.sqlite"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_vectors_persist_per_model(self):
+        cache = QueryCache(self.path)
+        cache.put_many("m1", [("find user", np.array([1.0, 2.0], dtype=np.float32))])
+        cache.close()
+
+        reopened = QueryCache(self.path)
+        np.testing.assert_array_equal(reopened.get_many("m1", ["find user"])["find user"], [1.0, 2.0])
+        self.assertEqual(reopened.get_many("m2", ["find user"]), {})
+        reopened.close()
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = QueryCache(self.path, max_entries=2, memory_entries=0)
+        vec = np.ones(2, dtype=np.float32)
+        with mock.patch("project_control.embedding.query_cache.time.time", side_effect=[1.0, 2.0, 3.0, 4.0]):
+            cache.put_many("m", [("a", vec)])
+            cache.put_many("m", [("b", vec)])
+            cache.get_many("m", ["a"])
+            cache.put_many("m", [("c", vec)])
+        self.assertEqual(set(cache.get_many("m", ["a", "b", "c"])), {"a", "c"})
+        cache.close()
+
+    def test_memory_tier_serves_without_disk(self):
+        cache = QueryCache(None, memory_entries=1)
+        vec = np.ones(2, dtype=np.float32)
+        cache.put_many("m", [("a", vec), ("b", vec)])
+        self.assertEqual(set(cache.get_many("m", ["a", "b"])), {"b"})
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+
+@unittest.skipUnless(HAS_EMBEDDING_DEPS, "embedding extra not installed")
+class CachedSearchTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        files = {
+            "auth.js": "export function checkPassword(user, password) { return hash(password) === user.hash; }\n",
+            "cart.js": "export function addToCart(cart, item) { cart.items.push(item); return cart; }\n",
+            "http.js": "export function fetchJson(url) { return fetch(url).then(r => r.json()); }\n",
+        }
+        for name, text in files.items():
+            (self.root / name).write_text(text, encoding="utf-8")
+        self.cfg = EmbedConfig(provider="hashing", hashing_dim=128, chunk_size_chars=400, overlap_chars=0)
+        build_index(self.root, self.cfg)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _engine(self, provider, cfg=None, mode=None):
+        with mock.patch.object(search_engine, "build_provider", return_value=provider):
+            return SearchEngine(self.root, cfg or self.cfg, mode=mode)
+
+    def test_repeated_query_is_embedded_once_across_engines(self):
+        provider = _CountingProvider(self.cfg)
+        engine = self._engine(provider)
+        first = engine.search("add item to cart")
+        engine.close()
+        provider = _CountingProvider(self.cfg)
+        engine = self._engine(provider)
+        second = engine.search("add item to cart")
+        engine.close()
+        self.assertEqual(provider.batches, [])
+        self.assertEqual(first, second)
+
+    def test_search_many_embeds_missing_queries_in_one_batch(self):
+        provider = _CountingProvider(self.cfg)
+        engine = self._engine(provider)
+        engine.search("fetch json")
+        queries = ["check password", "fetch json", "add item to cart", "check password"]
+        batched = engine.search_many(queries, top_k=2)
+        single = [engine.search(query, top_k=2) for query in queries]
+        engine.close()
+        self.assertEqual(provider.batches, [["fetch json"], ["check password", "add item to cart"]])
+        self.assertEqual(batched, single)
+        self.assertEqual(batched[0][0].file_path, "auth.js")
+
+    def test_search_many_in_hybrid_and_lexical_modes(self):
+        for mode in ("hybrid", "lexical"):
+            engine = self._engine(_CountingProvider(self.cfg), mode=mode)
+            hits = engine.search_many(["addToCart", "fetchJson"], top_k=1)
+            engine.close()
+            self.assertEqual([h[0].file_path for h in hits], ["cart.js", "http.js"], mode)
+
+    def test_queries_are_logged(self):
+        engine = self._engine(_CountingProvider(self.cfg))
+        engine.search_many(["check password", "check password"], top_k=3)
+        engine.close()
+        lines = (self.root / self.cfg.query_log_path).read_text(encoding="utf-8").splitlines()
+        entries = [json.loads(line) for line in lines]
+        self.assertEqual([e["query"] for e in entries], ["check password", "check password"])
+        self.assertEqual(entries[0]["mode"], "vector")
+        self.assertEqual(entries[0]["top_file"], "auth.js")
+        self.assertEqual([e["cached"] for e in entries], [False, False])
+
+    def test_query_log_can_be_disabled(self):
+        cfg = EmbedConfig(provider="hashing", hashing_dim=128, chunk_size_chars=400, overlap_chars=0,
+                          query_log=False)
+        engine = self._engine(_CountingProvider(cfg), cfg=cfg)
+        engine.search("fetch json")
+        engine.close()
+        self.assertFalse((self.root / cfg.query_log_path).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
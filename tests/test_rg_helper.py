@@ -0,0 +1,226 @@
+"""Tests for the ripgrep helpers: streaming matches and batched multi-query search."""
+
+import contextlib
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from project_control.utils import rg_helper
+from project_control.utils.rg_helper import iter_rg_files, iter_rg_json, run_rg_json, run_rg_multi
+
+CORPUS = {
+    "src/app.py": "from services import UserService\nservice = UserService()\nprint('hello')\n",
+    "src/cart.js": "import { Cart } from './cart';\nconst c = new Cart();\n// usercount\n",
+    "README.md": "UserService and Cart docs\n",
+}
+
+
+def _rg_events(cmd):
+    """rg --json output lines for ``cmd``, searching CORPUS with ``re``."""
+    if "-f" in cmd:
+        patterns = Path(cmd[cmd.index("-f") + 1]).read_text(encoding="utf-8").splitlines()
+    else:
+        patterns = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-e"]
+    sources = [re.escape(p) if "-F" in cmd else p for p in patterns]
+    if "-w" in cmd:
+        sources = [rf"\b(?:{p})\b" for p in sources]
+    try:
+        regex = re.compile("|".join(f"(?:{p})" for p in sources), re.IGNORECASE if "-i" in cmd else 0)
+    except re.error:
+        # rg-only syntax such as (?<name>...): no matches in this corpus
+        return patterns, []
+    events = []
+    for path, text in CORPUS.items():
+        events.append({"type": "begin", "data": {"path": {"text": path}}})
+        for number, line in enumerate(text.splitlines(keepends=True), 1):
+            if regex.search(line):
+                events.append({
+                    "type": "match",
+                    "data": {"path": {"text": path}, "lines": {"text": line}, "line_number": number},
+                })
+    if "--files-with-matches" in cmd:
+        files = dict.fromkeys(e["data"]["path"]["text"] for e in events if e["type"] == "match")
+        return patterns, [f"{path}\n" for path in files]
+    return patterns, [json.dumps(event, separators=(",", ":")) + "\n" for event in events]
+
+
+def _by_location(matches):
+    return sorted(matches, key=lambda m: (m["file"], m["line"]))
+
+
+@contextlib.contextmanager
+def _corpus_cwd():
+    """Run from a directory holding CORPUS (for the in-process search fallback)."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        for rel, text in CORPUS.items():
+            path = Path(tmp) / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text, encoding="utf-8")
+        os.chdir(tmp)
+        try:
+            yield
+        finally:
+            os.chdir(cwd)
+
+
+class _FakeProcess:
+    def __init__(self, lines):
+        self.stdout = io.StringIO("".join(lines))
+        self.returncode = None
+        self.killed = False
+        self._status = 0 if any('"type":"match"' in line for line in lines) else 1
+
+    def poll(self):
+        if self.stdout.tell() == len(self.stdout.getvalue()):
+            self.returncode = self._status
+        return self.returncode
+
+    def kill(self):
+        self.killed = True
+        self.returncode = -9
+
+    def wait(self):
+        return self.poll() if self.returncode is None else self.returncode
+
+
+class _FakeRg:
+    """Stand-in for ``subprocess.Popen(["rg", ...])`` that searches CORPUS with ``re``."""
+
+    def __init__(self):
+        self.calls = []
+        self.processes = []
+
+    def __call__(self, cmd, **kwargs):
+        patterns, lines = _rg_events(cmd)
+        self.calls.append(patterns)
+        self.processes.append(_FakeProcess(lines))
+        return self.processes[-1]
+
+
+class RunRgMultiTests(unittest.TestCase):
+    def setUp(self):
+        self.rg = _FakeRg()
+        patcher = patch.object(rg_helper.subprocess, "Popen", side_effect=self.rg)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _files(self, results):
+        return {name: sorted({m["file"] for m in matches}) for name, matches in results.items()}
+
+    def test_matches_are_attributed_to_each_query(self):
+        results = run_rg_multi({
+            "user": ["import.*UserService", r"UserService\("],
+            "cart": r"new Cart",
+            "missing": "NoSuchThing",
+        })
+        self.assertEqual(len(self.rg.calls), 1)
+        self.assertEqual(self._files(results), {"user": ["src/app.py"], "cart": ["src/cart.js"], "missing": []})
+        self.assertEqual([m["line"] for m in results["user"]], [1, 2])
+        self.assertEqual(results["cart"][0]["text"], "const c = new Cart();")
+
+    def test_line_matching_several_queries_is_listed_under_each(self):
+        results = run_rg_multi({"UserService": "UserService", "Cart": "Cart"}, fixed_strings=True)
+        self.assertIn("README.md", self._files(results)["UserService"])
+        self.assertIn("README.md", self._files(results)["Cart"])
+
+    def test_shared_patterns_are_searched_once(self):
+        results = run_rg_multi({"a/utils.py": "UserService", "b/utils.py": "UserService"})
+        self.assertEqual(self.rg.calls, [["UserService"]])
+        self.assertEqual(results["a/utils.py"], results["b/utils.py"])
+
+    def test_pattern_list_is_split_into_passes(self):
+        queries = {f"q{n}": f"token{n}" for n in range(5)}
+        queries["cart"] = "Cart"
+        results = run_rg_multi(queries, fixed_strings=True, max_patterns=2)
+        self.assertEqual(len(self.rg.calls), 3)
+        self.assertEqual(self._files(results)["cart"], ["README.md", "src/cart.js"])
+
+    def test_whole_word_literals_use_token_attribution(self):
+        results = run_rg_multi({"user": "user", "Cart": "Cart"}, fixed_strings=True, word_regexp=True,
+                               ignore_case=True)
+        # "usercount" and "UserService" are not the whole word "user"
+        self.assertEqual(results["user"], [])
+        self.assertEqual(self._files(results)["Cart"], ["README.md", "src/cart.js"])
+
+    def test_patterns_python_cannot_compile_get_their_own_pass(self):
+        results = run_rg_multi({"cart": "Cart", "odd": "(?<name>x"})
+        self.assertEqual(self.rg.calls, [["Cart"], ["(?<name>x"]])
+        self.assertEqual(results["odd"], [])
+
+    def test_missing_rg_falls_back_to_in_process_search(self):
+        expected = run_rg_multi({"user": "UserService", "cart": r"new Cart", "none": "zzz"})
+        with _corpus_cwd(), patch.object(rg_helper.subprocess, "Popen", side_effect=FileNotFoundError):
+            results = run_rg_multi({"user": "UserService", "cart": r"new Cart", "none": "zzz"})
+        # rg's file order is unspecified; the in-process search goes in path order
+        self.assertEqual({k: _by_location(v) for k, v in results.items()},
+                         {k: _by_location(v) for k, v in expected.items()})
+
+    def test_pattern_file_is_removed(self):
+        run_rg_multi({"a": "x", "b": "y"})
+        cmd = rg_helper.subprocess.Popen.call_args[0][0]
+        pattern_file = cmd[cmd.index("-f") + 1]
+        self.assertFalse(os.path.exists(pattern_file))
+
+
+class StreamingRgTests(unittest.TestCase):
+    def setUp(self):
+        self.rg = _FakeRg()
+        patcher = patch.object(rg_helper.subprocess, "Popen", side_effect=self.rg)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_matches_are_yielded_lazily(self):
+        stream = iter_rg_json(["UserService"])
+        self.assertEqual(self.rg.processes, [])
+        first = next(stream)
+        self.assertEqual(first, {"file": "src/app.py", "line": 1, "text": "from services import UserService"})
+        stream.close()
+        self.assertTrue(self.rg.processes[0].killed)
+
+    def test_max_results_stops_rg_early(self):
+        matches = run_rg_json(["UserService", "Cart"], max_results=2)
+        self.assertEqual(len(matches), 2)
+        self.assertTrue(self.rg.processes[0].killed)
+
+    def test_complete_run_is_not_killed_and_drops_raw(self):
+        matches = run_rg_json(["UserService"])
+        self.assertEqual(len(matches), 3)
+        self.assertNotIn("raw", matches[0])
+        self.assertFalse(self.rg.processes[0].killed)
+        self.assertEqual(run_rg_json(["Cart"], include_raw=True)[0]["raw"]["type"], "match")
+
+    def test_files_stream(self):
+        self.assertEqual(list(iter_rg_files(["UserService"], max_results=1)), ["src/app.py"])
+        self.assertEqual(rg_helper.run_rg_files_only(["Cart"]), ["README.md", "src/cart.js"])
+
+    def test_missing_rg_falls_back_to_in_process_search(self):
+        expected = run_rg_json(["UserService", "Cart"])
+        with _corpus_cwd(), patch.object(rg_helper.subprocess, "Popen", side_effect=FileNotFoundError):
+            self.assertEqual(_by_location(run_rg_json(["UserService", "Cart"])), _by_location(expected))
+            self.assertEqual(run_rg_json(["Cart"], include_raw=True)[0]["raw"]["type"], "match")
+            self.assertEqual(rg_helper.run_rg_files_only(["Cart"]), ["README.md", "src/cart.js"])
+            self.assertEqual(list(iter_rg_files(["UserService"], ["-L"])), ["src/cart.js"])
+
+
+@unittest.skipUnless(shutil.which("rg"), "ripgrep not installed")
+class RunRgMultiIntegrationTests(unittest.TestCase):
+    def test_real_rg_attribution(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for rel, text in CORPUS.items():
+                path = Path(tmp) / rel
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(text, encoding="utf-8")
+            results = run_rg_multi({"user": "UserService", "cart": r"new Cart"}, extra_args=[tmp])
+        self.assertEqual(len(results["user"]), 3)
+        self.assertEqual(len(results["cart"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""Tests for the snapshot search scope passed to ripgrep."""
+
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+from project_control.core.search_scope import SearchScope, _ignore_lines, scope_args
+from project_control.utils.rg_helper import run_rg_multi
+
+
+def _snapshot(paths, snapshot_id="s1"):
+    return {"snapshot_id": snapshot_id, "files": [{"path": p, "sha256": "0" * 64} for p in paths]}
+
+
+class IgnoreLinesTests(unittest.TestCase):
+    def test_whitelists_files_and_their_directories(self):
+        self.assertEqual(
+            _ignore_lines(["src/deep/b.py", "src/a.py", "main.py"]),
+            ["*", "!/src/", "!/src/deep/", "!/main.py", "!/src/a.py", "!/src/deep/b.py"],
+        )
+
+    def test_special_characters_are_escaped(self):
+        lines = _ignore_lines(["[id]/page*.tsx", "#notes.md"])
+        self.assertIn("!/\\[id\\]/", lines)
+        self.assertIn("!/\\[id\\]/page\\*.tsx", lines)
+        self.assertIn("!/\\#notes.md", lines)
+
+
+class SearchScopeTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.control = Path(self.tmp.name) / ".project-control"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_ignore_file_is_written_under_cache(self):
+        scope = SearchScope.for_snapshot(_snapshot(["src\\a.py"]), self.control)
+        self.assertEqual(scope.ignore_file, self.control / "cache" / "search_scope.ignore")
+        self.assertIn("!/src/a.py", scope.ignore_file.read_text(encoding="utf-8").splitlines())
+        self.assertIn("src/a.py", scope)
+        self.assertEqual(scope.rg_args(), ["--no-ignore", "--hidden", "--ignore-file", str(scope.ignore_file)])
+
+    def test_ignore_file_is_reused_for_the_same_snapshot(self):
+        scope = SearchScope.for_snapshot(_snapshot(["a.py"]), self.control)
+        mtime = scope.ignore_file.stat().st_mtime_ns
+        os.utime(scope.ignore_file, ns=(mtime - 10**9, mtime - 10**9))
+        SearchScope.for_snapshot(_snapshot(["a.py"]), self.control)
+        self.assertEqual(scope.ignore_file.stat().st_mtime_ns, mtime - 10**9)
+        SearchScope.for_snapshot(_snapshot(["a.py", "b.py"], snapshot_id="s2"), self.control)
+        self.assertIn("!/b.py", scope.ignore_file.read_text(encoding="utf-8"))
+
+    def test_load_without_snapshot(self):
+        self.assertIsNone(SearchScope.load(Path(self.tmp.name)))
+        self.assertEqual(scope_args(None), [])
+
+    def test_scoped_search_outside_the_project_root_warns(self):
+        root = Path(self.tmp.name)
+        (root / "src").mkdir()
+        (root / "src" / "a.py").write_text("needle\n", encoding="utf-8")
+        elsewhere = root / "elsewhere"
+        elsewhere.mkdir()
+        cwd = os.getcwd()
+        try:
+            os.chdir(elsewhere)
+            scope = SearchScope.for_snapshot(_snapshot(["src/a.py"]), self.control)
+            with self.assertLogs("project_control.core.search_scope", "WARNING") as logs:
+                found = run_rg_multi({"needle": "needle"}, extra_args=scope.rg_args())
+            self.assertEqual(found["needle"], [])
+            self.assertIn("Run from the project root", logs.output[0])
+
+            os.chdir(root)
+            scope = SearchScope.for_snapshot(_snapshot(["src/a.py"]), self.control)
+            with self.assertNoLogs("project_control.core.search_scope", "WARNING"):
+                args = scope.rg_args()
+            (self.control / "snapshot.json").write_text(json.dumps(_snapshot(["src/a.py"])), encoding="utf-8")
+            found = run_rg_multi({"needle": "needle"}, extra_args=args)
+            self.assertEqual([m["file"] for m in found["needle"]], ["src/a.py"])
+        finally:
+            os.chdir(cwd)
+
+    def test_load_reads_saved_snapshot(self):
+        self.control.mkdir()
+        (self.control / "snapshot.json").write_text(json.dumps(_snapshot(["a.py"])), encoding="utf-8")
+        scope = SearchScope.load(Path(self.tmp.name))
+        self.assertEqual(len(scope), 1)
+
+
+@unittest.skipUnless(shutil.which("rg"), "ripgrep not installed")
+class SearchScopeRgTests(unittest.TestCase):
+    def test_rg_searches_only_snapshot_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            files = {
+                "src/a.py": "needle\n",
+                "src/deep/b.py": "needle\n",
+                "src/skipped.py": "needle\n",
+                "node_modules/x.js": "needle\n",
+                ".project-control/content/abc.blob": "needle\n",
+                "build/gen.py": "needle\n",
+                ".gitignore": "build/\n",
+            }
+            for rel, text in files.items():
+                (root / rel).parent.mkdir(parents=True, exist_ok=True)
+                (root / rel).write_text(text, encoding="utf-8")
+            scope = SearchScope.for_snapshot(
+                _snapshot(["src/a.py", "src/deep/b.py", "build/gen.py"]), root / ".project-control"
+            )
+            result = subprocess.run(
+                ["rg", "-l", "needle", *scope.rg_args()], cwd=root, capture_output=True, text=True
+            )
+        found = sorted(Path(line).as_posix() for line in result.stdout.split())
+        self.assertEqual(found, ["build/gen.py", "src/a.py", "src/deep/b.py"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""Tests for the AST/tokenizer symbol index."""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from project_control.cli.graph_cmd import _find_symbol_definitions
+from project_control.core import symbol_index
+from project_control.core.content_store import ContentStore
+from project_control.core.scanner import scan_project
+from project_control.core.symbol_index import SymbolIndex, js_symbols, python_symbols
+
+
+class PythonSymbolsTests(unittest.TestCase):
+    def test_definitions_imports_and_calls(self):
+        source = (
+            "from services.user_manager import UserManager as UM\n"
+            "import os.path\n"
+            "class Cart:\n"
+            "    async def total(self):\n"
+            "        return UserManager(os.path.join('a'))\n"
+        )
+        symbols = python_symbols(source)
+        for expected in [
+            ("services", "import", 1), ("user_manager", "import", 1), ("UserManager", "import", 1),
+            ("os", "import", 2), ("path", "import", 2), ("Cart", "class", 3), ("total", "function", 4),
+            ("UserManager", "call", 5), ("join", "call", 5),
+        ]:
+            self.assertIn(expected, symbols)
+        self.assertNotIn(("UM", "import", 1), symbols)
+
+    def test_syntax_error_yields_nothing(self):
+        self.assertEqual(python_symbols("def broken(:\n"), [])
+
+
+class JsSymbolsTests(unittest.TestCase):
+    def test_imports(self):
+        source = (
+            "import Store, { Cart as C, type Item } from './lib/store.js';\n"
+            "import * as NS from 'pkg';\n"
+            "const { Api, Client: Http } = require('../net/api');\n"
+            "const lazy = () => import('./lazy-page');\n"
+        )
+        symbols = js_symbols(source)
+        for expected in [
+            ("Store", "import", 1), ("Cart", "import", 1), ("Item", "import", 1), ("lib", "import", 1),
+            ("store", "import", 1), ("pkg", "import", 2), ("Api", "import", 3), ("Client", "import", 3),
+            ("net", "import", 3), ("api", "import", 3), ("lazy-page", "import", 4),
+        ]:
+            self.assertIn(expected, symbols)
+        names = {name for name, _, _ in symbols}
+        self.assertNotIn("C", names)
+        self.assertNotIn("NS", names)
+        self.assertNotIn("Http", names)
+
+    def test_definitions_calls_and_instantiations(self):
+        source = (
+            "export class Widget extends Base {\n"
+            "  render(props) { return helper(props); }\n"
+            "}\n"
+            "function* ids() {}\n"
+            "const make = async (x) => new ui.Widget(x);\n"
+            "const total = (1 + 2) * 3;\n"
+            "// new Commented()\n"
+            "const s = 'new InString()';\n"
+        )
+        symbols = js_symbols(source)
+        for expected in [
+            ("Widget", "class", 1), ("render", "function", 2), ("helper", "call", 2),
+            ("ids", "function", 4), ("make", "function", 5), ("Widget", "new", 5),
+        ]:
+            self.assertIn(expected, symbols)
+        names = {name for name, _, _ in symbols}
+        self.assertNotIn("total", names)
+        self.assertNotIn("Commented", names)
+        self.assertNotIn("InString", names)
+        self.assertNotIn(("Widget", "call", 5), symbols)
+
+
+class SymbolIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        files = {
+            "src/user_manager.py": "class UserManager:\n    def load(self):\n        pass\n",
+            "src/main.py": "from src.user_manager import UserManager\n\nmanager = UserManager()\n",
+            "web/app.js": "import { UserManager } from './user';\nconst m = new UserManager();\n",
+            "web/notes.txt": "UserManager\n",
+        }
+        for rel, text in files.items():
+            path = self.root / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text, encoding="utf-8")
+        self.snapshot = self._scan()
+        self.store = ContentStore(self.snapshot, self.root / ".project-control" / "snapshot.json")
+        self.cache = self.root / ".project-control" / "cache" / "symbols.sqlite"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _scan(self):
+        with patch("builtins.print"):
+            return scan_project(str(self.root), [".project-control"], [".py", ".js", ".txt"])
+
+    def test_queries(self):
+        index = SymbolIndex.build(self.snapshot, self.store)
+        definitions = index.definitions("UserManager")
+        self.assertEqual([(d.path, d.line, d.kind) for d in definitions], [("src/user_manager.py", 1, "class")])
+        self.assertEqual(
+            [(r.path, r.line, r.kind) for r in index.references("UserManager")],
+            [("src/main.py", 1, "import"), ("src/main.py", 3, "call"),
+             ("web/app.js", 1, "import"), ("web/app.js", 2, "new")],
+        )
+        self.assertEqual(index.files_with("UserManager", ("new",)), {"web/app.js"})
+        self.assertEqual(index.occurrences("Missing"), [])
+
+    def test_symbols_are_cached_by_sha(self):
+        SymbolIndex.build(self.snapshot, self.store, cache_path=self.cache)
+        with patch.object(symbol_index, "file_symbols", side_effect=AssertionError("re-parsed")):
+            index = SymbolIndex.build(self.snapshot, self.store, cache_path=self.cache)
+        self.assertEqual(len(index.definitions("load")), 1)
+
+    def test_only_changed_blobs_are_parsed(self):
+        SymbolIndex.build(self.snapshot, self.store, cache_path=self.cache)
+        (self.root / "web" / "app.js").write_text("export function start() {}\n", encoding="utf-8")
+        snapshot = self._scan()
+        store = ContentStore(snapshot, self.root / ".project-control" / "snapshot.json")
+        with patch.object(symbol_index, "file_symbols", wraps=symbol_index.file_symbols) as parse:
+            index = SymbolIndex.build(snapshot, store, cache_path=self.cache)
+        self.assertEqual(parse.call_count, 1)
+        self.assertEqual(index.files_with("UserManager", ("new",)), set())
+        self.assertEqual(len(index.definitions("start")), 1)
+
+    def test_trace_definitions_come_from_the_index(self):
+        index = SymbolIndex.build(self.snapshot, self.store)
+        occurrences = [{"path": "web/notes.txt", "line": 1, "lineText": "UserManager"}]
+        definitions = _find_symbol_definitions("UserManager", occurrences=occurrences,
+                                               symbol_index=index, content_store=self.store)
+        self.assertEqual(definitions, [{"path": "src/user_manager.py", "line": 1, "lineText": "class UserManager:"}])
+        # Unknown to the index: fall back to the text matches
+        self.assertEqual(_find_symbol_definitions("notes", occurrences=occurrences, symbol_index=index),
+                         occurrences)
+
+
+if __name__ == "__main__":
+    unittest.main()
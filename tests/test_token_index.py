@@ -0,0 +1,79 @@
+"""Tests for the snapshot token index used by pc dead."""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from project_control.core import token_index
+from project_control.core.content_store import ContentStore
+from project_control.core.scanner import scan_project
+from project_control.core.token_index import TokenIndex, file_tokens
+
+
+class FileTokensTests(unittest.TestCase):
+    def test_words_and_dotted_sequences(self):
+        tokens = file_tokens("import x from './my-component.js';\nos.path.join(a)\n")
+        for expected in ("my", "component", "my-component", "my-component.js", "js", "os", "os.path", "path.join"):
+            self.assertIn(expected, tokens)
+
+    def test_no_partial_words(self):
+        self.assertNotIn("user", file_tokens("username = userName"))
+
+
+class TokenIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        files = {
+            "src/utils.py": "def helper():\n    return 42\n",
+            "src/main.py": "from src.utils import helper\nimport services\n",
+            "web/app.js": "import { x } from './utils.js';\n",
+            "web/services.js": "export const usernames = [];\n",
+        }
+        for rel, text in files.items():
+            path = self.root / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text, encoding="utf-8")
+        with patch("builtins.print"):
+            self.snapshot = scan_project(str(self.root), [".project-control"], [".py", ".js"])
+        self.store = ContentStore(self.snapshot, self.root / ".project-control" / "snapshot.json")
+        self.cache = self.root / ".project-control" / "cache" / "tokens.sqlite"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _paths(self, paths):
+        return {Path(p).as_posix() for p in paths}
+
+    def test_lookup_lists_referencing_files(self):
+        index = TokenIndex.build(self.snapshot, self.store)
+        self.assertEqual(self._paths(index.files_with("utils")), {"src/main.py", "web/app.js"})
+        self.assertEqual(index.count("services"), 1)
+        self.assertEqual(index.count("user"), 0)
+
+    def test_vocabulary_limits_the_index(self):
+        index = TokenIndex.build(self.snapshot, self.store, vocabulary={"utils"})
+        self.assertEqual(index.count("utils"), 2)
+        self.assertEqual(index.count("helper"), 0)
+
+    def test_token_sets_are_cached_by_sha(self):
+        TokenIndex.build(self.snapshot, self.store, cache_path=self.cache)
+        with patch.object(token_index, "file_tokens", side_effect=AssertionError("re-tokenized")):
+            index = TokenIndex.build(self.snapshot, self.store, cache_path=self.cache)
+        self.assertEqual(self._paths(index.files_with("utils")), {"src/main.py", "web/app.js"})
+
+    def test_only_changed_blobs_are_tokenized(self):
+        TokenIndex.build(self.snapshot, self.store, cache_path=self.cache)
+        (self.root / "web" / "services.js").write_text("import utils from './utils';\n", encoding="utf-8")
+        with patch("builtins.print"):
+            snapshot = scan_project(str(self.root), [".project-control"], [".py", ".js"])
+        store = ContentStore(snapshot, self.root / ".project-control" / "snapshot.json")
+        with patch.object(token_index, "file_tokens", wraps=token_index.file_tokens) as tokenize:
+            index = TokenIndex.build(snapshot, store, cache_path=self.cache)
+        self.assertEqual(tokenize.call_count, 1)
+        self.assertEqual(index.count("utils"), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
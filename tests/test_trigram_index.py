@@ -0,0 +1,115 @@
+"""Tests for the trigram index used by pc search --index."""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from project_control.analysis.search_analyzer import iter_search, smart_search
+from project_control.core import trigram_index
+from project_control.core.content_store import ContentStore
+from project_control.core.scanner import scan_project
+from project_control.core.trigram_index import TrigramIndex, regex_query
+
+FILES = {
+    "src/app.py": "import os\nprint('Hello')\nconsole_log = 1\n",
+    "src/util.py": "def helper():\n    return 'hello world'\n",
+    "web/app.js": "console.log('x');\nconsole.log('y');\n",
+}
+
+
+class RegexQueryTests(unittest.TestCase):
+    def test_literals_become_trigram_conjunctions(self):
+        self.assertEqual(regex_query("abcd"), ("and", (("tri", "abc"), ("tri", "bcd"))))
+
+    def test_alternation_and_optional_parts(self):
+        alternatives = ("or", (
+            ("and", (("tri", "alp"), ("tri", "lph"), ("tri", "pha"))),
+            ("and", (("tri", "bet"), ("tri", "eta"))),
+        ))
+        # "x?" is optional, so only "yzw" is required after the alternation
+        self.assertEqual(regex_query(r"(?:alpha|beta)\s*x?yzw"), ("and", (alternatives, ("tri", "yzw"))))
+
+    def test_patterns_without_literals_are_unindexable(self):
+        self.assertEqual(regex_query("a.b"), ("all",))
+        self.assertFalse(TrigramIndex.can_search(["console", "a.b"]))
+        self.assertFalse(TrigramIndex.can_search(["(?<name>x)"]))
+        self.assertTrue(TrigramIndex.can_search([r"console\.log", "hello"]))
+
+
+class TrigramIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        for rel, text in FILES.items():
+            path = self.root / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text, encoding="utf-8")
+        self.snapshot = self._scan()
+        self.index_path = self.root / ".project-control" / "cache" / "trigrams.sqlite"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _scan(self):
+        with patch("builtins.print"):
+            snapshot = scan_project(str(self.root), [".project-control"], [".py", ".js"])
+        (self.root / ".project-control" / "snapshot.json").write_text(json.dumps(snapshot), encoding="utf-8")
+        return snapshot
+
+    def _build(self, snapshot=None):
+        snapshot = snapshot or self.snapshot
+        store = ContentStore(snapshot, self.root / ".project-control" / "snapshot.json")
+        index = TrigramIndex.build(snapshot, store, self.index_path)
+        self.addCleanup(index.close)
+        return index
+
+    def test_candidates_are_narrowed_by_trigrams(self):
+        index = self._build()
+        self.assertEqual(index.candidates(["console"]), ["src/app.py", "web/app.js"])
+        self.assertEqual(index.candidates([r"console\.log"]), ["web/app.js"])
+        self.assertEqual(index.candidates(["helper"]), ["src/util.py"])
+        self.assertEqual(index.candidates(["nothing_like_this"]), [])
+
+    def test_search_verifies_candidates(self):
+        index = self._build()
+        self.assertEqual(list(index.search([r"console\.log"])), [
+            {"file": "web/app.js", "line": 1, "text": "console.log('x');"},
+            {"file": "web/app.js", "line": 2, "text": "console.log('y');"},
+        ])
+        self.assertEqual(list(index.search(["(?i)hello"], files_only=True)), [
+            {"file": "src/app.py"}, {"file": "src/util.py"},
+        ])
+        self.assertEqual(len(list(index.search(["console"], max_results=2))), 2)
+
+    def test_reopening_a_current_index_does_not_rebuild(self):
+        self._build()
+        with patch.object(TrigramIndex, "update", side_effect=AssertionError("rebuilt")):
+            self.assertEqual(self._build().candidates(["helper"]), ["src/util.py"])
+
+    def test_new_snapshot_only_reads_changed_blobs(self):
+        self._build()
+        (self.root / "src" / "util.py").write_text("def other():\n    pass\n", encoding="utf-8")
+        snapshot = self._scan()
+        with patch.object(trigram_index, "blob_trigrams", wraps=trigram_index.blob_trigrams) as extract:
+            index = self._build(snapshot)
+        self.assertEqual(extract.call_count, 1)
+        self.assertEqual(index.candidates(["helper"]), [])
+        self.assertEqual(index.candidates(["other"]), ["src/util.py"])
+
+    def test_search_analyzer_uses_index_and_falls_back_to_rg(self):
+        with patch("project_control.analysis.search_analyzer.iter_rg_json",
+                   side_effect=AssertionError("rg used")):
+            matches = list(iter_search(["helper"], self.root, use_index=True))
+        self.assertEqual(matches, [{"file": "src/util.py", "line": 1, "text": "def helper():"}])
+        result = smart_search(["helper"], self.root, files_only=True, use_index=True)
+        self.assertEqual(result["matches"], [{"file": "src/util.py"}])
+
+        with patch("project_control.analysis.search_analyzer.iter_rg_json", return_value=iter([])) as rg:
+            list(iter_search(["a.b"], self.root, use_index=True))
+        rg.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
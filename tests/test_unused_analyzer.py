@@ -1,10 +1,13 @@
 """Tests for unused_analyzer — finds unused systems with 4-signal detection."""
 
+import os
 import unittest
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 import tempfile
 
+from project_control.core.search_scope import SearchScope
+from project_control.core.symbol_index import SymbolIndex, SymbolRef
 from project_control.analysis.unused_analyzer import (
     analyze_unused_systems,
     _detect_system_name,
@@ -12,6 +15,7 @@ from project_control.analysis.unused_analyzer import (
     _check_instantiation_signal,
     _check_usage_signal,
     _check_entrypoint_signal,
+    _discover_system_files,
     _calculate_score,
     _classify_score,
 )
@@ -309,5 +313,116 @@ class UnusedAnalyzerIntegrationTests(unittest.TestCase):
             self.assertIn("low_priority", result["stats"])
 
 
+class UnusedAnalyzerDiscoveryTests(unittest.TestCase):
+    """System file discovery from the snapshot or one pruned walk."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        for rel in ("src/UserManager.py", "src/ui/MenuSystem.tsx", "src/notes.py",
+                    "node_modules/lib/CacheManager.js", "src/Service.md"):
+            path = self.root / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _rel(self, paths):
+        return [p.relative_to(self.root).as_posix() for p in paths]
+
+    def test_walk_matches_name_patterns_and_prunes_ignored_dirs(self):
+        walked = []
+        real_walk = os.walk
+
+        def tracking_walk(top):
+            for entry in real_walk(top):
+                walked.append(entry[0])
+                yield entry
+
+        with patch("project_control.analysis.unused_analyzer.os.walk", tracking_walk):
+            found = _discover_system_files(self.root, [".py", ".tsx", ".js"], ["Manager", "System", "Service"])
+
+        self.assertEqual(self._rel(found), ["src/UserManager.py", "src/ui/MenuSystem.tsx"])
+        self.assertFalse(any("node_modules" in d for d in walked))
+
+    def test_snapshot_file_list_is_used_when_scoped(self):
+        scope = SearchScope(["src/UserManager.py", "lib/AuthService.js"], self.root / "scope.ignore")
+        found = _discover_system_files(self.root, [".py", ".js"], ["Manager", "Service"], scope)
+        self.assertEqual(self._rel(found), ["lib/AuthService.js", "src/UserManager.py"])
+
+
+def _fake_rg_multi(hits):
+    """run_rg_multi stand-in: ``hits`` maps query names ("usage:Name") to matches."""
+    def run(queries, extra_args=None, **kwargs):
+        return {name: hits.get(name, []) for name in queries}
+    return run
+
+
+class UnusedAnalyzerBatchTests(unittest.TestCase):
+    """All systems are evaluated from one batched search, cached by snapshot id."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        for rel in ("services/UserManager.py", "services/AuthService.py", "core/GameEngine.py"):
+            path = self.root / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(f"class {path.stem}:\n    pass\n")
+        (self.root / "main.py").write_text("from services.UserManager import UserManager\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _scope(self, snapshot_id):
+        paths = ["main.py", "services/UserManager.py", "services/AuthService.py", "core/GameEngine.py"]
+        return SearchScope(paths, self.root / "scope.ignore", snapshot_id)
+
+    @patch("project_control.analysis.unused_analyzer.run_rg_json")
+    @patch("project_control.analysis.unused_analyzer.run_rg_multi")
+    def test_one_search_for_all_systems(self, mock_multi, mock_rg):
+        mock_multi.side_effect = _fake_rg_multi({
+            "import:AuthService": [{"file": "app.py", "line": 1, "text": "import AuthService"}],
+        })
+
+        result = analyze_unused_systems(self.root, scope=self._scope(None))
+
+        mock_multi.assert_called_once()
+        mock_rg.assert_not_called()
+        queries = mock_multi.call_args[0][0]
+        self.assertEqual(len(queries), 9)
+        self.assertEqual(queries["usage:GameEngine"], ["GameEngine"])
+        scores = {entry["system_name"]: entry["score"] for bucket in ("high", "medium", "low") for entry in result[bucket]}
+        # UserManager is referenced by main.py (entrypoint read from disk)
+        self.assertEqual(scores, {"AuthService": 3, "GameEngine": 4, "UserManager": 3})
+
+    @patch("project_control.analysis.unused_analyzer.run_rg_multi")
+    def test_symbol_index_answers_import_and_instantiation(self, mock_multi):
+        mock_multi.side_effect = _fake_rg_multi({})
+        index = SymbolIndex([
+            SymbolRef("GameEngine", "import", "app.py", 1),
+            SymbolRef("GameEngine", "call", "app.py", 3),
+        ])
+
+        result = analyze_unused_systems(self.root, scope=self._scope(None), symbol_index=index)
+
+        queries = mock_multi.call_args[0][0]
+        self.assertEqual(sorted(queries), ["usage:AuthService", "usage:GameEngine", "usage:UserManager"])
+        scores = {entry["system_name"]: entry["score"] for bucket in ("high", "medium", "low") for entry in result[bucket]}
+        self.assertEqual(scores["GameEngine"], 2)
+
+    @patch("project_control.analysis.unused_analyzer.run_rg_multi")
+    def test_results_are_cached_by_snapshot_id(self, mock_multi):
+        mock_multi.side_effect = _fake_rg_multi({})
+
+        first = analyze_unused_systems(self.root, scope=self._scope("a" * 64))
+        second = analyze_unused_systems(self.root, scope=self._scope("a" * 64))
+        self.assertEqual(mock_multi.call_count, 1)
+        self.assertEqual(first, second)
+
+        analyze_unused_systems(self.root, scope=self._scope("b" * 64))
+        self.assertEqual(mock_multi.call_count, 2)
+
+
 if __name__ == "__main__":
     unittest.main()